@@ -10,325 +10,193 @@ import sys
 import os
 import subprocess
 import re
+import errno
 import json
 import glob
-import psutil
+import ctypes
+import fcntl
+import mmap
+import socket
+import random
+import struct
+import queue
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import heappush, heappop, heapify
+from itertools import count
+from operator import mul, sub
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTabWidget, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QFrame, QScrollArea, QGridLayout, QSizePolicy,
-    QGroupBox, QStatusBar, QToolBar, QAction, QSplitter, QComboBox,
-    QProgressBar, QMessageBox
-)
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QSize
-from PyQt5.QtGui import (
-    QFont, QColor, QPalette, QIcon, QPixmap, QPainter, QBrush,
-    QPen, QLinearGradient, QFontDatabase
-)
-
 # ─────────────────────────────────────────────
-#  STYLESHEET
+#  DATA COLLECTION FUNCTIONS
 # ─────────────────────────────────────────────
-STYLE = """
-QMainWindow, QDialog {
-    background-color: #0d1117;
-}
-QWidget {
-    background-color: #0d1117;
-    color: #e6edf3;
-    font-family: 'Consolas', 'Liberation Mono', monospace;
-    font-size: 15px;
-}
-QTabWidget::pane {
-    border: 1px solid #30363d;
-    background-color: #161b22;
-}
-QTabBar::tab {
-    background-color: #21262d;
-    color: #8b949e;
-    padding: 8px 20px;
-    border: 1px solid #30363d;
-    border-bottom: none;
-    font-size: 15px;
-    font-weight: bold;
-}
-QTabBar::tab:selected {
-    background-color: #161b22;
-    color: #58a6ff;
-    border-bottom: 2px solid #58a6ff;
-}
-QTabBar::tab:hover:!selected {
-    background-color: #30363d;
-    color: #e6edf3;
-}
-QTableWidget {
-    background-color: #0d1117;
-    alternate-background-color: #161b22;
-    gridline-color: #21262d;
-    border: 1px solid #30363d;
-    color: #e6edf3;
-    selection-background-color: #1f3a5f;
-    selection-color: #58a6ff;
-}
-QTableWidget::item {
-    padding: 4px 8px;
-    border-bottom: 1px solid #21262d;
-}
-QHeaderView::section {
-    background-color: #21262d;
-    color: #8b949e;
-    padding: 6px 8px;
-    border: none;
-    border-bottom: 2px solid #30363d;
-    font-weight: bold;
-    font-size: 14px;
-    text-transform: uppercase;
-    letter-spacing: 1px;
-}
-QScrollBar:vertical {
-    background-color: #0d1117;
-    width: 12px;
-    border: none;
-}
-QScrollBar::handle:vertical {
-    background-color: #30363d;
-    border-radius: 6px;
-    min-height: 20px;
-}
-QScrollBar::handle:vertical:hover {
-    background-color: #58a6ff;
-}
-QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0; }
-QScrollBar:horizontal {
-    background-color: #0d1117;
-    height: 12px;
-    border: none;
-}
-QScrollBar::handle:horizontal {
-    background-color: #30363d;
-    border-radius: 6px;
-}
-QScrollBar::handle:horizontal:hover { background-color: #58a6ff; }
-QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width: 0; }
-QPushButton {
-    background-color: #21262d;
-    color: #e6edf3;
-    border: 1px solid #30363d;
-    border-radius: 4px;
-    padding: 6px 14px;
-    font-size: 15px;
-}
-QPushButton:hover {
-    background-color: #30363d;
-    border-color: #58a6ff;
-    color: #58a6ff;
-}
-QPushButton:pressed { background-color: #1f3a5f; }
-QGroupBox {
-    border: 1px solid #30363d;
-    border-radius: 6px;
-    margin-top: 14px;
-    padding-top: 8px;
-    color: #58a6ff;
-    font-weight: bold;
-    font-size: 15px;
-}
-QGroupBox::title {
-    subcontrol-origin: margin;
-    subcontrol-position: top left;
-    left: 10px;
-    padding: 0 6px;
-    color: #58a6ff;
-}
-QProgressBar {
-    border: 1px solid #30363d;
-    border-radius: 4px;
-    background-color: #0d1117;
-    text-align: center;
-    color: #e6edf3;
-    height: 16px;
-    font-size: 14px;
-}
-QProgressBar::chunk {
-    border-radius: 3px;
-    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-        stop:0 #1f6feb, stop:1 #58a6ff);
-}
-QLabel { background-color: transparent; }
-QComboBox {
-    background-color: #21262d;
-    border: 1px solid #30363d;
-    border-radius: 4px;
-    padding: 4px 10px;
-    color: #e6edf3;
-    min-width: 180px;
-}
-QComboBox:hover { border-color: #58a6ff; }
-QComboBox QAbstractItemView {
-    background-color: #21262d;
-    border: 1px solid #30363d;
-    selection-background-color: #1f3a5f;
-}
-QStatusBar {
-    background-color: #161b22;
-    color: #8b949e;
-    border-top: 1px solid #30363d;
-    font-size: 14px;
-}
-QSplitter::handle {
-    background-color: #30363d;
-    width: 2px;
-}
-QToolBar {
-    background-color: #161b22;
-    border-bottom: 1px solid #30363d;
-    spacing: 4px;
-    padding: 4px;
-}
-"""
 
-# ─────────────────────────────────────────────
-#  COLOR HELPERS
-# ─────────────────────────────────────────────
-def health_color(status):
-    colors = {
-        "Bueno":       "#3fb950",
-        "Precaución":  "#d29922",
-        "Malo":        "#f85149",
-        "Desconocido": "#8b949e",
-    }
-    return colors.get(status, "#8b949e")
+def _env_int(name, default):
+    """Entero positivo desde una variable de entorno (o el valor por defecto)"""
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
 
-def usage_color(pct):
-    if pct < 60:  return "#3fb950"
-    if pct < 80:  return "#d29922"
-    return "#f85149"
+# Máximo de smartctl simultáneos durante el barrido de todos los discos.
+# Se puede bajar con LINUXHWMONITOR_SMART_WORKERS para no saturar la HBA.
+SMART_SWEEP_WORKERS = _env_int("LINUXHWMONITOR_SMART_WORKERS", 8)
+
+# Segundos que un resultado S.M.A.R.T. se reutiliza antes de volver a leer
+# el disco, y cuántos discos se guardan como máximo (LRU).
+SMART_CACHE_TTL  = _env_int("LINUXHWMONITOR_SMART_TTL", 60)
+SMART_CACHE_SIZE = _env_int("LINUXHWMONITOR_SMART_CACHE", 128)
+
+# Backend S.M.A.R.T.: "auto" (ioctl nativo con smartctl de respaldo),
+# "native" (sólo ioctl) o "smartctl" (sólo smartctl).
+SMART_BACKEND = os.environ.get("LINUXHWMONITOR_SMART_BACKEND", "auto")
+
+# Segundos entre dos barridos S.M.A.R.T. automáticos (vista general)
+OVERVIEW_REFRESH = _env_int("LINUXHWMONITOR_OVERVIEW_REFRESH", 120)
+
+# Temperatura de discos rotativos vía drivetemp: segundos entre lecturas.
+# drivetemp pregunta al disco con comandos ATA que reinician su temporizador
+# de reposo (hdparm -S, APM): leer cada segundo impediría que se durmiera.
+HDD_TEMP_INTERVAL = _env_int("LINUXHWMONITOR_HDD_TEMP_INTERVAL", 300)
+
+# Pools btrfs / ZFS: segundos que se reutiliza lo caro (zpool, btrfs scrub
+# status); el estado en sysfs / kstat se lee siempre.
+POOL_REFRESH = _env_int("LINUXHWMONITOR_POOL_REFRESH", 300)
+
+# Ejecutable de smartctl (otra ruta o un sustituto para pruebas)
+SMARTCTL = os.environ.get("LINUXHWMONITOR_SMARTCTL", "smartctl")
+
+# Autotests: segundos entre el arranque de un disco y el siguiente (para
+# no saturar una HBA compartida) y límites del sondeo con retroceso.
+SELFTEST_STAGGER  = _env_int("LINUXHWMONITOR_SELFTEST_STAGGER", 30)
+SELFTEST_POLL_MIN = 15
+SELFTEST_POLL_MAX = 600
+
+# Salidas de smartctl grabadas: con SMART_REPLAY_DIR se leen <dir>/<disco>.json
+# en lugar de ejecutar nada (pruebas, bench); con SMART_RECORD_DIR cada
+# lectura real se guarda ahí con ese mismo nombre.
+SMART_REPLAY_DIR = os.environ.get("LINUXHWMONITOR_SMART_REPLAY", "")
+SMART_RECORD_DIR = os.environ.get("LINUXHWMONITOR_SMART_RECORD", "")
+
+# Historial S.M.A.R.T. en disco (vacío = desactivado) y segundos mínimos
+# entre dos muestras guardadas del mismo disco.
+HISTORY_DIR = os.environ.get(
+    "LINUXHWMONITOR_HISTORY_DIR",
+    os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"),
+                 "linuxhwmonitor", "history"),
+)
+HISTORY_INTERVAL = _env_int("LINUXHWMONITOR_HISTORY_INTERVAL", 900)
 
-def temp_color(temp):
-    if temp is None: return "#8b949e"
-    if temp < 40:   return "#3fb950"
-    if temp < 55:   return "#d29922"
-    return "#f85149"
+# Pronóstico: días de historial usados para la regresión, días con los que
+# un pronóstico se considera cercano, y sectores reasignados / pendientes
+# (valor raw) a partir de los cuales se avisa.
+FORECAST_WINDOW_DAYS = _env_int("LINUXHWMONITOR_FORECAST_DAYS", 180)
+FORECAST_WARN_DAYS   = 180
+FORECAST_REALLOC_LIMIT = 100
+FORECAST_PENDING_LIMIT = 10
 
+# Llenado de sistemas de archivos: segundos entre muestras de uso, días de
+# historial para la tendencia, días con los que "lleno en ~N días" se resalta
+# y horas mínimas de historial antes de pronosticar nada.
+FS_SAMPLE_INTERVAL = _env_int("LINUXHWMONITOR_FS_INTERVAL", 1800)
+FS_FORECAST_DAYS   = _env_int("LINUXHWMONITOR_FS_FORECAST_DAYS", 30)
+FS_FULL_WARN_DAYS  = 30
+FS_FORECAST_MIN_HOURS = 12
 
-# ─────────────────────────────────────────────
-#  PARTITION BAR WIDGET  (estilo macOS)
-# ─────────────────────────────────────────────
-# Paleta de colores para particiones
-_PART_COLORS = [
-    "#58a6ff",  # azul
-    "#3fb950",  # verde
-    "#d29922",  # amarillo
-    "#f78166",  # naranja
-    "#bc8cff",  # violeta
-    "#39d353",  # verde claro
-    "#ff7b72",  # rojo suave
-    "#79c0ff",  # azul claro
-]
+# Hilos del escáner de tamaños de directorio ("¿qué ocupa espacio?")
+DU_WORKERS = _env_int("LINUXHWMONITOR_DU_WORKERS", 16)
 
-class PartitionBarWidget(QWidget):
-    """Visual disk partition bar, estilo macOS Disk Utility"""
 
-    def __init__(self, partitions=None, parent=None):
-        super().__init__(parent)
-        self.partitions = partitions or []
-        self.setMinimumHeight(20)
-        self.setMaximumHeight(24)
+def run_cmd(cmd, timeout=8):
+    try:
+        r = subprocess.run(cmd, capture_output=True, text=True,
+                           timeout=timeout, shell=isinstance(cmd, str))
+        return r.stdout.strip()
+    except Exception:
+        return ""
 
-    def set_partitions(self, partitions):
-        self.partitions = partitions
-        self.update()
+def _human_size(nbytes):
+    """Tamaño en el formato de lsblk (potencias de 1024: '465.8G', '256G')"""
+    size = float(nbytes)
+    for unit in "BKMGTPE":
+        if size < 1024 or unit == "E":
+            break
+        size /= 1024
+    return f"{size:.1f}".rstrip("0").rstrip(".") + unit
+
+def _sysfs_attr(path, default=""):
+    """Atributo sysfs como texto (open directo: es el camino caliente de get_disks)"""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return default
 
-    def paintEvent(self, event):
-        p = QPainter(self)
-        p.setRenderHint(QPainter.Antialiasing)
-        W = self.width()
-        H = self.height()
-        r = 5  # border radius
+def _sysfs_disk(name, sysfs_root="/sys"):
+    """Dict de disco para /sys/block/<name>, o None si no es un disco físico.
 
-        # Background
-        p.setBrush(QBrush(QColor("#21262d")))
-        p.setPen(Qt.NoPen)
-        p.drawRoundedRect(0, 0, W, H, r, r)
+    Descarta lo que no tiene enlace device (loop, zram, dm-*, md*), las
+    rutas ocultas de NVMe multipath, los lectores ópticos y los discos
+    de tamaño 0 (lector de tarjetas vacío).
+    """
+    base = f"{sysfs_root}/block/{name}"
+    if not os.path.exists(base + "/device"):
+        return None
+    if _sysfs_attr(base + "/hidden") == "1":
+        return None
+    if _sysfs_attr(base + "/device/type") == "5":    # TYPE_ROM
+        return None
+    try:
+        sectors = int(_sysfs_attr(base + "/size", "0"))
+    except ValueError:
+        return None
+    if sectors <= 0:
+        return None
+    try:
+        holders = sorted(os.listdir(base + "/holders"))
+    except OSError:
+        holders = []
+    return {
+        "name":  name,
+        "model": _sysfs_attr(base + "/device/model") or "Desconocido",
+        "size":  _human_size(sectors * 512),     # "size" siempre en sectores de 512
+        "rotational": _sysfs_attr(base + "/queue/rotational", "1") == "1",
+        "removable":  _sysfs_attr(base + "/removable") == "1",
+        "holders": holders,
+        "path":  f"/dev/{name}",
+    }
 
-        if not self.partitions:
-            p.end()
-            return
+def _disk_sort_key(name):
+    """Orden del kernel: sda … sdz, sdaa …; nvme0n1, nvme0n10, nvme1n1 … nvme10n1
 
-        # Calculate total size
-        total = sum(pt.get("total_gb") or 0 for pt in self.partitions)
-        if total <= 0:
-            # Fallback: equal width
-            total = len(self.partitions)
-            for pt in self.partitions:
-                if not pt.get("total_gb"):
-                    pt["total_gb"] = 1.0
+    Orden natural por tramos: los números por valor y las letras como las
+    numera el kernel (más cortas antes: sdz < sdaa).
+    """
+    return (name[:2],) + tuple((0, int(run), "") if run.isdigit() else (1, len(run), run)
+                               for run in re.split(r"(\d+)", name) if run)
 
-        x = 0
-        for i, pt in enumerate(self.partitions):
-            gb = pt.get("total_gb") or 0
-            frac = gb / total if total else 0
-            seg_w = int(frac * W)
-            if i == len(self.partitions) - 1:
-                seg_w = W - x  # fill remainder
-
-            color = QColor(_PART_COLORS[i % len(_PART_COLORS)])
-            used_pct = pt.get("percent")
-            if used_pct is not None:
-                if used_pct > 90:
-                    color = QColor("#f85149")
-                elif used_pct > 75:
-                    color = QColor("#d29922")
-
-            # Draw segment
-            if x == 0 and seg_w >= W - 2:
-                # Full bar
-                p.setBrush(QBrush(color))
-                p.drawRoundedRect(x, 0, seg_w, H, r, r)
-            elif x == 0:
-                # Left end rounded
-                p.setBrush(QBrush(color))
-                p.drawRoundedRect(x, 0, seg_w + r, H, r, r)
-                p.drawRect(x + seg_w - r, 0, r, H)
-            elif x + seg_w >= W:
-                # Right end rounded
-                p.setBrush(QBrush(color))
-                p.drawRoundedRect(x - r, 0, seg_w + r, H, r, r)
-                p.drawRect(x - r, 0, r, H)
-            else:
-                # Middle: plain rect
-                p.setBrush(QBrush(color))
-                p.drawRect(x, 0, seg_w, H)
-
-            # Divider
-            if i < len(self.partitions) - 1:
-                p.setPen(QPen(QColor("#0d1117"), 1))
-                p.drawLine(x + seg_w, 0, x + seg_w, H)
-                p.setPen(Qt.NoPen)
-
-            x += seg_w
-
-        p.end()
-
-
-# ─────────────────────────────────────────────
-#  DATA COLLECTION FUNCTIONS
-# ─────────────────────────────────────────────
-
-def run_cmd(cmd, timeout=8):
+def _sysfs_disks(sysfs_root="/sys"):
     try:
-        r = subprocess.run(cmd, capture_output=True, text=True,
-                           timeout=timeout, shell=isinstance(cmd, str))
-        return r.stdout.strip()
-    except Exception:
-        return ""
-
-def get_disks():
-    """Returns list of dicts: {name, model, size, type}"""
-    disks = []
+        names = os.listdir(os.path.join(sysfs_root, "block"))
+    except OSError:
+        return []
+    names.sort(key=_disk_sort_key)
+    disks = (_sysfs_disk(n, sysfs_root) for n in names)
+    return [d for d in disks if d]
+
+def get_disks(sysfs_root="/sys"):
+    """Returns list of dicts: {name, model, size, rotational, removable, holders, path}
+
+    Lee /sys/block directamente; lsblk y los globs de /dev quedan de respaldo.
+    """
+    disks = _sysfs_disks(sysfs_root)
+    if disks:
+        return disks
     try:
         out = run_cmd(["lsblk", "-J", "-o", "NAME,MODEL,SIZE,ROTA,TYPE,MOUNTPOINTS"])
         data = json.loads(out)
@@ -338,7 +206,7 @@ def get_disks():
                     "name":  dev.get("name", ""),
                     "model": (dev.get("model") or "Desconocido").strip(),
                     "size":  dev.get("size", "?"),
-                    "rotational": dev.get("rota", "1") == "1",
+                    "rotational": dev.get("rota", "1") in ("1", True),
                     "path":  f"/dev/{dev.get('name','')}",
                 })
     except Exception:
@@ -349,12 +217,639 @@ def get_disks():
                           "rotational": True, "path": p})
     return disks
 
-def get_smart_data(dev_path):
-    """Run smartctl -a -j and parse output"""
-    out = run_cmd(["sudo", "smartctl", "-a", "-j", dev_path])
-    if not out:
-        out = run_cmd(["smartctl", "-a", "-j", dev_path])
-    result = {
+# ─────────────────────────────────────────────
+#  NATIVE S.M.A.R.T. (SG_IO, sin smartctl)
+# ─────────────────────────────────────────────
+# Lee S.M.A.R.T. con ATA PASS-THROUGH(16) directamente sobre el ioctl SG_IO
+# y produce un dict con las mismas claves que "smartctl -a -j", así el
+# parser es el mismo para ambos caminos. Requiere root (CAP_SYS_RAWIO).
+
+SG_IO               = 0x2285
+SG_DXFER_NONE       = -1
+SG_DXFER_FROM_DEV   = -3
+
+ATA_SMART_CMD       = 0xB0
+ATA_IDENTIFY        = 0xEC
+ATA_CHECK_POWER     = 0xE5
+SMART_READ_DATA     = 0xD0
+SMART_READ_THRESH   = 0xD1
+SMART_RETURN_STATUS = 0xDA
+
+
+class _SgIoHdr(ctypes.Structure):
+    """struct sg_io_hdr de <scsi/sg.h>"""
+    _fields_ = [
+        ("interface_id",    ctypes.c_int),
+        ("dxfer_direction", ctypes.c_int),
+        ("cmd_len",         ctypes.c_ubyte),
+        ("mx_sb_len",       ctypes.c_ubyte),
+        ("iovec_count",     ctypes.c_ushort),
+        ("dxfer_len",       ctypes.c_uint),
+        ("dxferp",          ctypes.c_void_p),
+        ("cmdp",            ctypes.c_void_p),
+        ("sbp",             ctypes.c_void_p),
+        ("timeout",         ctypes.c_uint),
+        ("flags",           ctypes.c_uint),
+        ("pack_id",         ctypes.c_int),
+        ("usr_ptr",         ctypes.c_void_p),
+        ("status",          ctypes.c_ubyte),
+        ("masked_status",   ctypes.c_ubyte),
+        ("msg_status",      ctypes.c_ubyte),
+        ("sb_len_wr",       ctypes.c_ubyte),
+        ("host_status",     ctypes.c_ushort),
+        ("driver_status",   ctypes.c_ushort),
+        ("resid",           ctypes.c_int),
+        ("duration",        ctypes.c_uint),
+        ("info",            ctypes.c_uint),
+    ]
+
+
+# Nombres de atributos como los muestra smartctl (los más comunes)
+ATA_ATTR_NAMES = {
+    1: "Raw_Read_Error_Rate",       2: "Throughput_Performance",
+    3: "Spin_Up_Time",              4: "Start_Stop_Count",
+    5: "Reallocated_Sector_Ct",     7: "Seek_Error_Rate",
+    8: "Seek_Time_Performance",     9: "Power_On_Hours",
+    10: "Spin_Retry_Count",         11: "Calibration_Retry_Count",
+    12: "Power_Cycle_Count",        13: "Read_Soft_Error_Rate",
+    22: "Helium_Level",             170: "Available_Reservd_Space",
+    171: "Program_Fail_Count",      172: "Erase_Fail_Count",
+    173: "Wear_Leveling_Count",     174: "Unexpect_Power_Loss_Ct",
+    175: "Program_Fail_Count_Chip", 177: "Wear_Leveling_Count",
+    179: "Used_Rsvd_Blk_Cnt_Tot",   180: "Unused_Rsvd_Blk_Cnt_Tot",
+    181: "Program_Fail_Cnt_Total",  182: "Erase_Fail_Count_Total",
+    183: "Runtime_Bad_Block",       184: "End-to-End_Error",
+    187: "Reported_Uncorrect",      188: "Command_Timeout",
+    189: "High_Fly_Writes",         190: "Airflow_Temperature_Cel",
+    191: "G-Sense_Error_Rate",      192: "Power-Off_Retract_Count",
+    193: "Load_Cycle_Count",        194: "Temperature_Celsius",
+    195: "Hardware_ECC_Recovered",  196: "Reallocated_Event_Count",
+    197: "Current_Pending_Sector",  198: "Offline_Uncorrectable",
+    199: "UDMA_CRC_Error_Count",    200: "Multi_Zone_Error_Rate",
+    202: "Percent_Lifetime_Remain", 206: "Flying_Height",
+    220: "Disk_Shift",              222: "Loaded_Hours",
+    223: "Load_Retry_Count",        224: "Load_Friction",
+    226: "Load-in_Time",            230: "Head_Amplitude",
+    231: "SSD_Life_Left",           232: "Available_Reservd_Space",
+    233: "Media_Wearout_Indicator", 234: "Thermal_Throttle",
+    235: "POR_Recovery_Count",      240: "Head_Flying_Hours",
+    241: "Total_LBAs_Written",      242: "Total_LBAs_Read",
+    254: "Free_Fall_Sensor",
+}
+
+
+def _ata_pt16(fd, command, features=0, count=0, lba=0, data_in=0, ck_cond=False):
+    """Envía un comando ATA por SCSI ATA PASS-THROUGH(16).
+
+    data_in = bytes a leer (PIO Data-In) o 0 para comandos sin datos.
+    Devuelve (datos, sense); lanza OSError si el ioctl falla.
+    """
+    if data_in:
+        protocol, flags = 4, 0x0E    # PIO Data-In; T_DIR=1, BYT_BLOK=1, T_LENGTH=count
+    else:
+        protocol, flags = 3, 0x00    # Non-data
+    if ck_cond:
+        flags |= 0x20
+    cdb = bytes([
+        0x85, protocol << 1, flags,
+        0, features & 0xFF,
+        0, count & 0xFF,
+        0, lba & 0xFF,
+        0, (lba >> 8) & 0xFF,
+        0, (lba >> 16) & 0xFF,
+        0xA0, command, 0,
+    ])
+    cdb_buf   = ctypes.create_string_buffer(cdb, len(cdb))
+    sense_buf = ctypes.create_string_buffer(32)
+    data_buf  = ctypes.create_string_buffer(data_in) if data_in else None
+
+    hdr = _SgIoHdr()
+    hdr.interface_id    = ord("S")
+    hdr.dxfer_direction = SG_DXFER_FROM_DEV if data_in else SG_DXFER_NONE
+    hdr.cmd_len         = len(cdb)
+    hdr.mx_sb_len       = len(sense_buf)
+    hdr.dxfer_len       = data_in
+    hdr.dxferp          = ctypes.addressof(data_buf) if data_in else None
+    hdr.cmdp            = ctypes.addressof(cdb_buf)
+    hdr.sbp             = ctypes.addressof(sense_buf)
+    hdr.timeout         = 5000
+    fcntl.ioctl(fd, SG_IO, hdr)
+
+    sense = sense_buf.raw[:hdr.sb_len_wr]
+    if hdr.host_status or hdr.driver_status & 0x07:    # DRIVER_SENSE (0x08) no es error
+        raise OSError(f"SG_IO: host={hdr.host_status} driver={hdr.driver_status}")
+    if hdr.status and not ck_cond and not _ata_sense_ok(sense):
+        raise OSError(f"SG_IO: SCSI status {hdr.status}")
+    return (data_buf.raw if data_in else b""), sense
+
+
+def _ata_sense_ok(sense):
+    """True si el sense es sólo el descriptor ATA Return sin error"""
+    desc = _ata_return_descriptor(sense)
+    return desc is not None and not (desc[13] & 0x01)
+
+
+def _ata_return_descriptor(sense):
+    """Descriptor ATA Status Return (0x09) dentro de un sense de formato descriptor"""
+    if len(sense) < 8 or (sense[0] & 0x7F) not in (0x72, 0x73):
+        return None
+    pos, end = 8, min(len(sense), 8 + sense[7])
+    while pos + 1 < end:
+        code, length = sense[pos], sense[pos + 1]
+        if code == 0x09 and pos + 14 <= len(sense):
+            return sense[pos:pos + 14]
+        pos += 2 + length
+    return None
+
+
+def _ata_string(words_blob, first, last):
+    """Cadena ATA IDENTIFY (palabras first..last, bytes invertidos por palabra)"""
+    raw = words_blob[first * 2:(last + 1) * 2]
+    swapped = bytearray(len(raw))
+    swapped[0::2] = raw[1::2]
+    swapped[1::2] = raw[0::2]
+    return swapped.decode("ascii", "replace").strip()
+
+
+def _checksum_ok(sector):
+    return len(sector) == 512 and sum(sector) & 0xFF == 0
+
+
+def decode_ata_identify(sector):
+    """IDENTIFY DEVICE (512 bytes) -> campos de smartctl -j"""
+    w = struct.unpack("<256H", sector)
+    info = {
+        "model_name":       _ata_string(sector, 27, 46),
+        "serial_number":    _ata_string(sector, 10, 19),
+        "firmware_version": _ata_string(sector, 23, 26),
+        "device":           {"protocol": "ATA"},
+    }
+    if w[83] & (1 << 10):                      # LBA48
+        sectors = w[100] | w[101] << 16 | w[102] << 32 | w[103] << 48
+    else:
+        sectors = w[60] | w[61] << 16
+    logical = 512
+    if (w[106] & 0xC000) == 0x4000 and w[106] & (1 << 12):
+        logical = (w[117] | w[118] << 16) * 2
+    if sectors:
+        info["user_capacity"] = {"blocks": sectors, "bytes": sectors * logical}
+    if w[217] == 1:
+        info["rotation_rate"] = 0
+    elif 0x0401 <= w[217] <= 0xFFFE:
+        info["rotation_rate"] = w[217]
+    return info
+
+
+def decode_ata_smart(values, thresholds=None):
+    """SMART READ DATA (+ READ THRESHOLDS) -> tabla ata_smart_attributes de smartctl"""
+    thresh = {}
+    if thresholds and _checksum_ok(thresholds):
+        for off in range(2, 362, 12):
+            aid = thresholds[off]
+            if aid:
+                thresh[aid] = thresholds[off + 1]
+
+    table = []
+    for off in range(2, 362, 12):
+        aid = values[off]
+        if not aid:
+            continue
+        flags, value, worst = struct.unpack_from("<HBB", values, off + 1)
+        raw = int.from_bytes(values[off + 5:off + 11], "little")
+        table.append({
+            "id":     aid,
+            "name":   ATA_ATTR_NAMES.get(aid, "Unknown_Attribute"),
+            "value":  value,
+            "worst":  worst,
+            "thresh": thresh.get(aid, 0),
+            "flags":  {"value": flags},
+            "raw":    {"value": raw, "string": str(raw)},
+        })
+    return table
+
+
+def _smart_json_from_ata(identify, values, thresholds=None, passed=None):
+    """Arma el dict estilo smartctl -j a partir de los sectores ATA crudos"""
+    data = decode_ata_identify(identify) if identify else {}
+    table = decode_ata_smart(values, thresholds)
+    data["ata_smart_attributes"] = {"table": table}
+
+    raw = {a["id"]: a["raw"]["value"] for a in table}
+    for tid in (194, 190):
+        if tid in raw:
+            data["temperature"] = {"current": raw[tid] & 0xFF}
+            break
+    if 9 in raw:
+        data["power_on_time"] = {"hours": raw[9] & 0xFFFFFFFF}
+    if 12 in raw:
+        data["power_cycle_count"] = raw[12]
+
+    if passed is None and thresholds and _checksum_ok(thresholds):
+        # Sin descriptor de estado: fallo si algún atributo cruzó su umbral
+        passed = not any(a["thresh"] and a["value"] <= a["thresh"] for a in table)
+    if passed is not None:
+        data["smart_status"] = {"passed": passed}
+    return data
+
+
+def read_ata_smart_native(dev_path):
+    """S.M.A.R.T. de un disco ATA/SATA vía SG_IO; None si no es posible"""
+    try:
+        fd = os.open(dev_path, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        identify, _ = _ata_pt16(fd, ATA_IDENTIFY, count=1, data_in=512)
+        values, _   = _ata_pt16(fd, ATA_SMART_CMD, features=SMART_READ_DATA,
+                                count=1, lba=0xC24F00, data_in=512)
+        if not _checksum_ok(values):
+            return None
+        try:
+            thresholds, _ = _ata_pt16(fd, ATA_SMART_CMD, features=SMART_READ_THRESH,
+                                      count=1, lba=0xC24F00, data_in=512)
+        except OSError:
+            thresholds = None
+        passed = None
+        try:
+            _, sense = _ata_pt16(fd, ATA_SMART_CMD, features=SMART_RETURN_STATUS,
+                                 lba=0xC24F00, ck_cond=True)
+            desc = _ata_return_descriptor(sense)
+            if desc is not None:
+                regs = (desc[9], desc[11])    # LBA mid / LBA high
+                if regs == (0x4F, 0xC2):
+                    passed = True
+                elif regs == (0xF4, 0x2C):
+                    passed = False
+        except OSError:
+            pass
+        return _smart_json_from_ata(identify, values, thresholds, passed)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+# ── NVMe: comandos admin por NVME_IOCTL_ADMIN_CMD ──
+NVME_IOCTL_ADMIN_CMD = 0xC0484E41     # _IOWR('N', 0x41, struct nvme_admin_cmd)
+NVME_ADMIN_GET_LOG   = 0x02
+NVME_ADMIN_IDENTIFY  = 0x06
+NVME_LOG_ERROR       = 0x01
+NVME_LOG_HEALTH      = 0x02
+NVME_LOG_SELF_TEST   = 0x06
+
+
+class _NvmeAdminCmd(ctypes.Structure):
+    """struct nvme_admin_cmd de <linux/nvme_ioctl.h>"""
+    _fields_ = [
+        ("opcode",       ctypes.c_uint8),
+        ("flags",        ctypes.c_uint8),
+        ("rsvd1",        ctypes.c_uint16),
+        ("nsid",         ctypes.c_uint32),
+        ("cdw2",         ctypes.c_uint32),
+        ("cdw3",         ctypes.c_uint32),
+        ("metadata",     ctypes.c_uint64),
+        ("addr",         ctypes.c_uint64),
+        ("metadata_len", ctypes.c_uint32),
+        ("data_len",     ctypes.c_uint32),
+        ("cdw10",        ctypes.c_uint32),
+        ("cdw11",        ctypes.c_uint32),
+        ("cdw12",        ctypes.c_uint32),
+        ("cdw13",        ctypes.c_uint32),
+        ("cdw14",        ctypes.c_uint32),
+        ("cdw15",        ctypes.c_uint32),
+        ("timeout_ms",   ctypes.c_uint32),
+        ("result",       ctypes.c_uint32),
+    ]
+
+
+def _nvme_admin(fd, opcode, length, nsid=0, cdw10=0, cdw11=0, cdw12=0, cdw13=0):
+    """Ejecuta un comando admin NVMe que devuelve length bytes"""
+    buf = ctypes.create_string_buffer(length)
+    cmd = _NvmeAdminCmd()
+    cmd.opcode     = opcode
+    cmd.nsid       = nsid
+    cmd.addr       = ctypes.addressof(buf)
+    cmd.data_len   = length
+    cmd.cdw10      = cdw10
+    cmd.cdw11      = cdw11
+    cmd.cdw12      = cdw12
+    cmd.cdw13      = cdw13
+    cmd.timeout_ms = 5000
+    status = fcntl.ioctl(fd, NVME_IOCTL_ADMIN_CMD, cmd)
+    if status:
+        raise OSError(f"NVMe admin 0x{opcode:02x}: status 0x{status:x}")
+    return buf.raw
+
+
+def _nvme_get_log(fd, log_id, length, offset=0, nsid=0xFFFFFFFF):
+    """Get Log Page (length múltiplo de 4, offset en bytes)"""
+    numd = length // 4 - 1
+    return _nvme_admin(fd, NVME_ADMIN_GET_LOG, length, nsid=nsid,
+                       cdw10=log_id | (numd & 0xFFFF) << 16,
+                       cdw11=numd >> 16,
+                       cdw12=offset & 0xFFFFFFFF, cdw13=offset >> 32)
+
+
+def _u128(blob, off):
+    return int.from_bytes(blob[off:off + 16], "little")
+
+
+def decode_nvme_health_log(blob):
+    """Log Page 0x02 (512 bytes) -> nvme_smart_health_information_log de smartctl"""
+    kelvin = struct.unpack_from("<H", blob, 1)[0]
+    sensors = [t - 273 for t in struct.unpack_from("<8H", blob, 200) if t]
+    log = {
+        "critical_warning":          blob[0],
+        "temperature":               kelvin - 273 if kelvin else None,
+        "available_spare":           blob[3],
+        "available_spare_threshold": blob[4],
+        "percentage_used":           blob[5],
+        "data_units_read":           _u128(blob, 32),
+        "data_units_written":        _u128(blob, 48),
+        "host_reads":                _u128(blob, 64),
+        "host_writes":               _u128(blob, 80),
+        "controller_busy_time":      _u128(blob, 96),
+        "power_cycles":              _u128(blob, 112),
+        "power_on_hours":            _u128(blob, 128),
+        "unsafe_shutdowns":          _u128(blob, 144),
+        "media_errors":              _u128(blob, 160),
+        "num_err_log_entries":       _u128(blob, 176),
+        "warning_temp_time":         struct.unpack_from("<I", blob, 192)[0],
+        "critical_comp_time":        struct.unpack_from("<I", blob, 196)[0],
+    }
+    if sensors:
+        log["temperature_sensors"] = sensors
+    return log
+
+
+def decode_nvme_identify_ctrl(blob):
+    """Identify Controller (CNS 1, 4096 bytes) -> campos de smartctl -j"""
+    def text(a, b):
+        return blob[a:b].decode("ascii", "replace").strip()
+    return {
+        "model_name":       text(24, 64),
+        "serial_number":    text(4, 24),
+        "firmware_version": text(64, 72),
+        "nvme_total_capacity": _u128(blob, 280),
+        "nvme_error_log_entries": blob[262] + 1,      # ELPE es base 0
+        "device":           {"protocol": "NVMe"},
+    }
+
+
+# Identify no cambia mientras el disco esté conectado: se lee una vez y se
+# olvida al conectar/desconectar (otro disco puede reutilizar el nombre)
+_NVME_IDENTIFY = {}
+
+# Discos cuyo ioctl de logs falló (sin root, controlador que no lo admite):
+# con SMART_BACKEND=auto se va directo a smartctl en lugar de reintentarlo
+_NVME_NATIVE_LOGS_FAILED = set()
+
+
+def _nvme_identify(fd, dev_path):
+    ident = _NVME_IDENTIFY.get(dev_path)
+    if ident is None:
+        ident = decode_nvme_identify_ctrl(
+            _nvme_admin(fd, NVME_ADMIN_IDENTIFY, 4096, cdw10=1))
+        _NVME_IDENTIFY[dev_path] = ident
+    return ident
+
+
+def forget_nvme_identify(dev_path=None):
+    """Descarta el Identify guardado de un disco (o de todos) y vuelve a
+    probar el ioctl de logs"""
+    if dev_path is None:
+        _NVME_IDENTIFY.clear()
+        _NVME_NATIVE_LOGS_FAILED.clear()
+    else:
+        _NVME_IDENTIFY.pop(dev_path, None)
+        _NVME_NATIVE_LOGS_FAILED.discard(dev_path)
+
+
+def _nvme_ctrl_path(dev_path):
+    """/dev/nvme0n1 -> /dev/nvme0 (el namespace también acepta comandos admin)"""
+    m = re.match(r"(/dev/nvme\d+)n\d+$", dev_path)
+    if m and os.path.exists(m.group(1)):
+        return m.group(1)
+    return dev_path
+
+
+def read_nvme_smart_native(dev_path):
+    """Log de salud NVMe vía ioctl; None si no es posible"""
+    try:
+        fd = os.open(_nvme_ctrl_path(dev_path), os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        ident = _nvme_identify(fd, dev_path)
+        log = decode_nvme_health_log(_nvme_get_log(fd, NVME_LOG_HEALTH, 512))
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+    data = dict(ident)
+    data["nvme_smart_health_information_log"] = log
+    data["smart_status"] = {"passed": log["critical_warning"] == 0}
+    if log["temperature"] is not None:
+        data["temperature"] = {"current": log["temperature"]}
+    data["power_on_time"]     = {"hours": log["power_on_hours"]}
+    data["power_cycle_count"] = log["power_cycles"]
+    sectors = _read_file(f"/sys/block/{os.path.basename(dev_path)}/size")
+    if sectors.isdigit():
+        data["user_capacity"] = {"bytes": int(sectors) * 512}
+    return data
+
+
+# Códigos de estado NVMe más comunes: (tipo, código) -> texto
+NVME_STATUS = {
+    (0, 0x00): "Successful Completion",
+    (0, 0x01): "Invalid Command Opcode",
+    (0, 0x02): "Invalid Field in Command",
+    (0, 0x04): "Data Transfer Error",
+    (0, 0x05): "Aborted due to Power Loss",
+    (0, 0x06): "Internal Error",
+    (0, 0x07): "Command Abort Requested",
+    (0, 0x0B): "Invalid Namespace or Format",
+    (0, 0x80): "LBA Out of Range",
+    (0, 0x81): "Capacity Exceeded",
+    (0, 0x82): "Namespace Not Ready",
+    (2, 0x80): "Write Fault",
+    (2, 0x81): "Unrecovered Read Error",
+    (2, 0x82): "End-to-end Guard Check Error",
+    (2, 0x83): "End-to-end Application Tag Check Error",
+    (2, 0x84): "End-to-end Reference Tag Check Error",
+    (2, 0x85): "Compare Failure",
+    (2, 0x86): "Access Denied",
+    (2, 0x87): "Deallocated or Unwritten Logical Block",
+}
+
+NVME_SELF_TEST_CODES = {1: "Short", 2: "Extended", 0xE: "Vendor specific"}
+NVME_SELF_TEST_RESULTS = {
+    0x0: "Completed without error",
+    0x1: "Aborted: Self-test command",
+    0x2: "Aborted: Controller Reset",
+    0x3: "Aborted: Namespace removed",
+    0x4: "Aborted: Format NVM command",
+    0x5: "Fatal or unknown test error",
+    0x6: "Completed: unknown failed segment",
+    0x7: "Completed: failed segments",
+    0x8: "Aborted: unknown reason",
+    0x9: "Aborted: Sanitize operation",
+}
+
+
+def decode_nvme_error_log(blob):
+    """Log 0x01 (entradas de 64 bytes, la más reciente primero).
+
+    Mismas claves que la tabla nvme_error_information_log de smartctl;
+    se omiten las entradas vacías (error_count 0).
+    """
+    table = []
+    for off in range(0, len(blob) - 63, 64):
+        count, sqid, cid, status, parm, lba, nsid = struct.unpack_from("<QHHHHQI", blob, off)
+        if not count:
+            continue
+        sf   = status >> 1                  # el bit 0 es la fase
+        sct  = (sf >> 8) & 0x7
+        sc   = sf & 0xFF
+        table.append({
+            "error_count":         count,
+            "submission_queue_id": sqid,
+            "command_id":          cid,
+            "status_field": {
+                "value":            sf,
+                "do_not_retry":     bool(sf & 0x4000),
+                "status_code_type": sct,
+                "status_code":      sc,
+                "string":           NVME_STATUS.get((sct, sc), f"SCT {sct} SC 0x{sc:02x}"),
+            },
+            "parm_error_location": parm,
+            "lba":  {"value": lba},
+            "nsid": nsid,
+        })
+    return {"table": table}
+
+
+def decode_nvme_self_test_log(blob):
+    """Log 0x06: operación en curso y 20 resultados de 28 bytes"""
+    log = {
+        "current_self_test_operation": {"value": blob[0] & 0x0F},
+        "current_self_test_completion_percent": blob[1] & 0x7F,
+        "table": [],
+    }
+    for off in range(4, min(len(blob), 564) - 27, 28):
+        status, segment, valid = blob[off], blob[off + 1], blob[off + 2]
+        result, code = status & 0x0F, status >> 4
+        if result == 0xF:                   # entrada sin usar
+            continue
+        entry = {
+            "self_test_code":   {"value": code,
+                                 "string": NVME_SELF_TEST_CODES.get(code, f"0x{code:x}")},
+            "self_test_result": {"value": result,
+                                 "string": NVME_SELF_TEST_RESULTS.get(result, f"0x{result:x}")},
+            "power_on_hours":   struct.unpack_from("<Q", blob, off + 4)[0],
+        }
+        if result in (0x6, 0x7):
+            entry["segment"] = segment
+        if valid & 0x1:
+            entry["nsid"] = struct.unpack_from("<I", blob, off + 12)[0]
+        if valid & 0x2:
+            entry["lba"] = struct.unpack_from("<Q", blob, off + 16)[0]
+        if valid & 0x4:
+            entry["status_code_type"] = blob[off + 24]
+        if valid & 0x8:
+            entry["status_code"] = blob[off + 25]
+        log["table"].append(entry)
+    return log
+
+
+def read_nvme_error_log_native(dev_path, count):
+    """Las count entradas más recientes del log de errores (como máximo las
+    que guarda el controlador); None si no es posible"""
+    try:
+        fd = os.open(_nvme_ctrl_path(dev_path), os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        ident = _nvme_identify(fd, dev_path)
+        n = max(1, min(count, ident.get("nvme_error_log_entries", 1)))
+        return decode_nvme_error_log(_nvme_get_log(fd, NVME_LOG_ERROR, n * 64))
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def read_nvme_self_test_log_native(dev_path):
+    try:
+        fd = os.open(_nvme_ctrl_path(dev_path), os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return decode_nvme_self_test_log(_nvme_get_log(fd, NVME_LOG_SELF_TEST, 564))
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def get_power_mode(dev_path):
+    """Estado de energía ATA sin despertar el disco (CHECK POWER MODE).
+
+    Devuelve "standby", "idle", "active" o None si no se puede saber
+    (NVMe, sin root, puente USB sin SAT...).
+    """
+    if not os.path.basename(dev_path).startswith("sd"):
+        return None
+    try:
+        fd = os.open(dev_path, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        _, sense = _ata_pt16(fd, ATA_CHECK_POWER, ck_cond=True)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    desc = _ata_return_descriptor(sense)
+    if desc is None:
+        return None
+    count = desc[5]
+    if count in (0x00, 0x01):
+        return "standby"
+    if 0x80 <= count <= 0x83:
+        return "idle"
+    return "active"
+
+
+def read_smart_native(dev_path):
+    """Backend nativo según el tipo de disco; None = usar smartctl"""
+    name = os.path.basename(dev_path)
+    if name.startswith("sd"):
+        return read_ata_smart_native(dev_path)
+    if name.startswith("nvme"):
+        return read_nvme_smart_native(dev_path)
+    return None
+
+
+def bench_smart_backends(dev_path, rounds=10):
+    """Compara el tiempo medio por lectura del backend nativo y de smartctl (ms)"""
+    results = {}
+    for backend, reader in (
+        ("native",   lambda: read_smart_native(dev_path)),
+        ("smartctl", lambda: run_cmd([SMARTCTL, "-a", "-j", dev_path])),
+    ):
+        t0 = time.perf_counter()
+        ok = False
+        for _ in range(rounds):
+            ok = bool(reader())
+        elapsed = (time.perf_counter() - t0) / rounds
+        results[backend] = {"ms": elapsed * 1000, "ok": ok}
+    return results
+
+
+def _empty_smart_result():
+    return {
         "health": "Desconocido",
         "temp": None,
         "model": "",
@@ -371,15 +866,78 @@ def get_smart_data(dev_path):
         "nvme_log": {},
         "raw_output": "",
     }
+
+def _smart_fixture_path(directory, dev_path):
+    return os.path.join(directory, os.path.basename(dev_path) + ".json")
+
+def _record_smart_output(dev_path, out):
+    """Guarda la salida cruda en SMART_RECORD_DIR (si está configurado)"""
+    if not SMART_RECORD_DIR or not out:
+        return
+    try:
+        os.makedirs(SMART_RECORD_DIR, exist_ok=True)
+        with open(_smart_fixture_path(SMART_RECORD_DIR, dev_path), "w") as f:
+            f.write(out)
+    except OSError:
+        pass
+
+def run_smartctl(args, timeout=8):
+    """smartctl con sudo y, si no hay salida, sin sudo"""
+    out = run_cmd(["sudo", SMARTCTL, *args], timeout)
+    if not out:
+        out = run_cmd([SMARTCTL, *args], timeout)
+    return out
+
+def get_smart_data(dev_path):
+    """Read S.M.A.R.T. via native ioctl when possible, else smartctl -a -j"""
+    if SMART_REPLAY_DIR:
+        try:
+            with open(_smart_fixture_path(SMART_REPLAY_DIR, dev_path)) as f:
+                return parse_smartctl_output(f.read())
+        except OSError:
+            return parse_smartctl_output("")
+
+    if SMART_BACKEND != "smartctl":
+        data = read_smart_native(dev_path)
+        if data is not None:
+            if SMART_RECORD_DIR:
+                _record_smart_output(dev_path, json.dumps(data, indent=1))
+            return _parse_smart_json(data)
+        if SMART_BACKEND == "native":
+            result = _empty_smart_result()
+            result["raw_output"] = "No se pudo leer S.M.A.R.T. por ioctl (¿root?)."
+            return result
+
+    # -n standby: smartctl no despierta un disco dormido, sale con código 2
+    out = run_smartctl(["-n", "standby", "-a", "-j", dev_path])
+    _record_smart_output(dev_path, out)
+    return parse_smartctl_output(out)
+
+def parse_smartctl_output(out):
+    """Interpreta la salida (texto) de smartctl -a -j, real o grabada"""
+    result = _empty_smart_result()
     if not out:
         result["raw_output"] = "No se pudo obtener datos SMART.\nIntenta ejecutar con sudo."
         return result
+    if re.search(r"is in (STANDBY|SLEEP) mode", out):
+        result["standby"] = True
+        result["raw_output"] = "El disco está en reposo (no se despertó)."
+        return result
 
     try:
         data = json.loads(out)
     except Exception:
         result["raw_output"] = out
         return result
+    return _parse_smart_json(data)
+
+# Atributos con la vida útil restante en "value" (231 SSD Life Left,
+# 177 Wear Leveling Count, 202 Percent Lifetime Remaining)
+_LIFE_ATTR_IDS = frozenset((231, 202, 177))
+
+def _parse_smart_json(data):
+    """Convierte el JSON de smartctl (o su equivalente nativo) al dict de la UI"""
+    result = _empty_smart_result()
 
     # Health
     smart_status = data.get("smart_status", {})
@@ -409,41 +967,35 @@ def get_smart_data(dev_path):
 
     # SATA attributes
     attrs = data.get("ata_smart_attributes", {}).get("table", [])
+    out  = result["attributes"]
+    life = None
     for a in attrs:
-        # Caution threshold check
+        aid  = a.get("id", 0)
         val  = a.get("value", 0)
         worst= a.get("worst", 0)
         thresh=a.get("thresh", 0)
-        raw  = a.get("raw", {}).get("value", 0)
+        raw  = a.get("raw")
+        # Caution threshold check
         flag = "Bueno"
         if worst <= thresh and thresh > 0:
             flag = "Precaución" if val > thresh else "Malo"
-        result["attributes"].append({
-            "id":    f"{a.get('id', 0):03d}",
+        out.append({
+            "id":    f"{aid:03d}",
             "name":  a.get("name", ""),
             "flag":  flag,
             "value": val,
             "worst": worst,
             "thresh":thresh,
-            "raw":   raw,
+            "raw":   raw.get("value", 0) if raw else 0,
         })
+        # SATA: vida útil — igual que CrystalDiskInfo (el primero de la tabla)
+        if life is None and aid in _LIFE_ATTR_IDS and type(val) is int and 0 <= val <= 100:
+            life = val
 
-    # SATA: vida útil — igual que CrystalDiskInfo
-    # Prioridad: attr 231 (SSD Life Left) > 177 (Wear Leveling Count) > 202
     if attrs:
-        life_ids = {231: True, 202: True, 177: True}
-        for a in result["attributes"]:
-            try:
-                aid = int(a["id"])
-            except (ValueError, TypeError):
-                continue
-            if aid in life_ids:
-                v = a["value"]
-                if isinstance(v, int) and 0 <= v <= 100:
-                    result["life_percent"] = v
-                    break
+        result["life_percent"] = life
         # Si no encontró atributo específico, HDD = 100%
-        if result["life_percent"] is None and result["health"] != "Desconocido":
+        if life is None and result["health"] != "Desconocido":
             result["life_percent"] = 100
 
     # NVMe log
@@ -501,197 +1053,1445 @@ def get_smart_data(dev_path):
 
     return result
 
-def _parse_lsblk_size(size_str):
-    """Parsea tamaño de lsblk (ej: '500G', '1.8T', '512M') a GB"""
-    if not size_str or size_str == "?":
-        return None
+def _disk_identity(dev_path):
+    """Serial / WWN del disco leído de sysfs (sin sudo ni subprocess).
+
+    Se usa junto con la ruta como clave de caché: si en /dev/sdb aparece
+    otro disco tras un hot-swap, la identidad cambia.
+    """
+    name = os.path.basename(dev_path)
+    for rel in ("wwid", "device/wwid", "device/serial"):
+        ident = _read_file(f"/sys/block/{name}/{rel}")
+        if ident:
+            return ident
     try:
-        size_str = size_str.strip()
-        multipliers = {"B": 1e-9, "K": 1e-6, "M": 1e-3, "G": 1.0, "T": 1000.0, "P": 1e6}
-        suffix = size_str[-1].upper()
-        if suffix in multipliers:
-            return float(size_str[:-1]) * multipliers[suffix]
-        return float(size_str) / 1e9
-    except (ValueError, IndexError):
-        return None
+        # SCSI VPD página 0x80: 4 bytes de cabecera + número de serie
+        raw = Path(f"/sys/block/{name}/device/vpd_pg80").read_bytes()
+        return raw[4:].decode("ascii", "replace").strip()
+    except Exception:
+        return ""
 
 
-def get_disk_usage(dev_path):
-    """Returns dict with partition info for the given disk using lsblk + psutil"""
-    disk_name = os.path.basename(dev_path)   # e.g. "sda", "nvme0n1"
-    partitions_info = []
+class SmartCache:
+    """Caché LRU con TTL para los resultados de get_smart_data.
 
-    try:
-        # Get full partition tree via lsblk
-        out = run_cmd(["lsblk", "-J", "-o", "NAME,SIZE,FSTYPE,MOUNTPOINTS,LABEL,TYPE,PARTLABEL", dev_path])
-        data = json.loads(out)
-        devices = data.get("blockdevices", [])
-        if not devices:
+    La clave es (ruta, serial/WWN). Las lecturas simultáneas del mismo disco
+    (barrido + clic del usuario) esperan a una sola ejecución de smartctl.
+    Los dicts devueltos se comparten: tratarlos como sólo lectura.
+    """
+
+    def __init__(self, ttl=SMART_CACHE_TTL, max_entries=SMART_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries  = OrderedDict()   # (path, ident) -> data
+        self._loading  = {}              # (path, ident) -> [Lock, hilos usándolo]
+        self._lock     = threading.Lock()
+
+    def get(self, dev_path, max_age=None):
+        """Resultado en caché si es más nuevo que max_age (por defecto el TTL)"""
+        key = (dev_path, _disk_identity(dev_path))
+        with self._lock:
+            return self._get(key, self.ttl if max_age is None else max_age)
+
+    def _get(self, key, max_age):
+        data = self._entries.get(key)
+        if data is None:
             return None
+        if time.time() - data["read_at"] > max_age:
+            return None    # vencida, pero se conserva como "último valor conocido"
+        self._entries.move_to_end(key)
+        return data
+
+    def last(self, dev_path):
+        """Último resultado guardado del disco aunque haya vencido el TTL"""
+        key = (dev_path, _disk_identity(dev_path))
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, dev_path, data, ident=None):
+        if ident is None:
+            ident = _disk_identity(dev_path)
+        data["read_at"] = time.time()
+        with self._lock:
+            self._entries[(dev_path, ident)] = data
+            self._entries.move_to_end((dev_path, ident))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dev_path=None):
+        """Olvida un disco (hotplug) o toda la caché (dev_path=None)"""
+        with self._lock:
+            if dev_path is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == dev_path]:
+                del self._entries[key]
+
+    def read(self, dev_path, loader, refresh=False):
+        """Devuelve loader(dev_path) pasando por la caché"""
+        key = (dev_path, _disk_identity(dev_path))
+        with self._lock:
+            if not refresh:
+                data = self._get(key, self.ttl)
+                if data is not None:
+                    return data
+            loading = self._loading.setdefault(key, [threading.Lock(), 0])
+            loading[1] += 1
+            requested = time.time()
+        try:
+            with loading[0]:
+                # Si otro hilo leyó el disco mientras esperábamos, reutilizarlo
+                with self._lock:
+                    data = self._entries.get(key)
+                if data is not None and data["read_at"] >= requested:
+                    return data
+                data = loader(dev_path)
+                if not data.get("standby"):
+                    self.put(dev_path, data, ident=key[1])
+            return data
+        finally:
+            # El último hilo suelta el lock: con hotplug y cambios de disco
+            # las claves no se repiten y _loading crecería sin límite
+            with self._lock:
+                loading[1] -= 1
+                if not loading[1]:
+                    self._loading.pop(key, None)
+
+
+SMART_CACHE = SmartCache()
 
-        def collect_children(node):
-            results = []
-            for child in node.get("children", []):
-                ntype = child.get("type", "")
-                if ntype in ("part", "lvm", "crypt", "dm"):
-                    mounts = child.get("mountpoints", []) or []
-                    mounts = [m for m in mounts if m]
-                    fstype = child.get("fstype") or ""
-                    label  = child.get("label") or child.get("partlabel") or child.get("name","")
-                    size   = child.get("size","?")
-                    parsed_gb = _parse_lsblk_size(size)
-                    part   = {
-                        "name":    child.get("name",""),
-                        "size":    size,
-                        "fstype":  fstype,
-                        "label":   label,
-                        "mounts":  mounts,
-                        "used_gb": None,
-                        "free_gb": None,
-                        "total_gb": parsed_gb,
-                        "percent": None,
-                    }
-                    # Try to get usage from mount point
-                    for mp in mounts:
-                        try:
-                            u = psutil.disk_usage(mp)
-                            part["used_gb"]  = u.used  / 1e9
-                            part["free_gb"]  = u.free  / 1e9
-                            part["total_gb"] = u.total / 1e9
-                            part["percent"]  = u.percent
-                            break
-                        except Exception:
-                            pass
-                    results.append(part)
-                # Recurse into LVM/LUKS children
-                results.extend(collect_children(child))
-            return results
-
-        disk_node = devices[0]
-        partitions_info = collect_children(disk_node)
-
-        # Also try raw disk usage if no partitions found
-        if not partitions_info:
-            for mp in ["/", "/boot", "/home"]:
-                try:
-                    u = psutil.disk_usage(mp)
-                    partitions_info.append({
-                        "name": disk_name,
-                        "size": f"{u.total/1e9:.1f}G",
-                        "fstype": "",
-                        "label": "/",
-                        "mounts": [mp],
-                        "used_gb": u.used/1e9,
-                        "free_gb": u.free/1e9,
-                        "total_gb": u.total/1e9,
-                        "percent": u.percent,
-                    })
-                    break
-                except Exception:
-                    pass
 
-    except Exception:
-        # Pure psutil fallback
+# ─────────────────────────────────────────────
+#  S.M.A.R.T. HISTORY (almacén binario compacto)
+# ─────────────────────────────────────────────
+# Un archivo por disco: cabecera de 8 bytes y registros fijos "<Hi" (6 bytes).
+#   clave 0   -> marco de tiempo: segundos desde el marco anterior
+#   clave > 0 -> delta de esa métrica respecto a su valor anterior
+#   clave | HKEY_ABS, dos registros seguidos -> valor absoluto "<q" de la
+#                métrica (o del tiempo), mitad baja y mitad alta
+# Sólo se escriben las métricas que cambiaron. Un delta que no cabe en 32 bits
+# (raws de 48 bits, valores que cambian de signo) se guarda como absoluto, así
+# que ninguna métrica ocupa más de 12 bytes por muestra. Una muestra típica
+# (marco + horas encendido + temperatura) ocupa 18 bytes.
+
+HISTORY_MAGIC = b"LHWH\x01\x00\x00\x00"
+_HIST_REC     = struct.Struct("<Hi")
+_I32_MAX      = 2**31 - 1
+_I64_MAX      = 2**63 - 1
+HKEY_ABS      = 0x8000
+
+HKEY_TEMP        = 1
+HKEY_LIFE        = 2
+HKEY_POWER_HOURS = 3
+HKEY_POWER_COUNT = 4
+HKEY_WRITES_MB   = 5
+HKEY_HEALTH      = 6
+HKEY_ATTR_VALUE  = 0x100    # + id de atributo ATA
+HKEY_ATTR_WORST  = 0x200
+HKEY_ATTR_RAW    = 0x300
+HKEY_NVME        = 0x400    # + índice en NVME_HISTORY_FIELDS
+
+
+def _hist_abs(lo, hi):
+    """Valor absoluto de un par de registros de escape (mitades con signo)"""
+    return hi << 32 | lo & 0xFFFFFFFF
+
+
+def _hist_records(keys, deltas):
+    """(fin, clave, valor, absoluto) de cada registro o par de escape.
+
+    Un escape sólo vale si sus dos mitades son consecutivas y llevan la
+    misma clave; una mitad suelta (escritura cortada) se salta. fin es el
+    índice tras el registro: un escape incompleto al final no se devuelve.
+    """
+    keys = array("H", keys)
+    n, i = len(keys), 0
+    while i < n:
+        key = keys[i]
+        if not key & HKEY_ABS:
+            yield i + 1, key, deltas[i], False
+            i += 1
+        elif i + 1 < n and keys[i + 1] == key:
+            yield i + 2, key ^ HKEY_ABS, _hist_abs(deltas[i], deltas[i + 1]), True
+            i += 2
+        else:
+            i += 1
+
+
+def _hist_orphan_escape(fd, end):
+    """True si el registro que acaba en end es la mitad suelta de un escape"""
+    first, run, key = len(HISTORY_MAGIC), 0, None
+    while end > first:
+        start = max(first, end - 64 * _HIST_REC.size)
+        chunk = os.pread(fd, end - start, start)
+        for off in range(len(chunk) - _HIST_REC.size, -1, -_HIST_REC.size):
+            k = struct.unpack_from("<H", chunk, off)[0]
+            if key is None:
+                if not k & HKEY_ABS:
+                    return False
+                key = k
+            if k != key:
+                return run % 2 == 1
+            run += 1
+        end = start
+    return run % 2 == 1
+
+
+_HEALTH_CODES = {"Desconocido": 0, "Bueno": 1, "Precaución": 2, "Malo": 3}
+
+NVME_HISTORY_FIELDS = (
+    "critical_warning", "temperature", "available_spare", "percentage_used",
+    "data_units_read", "data_units_written", "host_reads", "host_writes",
+    "controller_busy_time", "power_cycles", "power_on_hours",
+    "unsafe_shutdowns", "media_errors", "num_err_log_entries",
+)
+
+
+def smart_metrics(data):
+    """Resultado de get_smart_data -> {clave de historial: entero}"""
+    metrics = {HKEY_HEALTH: _HEALTH_CODES.get(data.get("health"), 0)}
+    for key, field in ((HKEY_TEMP, "temp"), (HKEY_LIFE, "life_percent"),
+                       (HKEY_POWER_HOURS, "power_on_hours"),
+                       (HKEY_POWER_COUNT, "power_on_count")):
+        if isinstance(data.get(field), int):
+            metrics[key] = data[field]
+    if data.get("total_writes") is not None:
+        metrics[HKEY_WRITES_MB] = int(data["total_writes"] * 1000)
+    for a in data.get("attributes", []):
+        try:
+            aid = int(a["id"])
+        except (ValueError, TypeError):
+            continue    # pseudo-atributos NVMe
+        for base, field in ((HKEY_ATTR_VALUE, "value"), (HKEY_ATTR_WORST, "worst"),
+                            (HKEY_ATTR_RAW, "raw")):
+            if isinstance(a.get(field), int):
+                metrics[base + aid] = a[field]
+    log = data.get("nvme_log") or {}
+    for i, field in enumerate(NVME_HISTORY_FIELDS):
+        if isinstance(log.get(field), int):
+            metrics[HKEY_NVME + i] = log[field]
+    return metrics
+
+
+def _safe_ident(ident):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", ident)[:120] or "unknown"
+
+
+class SmartHistory:
+    """Historial por disco, sólo-añadir, con deltas y lectura por mmap"""
+
+    def __init__(self, directory=HISTORY_DIR, interval=HISTORY_INTERVAL):
+        self.directory = directory
+        self.interval  = interval
+        self._state = {}    # ident -> [t del último marco, {clave: valor}]
+        self._lock  = threading.Lock()
+
+    def path(self, ident, suffix=".hist"):
+        return os.path.join(self.directory, _safe_ident(ident) + suffix)
+
+    def idents(self):
+        return sorted(os.path.basename(p)[:-5]
+                      for p in glob.glob(os.path.join(self.directory, "*.hist")))
+
+    @staticmethod
+    def _read(path, start=0):
+        """Registros desde el índice start (mmap) como columnas: (bytes de claves, deltas)"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return b"", array("i")
+        try:
+            size = os.fstat(fd).st_size
+            n = (size - len(HISTORY_MAGIC)) // _HIST_REC.size - start
+            if n <= 0:
+                return b"", array("i")
+            with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(HISTORY_MAGIC)] != HISTORY_MAGIC:
+                    return b"", array("i")
+                first = len(HISTORY_MAGIC) + start * _HIST_REC.size
+                body = mm[first:first + n * _HIST_REC.size]
+        finally:
+            os.close(fd)
+        # Transponer filas "<Hi" a columnas con slicing (en C, sin bucle Python)
+        keys = bytearray(2 * n)
+        keys[0::2] = body[0::6]
+        keys[1::2] = body[1::6]
+        deltas = bytearray(4 * n)
+        for i in range(4):
+            deltas[i::4] = body[2 + i::6]
+        return bytes(keys), array("i", bytes(deltas))
+
+    @staticmethod
+    def _positions(keys, key):
+        pat = re.compile(b"(?=" + re.escape(struct.pack("<H", key)) + b")")
+        return [m.start() >> 1 for m in pat.finditer(keys) if not m.start() & 1]
+
+    def _steps(self, keys, deltas, key):
+        """[(posición, valor)] de una clave: deltas acumulados y absolutos"""
+        absolute = self._positions(keys, key | HKEY_ABS)
+        firsts, i = set(), 0
+        while i < len(absolute):
+            # sólo dos mitades consecutivas; una suelta se salta
+            if i + 1 < len(absolute) and absolute[i + 1] == absolute[i] + 1:
+                firsts.add(absolute[i])
+                i += 2
+            else:
+                i += 1
+        out, v = [], 0
+        for pos in sorted(self._positions(keys, key) + list(firsts)):
+            if pos in firsts:
+                v = _hist_abs(deltas[pos], deltas[pos + 1])
+            else:
+                v += deltas[pos]
+            out.append((pos, v))
+        return out
+
+    def _replay(self, path):
+        """Recorre todo el archivo: (t del último marco, {clave: último valor})"""
+        keys, deltas = self._read(path)
+        t, values = 0, {}
+        for _end, key, v, absolute in _hist_records(keys, deltas):
+            if key == 0:
+                t = v if absolute else t + v
+            else:
+                values[key] = v if absolute else values.get(key, 0) + v
+        return t, values
+
+    def record(self, ident, metrics, ts=None, force=False):
+        """Añade una muestra; False si se omitió por el intervalo mínimo"""
+        if not self.directory or not ident:
+            return False
+        now = int(ts if ts is not None else time.time())
+        path = self.path(ident)
+        with self._lock:
+            state = self._state.get(ident)
+            if state is None:
+                t, values = self._replay(path)
+                state = self._state[ident] = [t, values]
+            last_t, values = state
+            if not force and last_t and now - last_t < self.interval:
+                return False
+
+            out = bytearray()
+            if not os.path.exists(path):
+                os.makedirs(self.directory, exist_ok=True)
+                out += HISTORY_MAGIC
+            self._pack(out, 0, now - last_t, now)
+            for key, v in metrics.items():
+                delta = v - values.get(key, 0)
+                if delta:
+                    self._pack(out, key, delta, v)
+                    values[key] = v
+            state[0] = now
+
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                torn = (size - len(HISTORY_MAGIC)) % _HIST_REC.size if size else 0
+                if size and _hist_orphan_escape(fd, size - torn):
+                    torn += _HIST_REC.size      # escape sin su segunda mitad
+                if torn:    # registro a medio escribir de una caída anterior
+                    os.ftruncate(fd, size - torn)
+                os.write(fd, bytes(out))
+            finally:
+                os.close(fd)
+        return True
+
+    @staticmethod
+    def _pack(out, key, delta, value=None):
+        if -_I32_MAX <= delta <= _I32_MAX:
+            out += _HIST_REC.pack(key, delta)
+            return
+        # No cabe en un registro: valor absoluto de 64 bits en dos registros
+        lo, hi = struct.unpack("<ii", struct.pack("<q", max(-_I64_MAX, min(_I64_MAX, value))))
+        out += _HIST_REC.pack(key | HKEY_ABS, lo)
+        out += _HIST_REC.pack(key | HKEY_ABS, hi)
+
+    def load(self, ident, keys):
+        """{clave: (tiempos, valores)} de los puntos en que cambió cada métrica.
+
+        Los valores son escalonados: cada punto vale hasta el siguiente.
+        Sólo se decodifican los registros de las claves pedidas.
+        """
+        raw_keys, deltas = self._read(self.path(ident))
+        if not raw_keys:
+            return {}
+        frames, frame_t = [], array("q")
+        for pos, t in self._steps(raw_keys, deltas, 0):
+            frames.append(pos)
+            frame_t.append(t)
+
+        series = {}
+        for key in keys:
+            ts, vs = array("q"), array("q")
+            for pos, v in self._steps(raw_keys, deltas, key):
+                i = bisect_right(frames, pos) - 1
+                when = frame_t[i] if i >= 0 else 0
+                if ts and ts[-1] == when:
+                    vs[-1] = v    # delta partido en varios registros
+                else:
+                    ts.append(when)
+                    vs.append(v)
+            if ts:
+                series[key] = (ts, vs)
+        return series
+
+    def append_log(self, ident, suffix, entries):
+        """Añade entradas (dicts) a <ident><suffix> como JSON Lines"""
+        if not self.directory or not ident or not entries:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        text = "".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in entries)
+        with self._lock, open(self.path(ident, suffix), "a") as f:
+            f.write(text)
+        return True
+
+    def read_log(self, ident, suffix):
+        """Entradas de <ident><suffix>, ignorando líneas corruptas"""
+        if not self.directory or not ident:
+            return []
+        out = []
         try:
-            parts = psutil.disk_partitions(all=False)
-            for p in parts:
-                pdev = os.path.basename(p.device)
-                if pdev.startswith(disk_name) and len(pdev) > len(disk_name):
+            with open(self.path(ident, suffix)) as f:
+                for line in f:
                     try:
-                        u = psutil.disk_usage(p.mountpoint)
-                        partitions_info.append({
-                            "name": pdev,
-                            "size": f"{u.total/1e9:.1f}G",
-                            "fstype": p.fstype,
-                            "label": p.mountpoint,
-                            "mounts": [p.mountpoint],
-                            "used_gb": u.used/1e9,
-                            "free_gb": u.free/1e9,
-                            "total_gb": u.total/1e9,
-                            "percent": u.percent,
-                        })
-                    except Exception:
+                        out.append(json.loads(line))
+                    except ValueError:
                         pass
-        except Exception:
+        except OSError:
             pass
+        return out
 
-    return partitions_info if partitions_info else None
+    def last_time(self, ident):
+        with self._lock:
+            state = self._state.get(ident)
+        if state is not None:
+            return state[0]
+        return self._replay(self.path(ident))[0]
 
 
-def _read_file(path, default=""):
-    try:
-        return Path(path).read_text().strip()
-    except Exception:
-        return default
+SMART_HISTORY = SmartHistory()
 
 
-def get_cpu_info():
-    """Detección completa de CPU desde /proc/cpuinfo y dmidecode"""
-    info = {
-        "model": "Desconocido", "vendor": "", "family": "", "stepping": "",
-        "cores": 0, "threads": 0, "sockets": 0,
-        "freq_base": 0, "freq_max": 0, "freq_min": 0,
-        "cache_l1d": "", "cache_l1i": "", "cache_l2": "", "cache_l3": "",
-        "flags": [], "microcode": "", "architecture": "",
-        "tdp": "", "codename": "", "process_node": "",
-        "virtualization": "",
-    }
+def _history_ident(dev_path):
+    return _disk_identity(dev_path) or os.path.basename(dev_path)
 
-    try:
-        cpuinfo = Path("/proc/cpuinfo").read_text()
-        blocks = [b for b in cpuinfo.split("\n\n") if b.strip()]
-        sockets = set()
-        for blk in blocks:
-            d = {}
-            for line in blk.split("\n"):
-                if ":" in line:
-                    k, _, v = line.partition(":")
-                    d[k.strip()] = v.strip()
-            sockets.add(d.get("physical id", "0"))
 
-        # First CPU block
-        d = {}
-        for line in blocks[0].split("\n"):
-            if ":" in line:
-                k, _, v = line.partition(":")
-                d[k.strip()] = v.strip()
+def _load_and_record(dev_path):
+    """Loader de SMART_CACHE: lee el disco y guarda la muestra en el historial"""
+    data = get_smart_data(dev_path)
+    if data["attributes"] or data["temp"] is not None:
+        try:
+            SMART_HISTORY.record(_history_ident(dev_path), smart_metrics(data))
+        except OSError:
+            pass    # sin permisos / disco lleno: el historial es opcional
+    if data.get("nvme_log") and not SMART_REPLAY_DIR:
+        try:
+            NVME_LOGS.ingest(dev_path, data["nvme_log"])
+        except OSError:
+            pass
+    return data
 
-        info["model"]       = d.get("model name", "Desconocido")
-        info["vendor"]      = d.get("vendor_id", "")
-        info["family"]      = d.get("cpu family", "")
-        info["stepping"]    = d.get("stepping", "")
-        info["microcode"]   = d.get("microcode", "")
-        info["flags"]       = d.get("flags", "").split()[:20]  # primeras 20
-        info["cores"]       = psutil.cpu_count(logical=False) or 1
-        info["threads"]     = psutil.cpu_count(logical=True) or 1
-        info["sockets"]     = len(sockets) or 1
 
-        freq = psutil.cpu_freq()
-        if freq:
-            info["freq_base"] = round(freq.current)
-            info["freq_max"]  = round(freq.max)
-            info["freq_min"]  = round(freq.min)
+# ─────────────────────────────────────────────
+#  NVMe ERROR / SELF-TEST LOGS
+# ─────────────────────────────────────────────
+def _read_nvme_log_smartctl(dev_path, option, key):
+    out = run_smartctl(["-l", option, "-j", dev_path])
+    try:
+        return json.loads(out).get(key)
+    except ValueError:
+        return None
 
-        # Cache sizes
-        for blk in blocks:
-            for line in blk.split("\n"):
-                if "cache size" in line.lower():
-                    info["cache_l3"] = line.split(":")[1].strip()
+
+def _read_nvme_log(dev_path, native, option, key):
+    log = None
+    if SMART_BACKEND != "smartctl" and dev_path not in _NVME_NATIVE_LOGS_FAILED:
+        log = native()
+        if log is None and SMART_BACKEND != "native":
+            _NVME_NATIVE_LOGS_FAILED.add(dev_path)
+    if log is None and SMART_BACKEND != "native":
+        log = _read_nvme_log_smartctl(dev_path, option, key)
+    return log
+
+
+def read_nvme_error_log(dev_path, count):
+    """Log de errores 0x01 (count entradas) por ioctl o smartctl"""
+    return _read_nvme_log(dev_path, lambda: read_nvme_error_log_native(dev_path, count),
+                          f"error,{count}", "nvme_error_information_log")
+
+
+def read_nvme_self_test_log(dev_path):
+    return _read_nvme_log(dev_path, lambda: read_nvme_self_test_log_native(dev_path),
+                          "selftest", "nvme_self_test_log")
+
+
+def _self_test_key(entry):
+    return (entry.get("power_on_hours"), entry.get("self_test_code", {}).get("value"),
+            entry.get("self_test_result", {}).get("value"), entry.get("segment"))
+
+
+class NvmeLogStore:
+    """Logs NVMe de errores y autotests guardados junto al historial.
+
+    Las entradas se añaden a <ident>.nvme-errors / .nvme-selftests (JSON
+    Lines). Del log de errores sólo se piden las entradas posteriores al
+    último error_count guardado: si num_err_log_entries no cambió no hay
+    ioctl, tenga el disco cero errores o miles.
+
+    El estado de los autotests sólo está en el propio log 0x06, así que se
+    relee cuando puede haber cambiado: la primera vez, mientras hay un test
+    en curso, cuando avanzan las horas de encendido (cada resultado nuevo
+    lleva las horas del momento) o tras self_test_changed().
+    """
+    ERRORS     = ".nvme-errors"
+    SELF_TESTS = ".nvme-selftests"
+
+    def __init__(self, history=None):
+        self.history = history or SMART_HISTORY
+        # ident -> {"errors": último error_count, "self_test": clave del último,
+        #           "st_hours": horas de la última lectura de 0x06 (-1 = releer),
+        #           "st_running": había un test en curso}
+        self._state = {}
+        self._lock  = threading.Lock()
+
+    def _get_state(self, ident):
+        state = self._state.get(ident)
+        if state is None:
+            errors = self.history.read_log(ident, self.ERRORS)
+            tests  = self.history.read_log(ident, self.SELF_TESTS)
+            state = self._state[ident] = {
+                "errors":    max((e.get("error_count", 0) for e in errors), default=0),
+                "self_test": _self_test_key(tests[-1]) if tests else None,
+                "st_hours":  -1,
+                "st_running": False,
+            }
+        return state
+
+    def self_test_changed(self, dev_path):
+        """Fuerza releer el log de autotests en el próximo ingest"""
+        with self._lock:
+            state = self._state.get(_history_ident(dev_path))
+            if state is not None:
+                state["st_hours"] = -1
+
+    def ingest(self, dev_path, nvme_log):
+        """Guarda las entradas nuevas; devuelve (errores nuevos, autotests nuevos)"""
+        ident = _history_ident(dev_path)
+        if not self.history.directory or not ident:
+            return 0, 0
+        hours = nvme_log.get("power_on_hours")
+        with self._lock:
+            state = self._get_state(ident)
+            seen = state["errors"]
+            read_tests = state["st_running"] or state["st_hours"] != hours
+        new_errors = new_tests = 0
+
+        total = nvme_log.get("num_err_log_entries") or 0
+        if total > seen:
+            log = read_nvme_error_log(dev_path, total - seen)
+            if log is not None:
+                fresh = [e for e in log.get("table", []) if e.get("error_count", 0) > seen]
+                fresh.sort(key=lambda e: e["error_count"])
+                now = int(time.time())
+                for e in fresh:
+                    e["read_at"] = now
+                self.history.append_log(ident, self.ERRORS, fresh)
+                new_errors = len(fresh)
+                with self._lock:
+                    state["errors"] = max([total, seen] + [e["error_count"] for e in fresh])
+
+        log = read_nvme_self_test_log(dev_path) if read_tests else None
+        if log is not None:
+            with self._lock:
+                state["st_hours"] = hours
+                state["st_running"] = bool(log.get("current_self_test_operation", {}).get("value"))
+            table = log.get("table", [])
+            fresh = []
+            for e in table:                     # la más reciente primero
+                if _self_test_key(e) == state["self_test"]:
                     break
-    except Exception:
-        pass
+                fresh.append(e)
+            if fresh:
+                fresh.reverse()
+                self.history.append_log(ident, self.SELF_TESTS, fresh)
+                new_tests = len(fresh)
+                with self._lock:
+                    state["self_test"] = _self_test_key(table[0])
+        return new_errors, new_tests
 
-    # Cache via /sys
-    base = "/sys/devices/system/cpu/cpu0/cache"
-    if os.path.isdir(base):
-        for idx_dir in sorted(glob.glob(f"{base}/index*")):
-            try:
-                level = _read_file(f"{idx_dir}/level")
-                ctype = _read_file(f"{idx_dir}/type")
-                size  = _read_file(f"{idx_dir}/size")
-                if level == "1" and ctype == "Data":        info["cache_l1d"] = size
-                elif level == "1" and ctype == "Instruction": info["cache_l1i"] = size
-                elif level == "2":                           info["cache_l2"]  = size
+    def errors(self, ident, limit=500):
+        """Entradas guardadas del log de errores, la más reciente primero"""
+        return self.history.read_log(ident, self.ERRORS)[-limit:][::-1]
+
+    def self_tests(self, ident, limit=500):
+        return self.history.read_log(ident, self.SELF_TESTS)[-limit:][::-1]
+
+
+NVME_LOGS = NvmeLogStore()
+
+
+# ─────────────────────────────────────────────
+#  WEAR / FAILURE FORECAST
+# ─────────────────────────────────────────────
+def _linear_fit(ts, vs):
+    """Pendiente por segundo de mínimos cuadrados (forma cerrada); None si no hay tendencia"""
+    n = len(ts)
+    if n < 2:
+        return None
+    t0 = ts[0]
+    xs = [t - t0 for t in ts]
+    sx, sy = sum(xs), sum(vs)
+    den = n * sum(map(mul, xs, xs)) - sx * sx
+    if den <= 0:
+        return None
+    return (n * sum(map(mul, xs, vs)) - sx * sy) / den
+
+
+def _days_until(current, slope_per_day, target):
+    """Días hasta que una métrica con esa pendiente alcance target (None = nunca)"""
+    if not slope_per_day:
+        return None
+    days = (target - current) / slope_per_day
+    return days if days >= 0 else None
+
+
+class SmartForecaster:
+    """Pronóstico de desgaste a partir del historial S.M.A.R.T.
+
+    Mantiene en memoria las series de las pocas métricas que usa, recortadas
+    a la ventana, y en cada actualización sólo decodifica los registros
+    nuevos del archivo, así que refrescar cientos de discos tras un barrido
+    cuesta milisegundos.
+    """
+
+    KEYS = (HKEY_LIFE, HKEY_ATTR_RAW + 5, HKEY_ATTR_RAW + 197, HKEY_WRITES_MB)
+
+    def __init__(self, history=None, window_days=FORECAST_WINDOW_DAYS):
+        self.history = history or SMART_HISTORY
+        self.window  = window_days * 86400
+        self._drives = {}    # ident -> {"read", "t", "values", "points"}
+        self._lock   = threading.Lock()
+
+    def _update(self, ident):
+        st = self._drives.get(ident)
+        if st is None:
+            st = self._drives[ident] = {
+                "read": 0, "t": 0, "values": {},
+                "points": {k: (array("q"), array("q")) for k in self.KEYS},
+            }
+        keys, deltas = self.history._read(self.history.path(ident), st["read"])
+        if not keys:
+            return st
+        st["trends"] = None    # hay datos nuevos: recalcular regresiones
+        t, values, points = st["t"], st["values"], st["points"]
+        read = 0
+        for read, key, v, absolute in _hist_records(keys, deltas):
+            if key == 0:
+                t = v if absolute else t + v
+                continue
+            if key not in points:
+                continue
+            v = values[key] = v if absolute else values.get(key, 0) + v
+            ts, vs = points[key]
+            if ts and ts[-1] == t:
+                vs[-1] = v
+            else:
+                ts.append(t)
+                vs.append(v)
+        st["t"] = t
+        # Un escape sin su segunda mitad se vuelve a leer en la próxima pasada
+        st["read"] += read
+        # Fuera de la ventana sólo hace falta el último punto (el valor vigente
+        # al inicio, ver _trend): sin esto un proceso de meses crece sin límite
+        for ts, vs in points.values():
+            i = bisect_left(ts, t - self.window)
+            if i > 1:
+                del ts[:i - 1]
+                del vs[:i - 1]
+        return st
+
+    def _trend(self, st, key):
+        """(valor actual, pendiente por día) de una métrica dentro de la ventana"""
+        ts, vs = st["points"][key]
+        if not ts:
+            return None, None
+        i = bisect_left(ts, st["t"] - self.window)
+        # Serie escalonada: el valor vigente al inicio de la ventana y al final
+        xs, ys = list(ts[i:]), list(vs[i:])
+        if i > 0:
+            xs.insert(0, st["t"] - self.window)
+            ys.insert(0, vs[i - 1])
+        if xs[-1] < st["t"]:
+            xs.append(st["t"])
+            ys.append(vs[-1])
+        slope = _linear_fit(xs, ys)
+        return vs[-1], (slope * 86400 if slope is not None else None)
+
+    def forecast(self, ident, now=None):
+        """Pronóstico de un disco, o None si no hay historial suficiente"""
+        if not self.history.directory:
+            return None
+        with self._lock:
+            st = self._update(ident)
+            if not st["t"]:
+                return None
+            if st.get("trends") is None:
+                st["trends"] = [self._trend(st, k) for k in self.KEYS]
+            ((life, life_slope), (realloc, re_slope),
+             (pending, pend_slope), (_, writes_slope)) = st["trends"]
+            last_t = st["t"]
+
+        now = now or time.time()
+        ahead = (now - last_t) / 86400    # días desde la última muestra
+
+        def when(days):
+            if days is None or days - ahead > 36500:
+                return None, None
+            left = max(0.0, days - ahead)
+            return left, datetime.fromtimestamp(now + left * 86400).strftime("%Y-%m-%d")
+
+        fc = {"life_days": None, "life_date": None,
+              "realloc_per_30d": None, "realloc_date": None,
+              "pending_per_30d": None, "pending_date": None,
+              "writes_gb_day": None}
+        if life is not None and life_slope is not None and life_slope < 0:
+            fc["life_days"], fc["life_date"] = when(_days_until(life, life_slope, 0))
+        if re_slope is not None and re_slope > 0:
+            fc["realloc_per_30d"] = re_slope * 30
+            if realloc < FORECAST_REALLOC_LIMIT:
+                _, fc["realloc_date"] = when(_days_until(realloc, re_slope, FORECAST_REALLOC_LIMIT))
+        if pend_slope is not None and pend_slope > 0:
+            fc["pending_per_30d"] = pend_slope * 30
+            if pending < FORECAST_PENDING_LIMIT:
+                _, fc["pending_date"] = when(_days_until(pending, pend_slope, FORECAST_PENDING_LIMIT))
+        if writes_slope is not None and writes_slope > 0:
+            fc["writes_gb_day"] = writes_slope / 1000
+
+        fc["warn"] = bool(
+            (fc["life_days"] is not None and fc["life_days"] < FORECAST_WARN_DAYS)
+            or fc["realloc_date"] or fc["pending_date"]
+        )
+        return fc
+
+    def forecast_many(self, idents, now=None):
+        now = now or time.time()
+        return {ident: self.forecast(ident, now) for ident in idents}
+
+
+def forecast_text(fc):
+    """(texto corto para HealthBadge, detalle para el tooltip)"""
+    if not fc:
+        return "", ""
+    lines = []
+    if fc["life_date"]:
+        lines.append(f"Vida útil 0% ≈ {fc['life_date']} ({fc['life_days']:.0f} días)")
+    if fc["realloc_per_30d"]:
+        extra = f", {FORECAST_REALLOC_LIMIT} el {fc['realloc_date']}" if fc["realloc_date"] else ""
+        lines.append(f"Sectores reasignados: +{fc['realloc_per_30d']:.1f}/mes{extra}")
+    if fc["pending_per_30d"]:
+        extra = f", {FORECAST_PENDING_LIMIT} el {fc['pending_date']}" if fc["pending_date"] else ""
+        lines.append(f"Sectores pendientes: +{fc['pending_per_30d']:.1f}/mes{extra}")
+    if fc["writes_gb_day"]:
+        lines.append(f"Escrituras: {fc['writes_gb_day']:.1f} GB/día")
+    if fc["realloc_date"] or fc["pending_date"]:
+        short = "⚠ sectores"
+    elif fc["life_date"]:
+        short = f"≈ {fc['life_date'][:7]}"
+    else:
+        short = ""
+    return short, "\n".join(lines)
+
+
+SMART_FORECASTER = SmartForecaster()
+
+
+# Lecturas omitidas porque el disco estaba en reposo (arranques evitados)
+SPINUPS_AVOIDED = 0
+_spinup_lock = threading.Lock()
+
+
+def _standby_result(dev_path):
+    """Últimos datos conocidos de un disco dormido, marcados como en reposo"""
+    global SPINUPS_AVOIDED
+    with _spinup_lock:
+        SPINUPS_AVOIDED += 1
+    last = SMART_CACHE.last(dev_path)
+    data = dict(last) if last else _empty_smart_result()
+    data["standby"] = True
+    if not last:
+        data["raw_output"] = "El disco está en reposo (no se despertó)."
+    return data
+
+
+def read_smart(dev_path, refresh=False):
+    """get_smart_data a través de SMART_CACHE (refresh=True fuerza la lectura).
+
+    Nunca despierta un disco en reposo: en ese caso devuelve los últimos
+    valores conocidos con data["standby"] = True.
+    """
+    if not refresh:
+        data = SMART_CACHE.get(dev_path)
+        if data is not None:
+            return data
+    if not SMART_REPLAY_DIR and get_power_mode(dev_path) == "standby":
+        return _standby_result(dev_path)
+    data = SMART_CACHE.read(dev_path, _load_and_record, refresh=refresh)
+    if data.get("standby"):    # se durmió entre la comprobación y smartctl
+        return _standby_result(dev_path)
+    return data
+
+
+def smart_sweep(disks, on_result, max_workers=None, cancel=None):
+    """Lee S.M.A.R.T. de todos los discos en paralelo con un pool acotado.
+
+    on_result(disk, data) se llama desde los hilos del pool a medida que
+    termina cada disco, así el barrido tarda lo que el disco más lento y
+    no la suma de todos. Si cancel (threading.Event) se activa, los discos
+    pendientes se omiten.
+    """
+    workers = max(1, min(max_workers or SMART_SWEEP_WORKERS, len(disks) or 1))
+
+    def _read(disk):
+        if cancel is not None and cancel.is_set():
+            return None
+        try:
+            return read_smart(disk["path"])
+        except Exception as e:
+            data = _empty_smart_result()
+            data["raw_output"] = f"Error leyendo S.M.A.R.T.: {e}"
+            return data
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_read, d): d for d in disks}
+        for fut in as_completed(futures):
+            data = fut.result()
+            if data is not None:
+                on_result(futures[fut], data)
+
+
+def _hwmon_temp_input(name):
+    """temp1_input de hwmon para un disco: drivetemp (SATA) o NVMe; "" si no hay"""
+    patterns = [f"/sys/block/{name}/device/hwmon/hwmon*/temp1_input"]
+    m = re.match(r"(nvme\d+)n\d+$", name)
+    if m:
+        ctrl = m.group(1)
+        patterns += [f"/sys/class/nvme/{ctrl}/hwmon*/temp1_input",
+                     f"/sys/class/nvme/{ctrl}/device/hwmon/hwmon*/temp1_input"]
+    for pat in patterns:
+        found = sorted(glob.glob(pat))
+        if found:
+            return found[0]
+    return ""
+
+
+class DiskTempSampler:
+    """Temperatura de los discos vía hwmon, sin smartctl.
+
+    Los temp1_input quedan abiertos y se releen con pread, así una muestra
+    de todos los discos cuesta unas pocas llamadas al sistema.
+
+    En los discos rotativos drivetemp manda comandos ATA al disco y eso
+    reinicia su temporizador de reposo (-S / APM): se leen sólo cada
+    hdd_interval segundos y antes se comprueba con CHECK POWER MODE, que
+    no cuenta como actividad, que el disco no esté dormido.
+    """
+
+    def __init__(self, disks=(), hdd_interval=HDD_TEMP_INTERVAL, power_mode=None):
+        self._fds = {}          # nombre de disco -> fd de temp1_input
+        self._rotational = {}   # nombre de disco rotativo -> próxima lectura (monotonic)
+        self.hdd_interval = hdd_interval
+        self._power_mode = power_mode or get_power_mode
+        self.set_disks(disks)
+
+    def set_disks(self, disks):
+        self.close()
+        for disk in disks:
+            self.add(disk["name"], disk.get("rotational"))
+
+    def add(self, name, rotational=None):
+        """Empieza a muestrear un disco (hotplug); no hace nada sin sensor"""
+        path = _hwmon_temp_input(name)
+        if not path or name in self._fds:
+            return
+        try:
+            self._fds[name] = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        if rotational is None:
+            rotational = _read_file(f"/sys/block/{name}/queue/rotational") != "0"
+        if rotational:
+            self._rotational[name] = 0.0
+
+    def remove(self, name):
+        self._rotational.pop(name, None)
+        fd = self._fds.pop(name, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def has(self, name):
+        return name in self._fds
+
+    def sample(self, skip=(), now=None):
+        """{nombre: °C} de los discos con sensor hwmon que toca leer ahora
+        (omitiendo los de skip)"""
+        now = time.monotonic() if now is None else now
+        temps = {}
+        for name, fd in self._fds.items():
+            if name in skip:
+                continue    # drivetemp podría despertar un disco en reposo
+            if name in self._rotational:
+                if now < self._rotational[name]:
+                    continue
+                self._rotational[name] = now + self.hdd_interval
+                if self._power_mode(f"/dev/{name}") == "standby":
+                    continue
+            try:
+                temps[name] = int(os.pread(fd, 16, 0)) // 1000
+            except (OSError, ValueError):
+                pass
+        return temps
+
+    def close(self):
+        for fd in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds = {}
+        self._rotational = {}
+
+
+# Muestras de actividad (una por segundo) que se guardan por disco
+IOSTAT_HISTORY = 120
+
+
+class DiskStatsSampler:
+    """Actividad de los discos desde /proc/diskstats, como iostat -x.
+
+    Cada sample() hace una sola lectura del archivo (pread sobre un fd
+    abierto) para todos los discos y calcula las diferencias con la
+    muestra anterior. Los resultados se guardan en un deque por disco.
+    """
+
+    # campos de /proc/diskstats tras major, minor y nombre
+    RD_IOS, RD_MERGES, RD_SECT, RD_TICKS, WR_IOS, WR_MERGES, WR_SECT, WR_TICKS, \
+        IN_FLIGHT, IO_TICKS, QUEUE_TICKS = range(11)
+
+    def __init__(self, path="/proc/diskstats", history=IOSTAT_HISTORY):
+        self.path = path
+        self.history = history
+        self._fd = None
+        self._names = None      # None = todos los dispositivos
+        self._prev = {}         # nombre -> tupla de contadores
+        self._prev_t = None
+        self.series = {}        # nombre -> deque de muestras
+
+    def set_disks(self, disks):
+        self._names = {d["name"] for d in disks}
+        for name in list(self.series):
+            if name not in self._names:
+                del self.series[name]
+                self._prev.pop(name, None)
+
+    def _read(self):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY)
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(self._fd, 65536, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+        return b"".join(chunks)
+
+    def sample(self, now=None):
+        """{nombre: muestra} con r_iops, w_iops, r_mbs, w_mbs, await_ms,
+        util y in_flight; vacío en la primera llamada (no hay diferencias)"""
+        now = time.monotonic() if now is None else now
+        try:
+            text = self._read()
+        except OSError:
+            return {}
+        names = self._names
+        cur = {}
+        for line in text.split(b"\n"):
+            fields = line.split()
+            if len(fields) < 14:
+                continue
+            name = fields[2].decode()
+            if names is None or name in names:
+                cur[name] = tuple(map(int, fields[3:14]))
+
+        prev, prev_t = self._prev, self._prev_t
+        self._prev, self._prev_t = cur, now
+        if prev_t is None or now <= prev_t:
+            return {}
+        dt = now - prev_t
+        out = {}
+        for name, counters in cur.items():
+            old = prev.get(name)
+            if old is None:
+                continue
+            d = [x if x > 0 else 0 for x in map(sub, counters, old)]
+            ios = d[self.RD_IOS] + d[self.WR_IOS]
+            s = {
+                "t":         now,
+                "r_iops":    d[self.RD_IOS] / dt,
+                "w_iops":    d[self.WR_IOS] / dt,
+                "r_mbs":     d[self.RD_SECT] * 512 / 1e6 / dt,
+                "w_mbs":     d[self.WR_SECT] * 512 / 1e6 / dt,
+                "await_ms":  (d[self.RD_TICKS] + d[self.WR_TICKS]) / ios if ios else 0.0,
+                "util":      min(100.0, d[self.IO_TICKS] / (dt * 10)),
+                "in_flight": counters[self.IN_FLIGHT],
+            }
+            ring = self.series.get(name)
+            if ring is None:
+                ring = self.series[name] = deque(maxlen=self.history)
+            ring.append(s)
+            out[name] = s
+        return out
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+# ─────────────────────────────────────────────
+#  PARTITIONS  (mountinfo + sysfs, una pasada para todos los discos)
+# ─────────────────────────────────────────────
+def _unescape_mount(text):
+    """mountinfo escapa espacios y similares como \\040"""
+    if "\\" not in text:
+        return text
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), text)
+
+
+def _mountinfo_entry(line):
+    """(maj:min, nombre del origen, punto, fstype) de una línea de mountinfo"""
+    left, sep, right = line.partition(" - ")
+    fields = left.split()
+    if not sep or len(fields) < 5:
+        return None
+    rest = right.split()
+    source = rest[1] if len(rest) > 1 else ""
+    name = os.path.basename(os.path.realpath(source)) if source.startswith("/dev/") else ""
+    return fields[2], name, _unescape_mount(fields[4]), rest[0] if rest else ""
+
+
+def parse_mountinfo(path="/proc/self/mountinfo"):
+    """({"maj:min": [(punto, fstype)]}, {"sda1": [(punto, fstype)]})
+
+    El segundo dict usa el dispositivo de origen (/dev/...) resuelto a su
+    nombre del kernel: btrfs y otros montan con un maj:min anónimo (0:NN).
+    """
+    by_dev, by_name = {}, {}
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return by_dev, by_name
+    for line in lines:
+        parsed = _mountinfo_entry(line)
+        if parsed is None:
+            continue
+        devnum, name, point, fstype = parsed
+        by_dev.setdefault(devnum, []).append((point, fstype))
+        if name:
+            by_name.setdefault(name, []).append((point, fstype))
+    return by_dev, by_name
+
+
+def _udev_props(devnum, udev_root="/run/udev/data"):
+    """Propiedades E: de la base de datos de udev (lo mismo que usa lsblk)"""
+    props = {}
+    try:
+        with open(f"{udev_root}/b{devnum}") as f:
+            for line in f:
+                if line.startswith("E:"):
+                    key, _, value = line[2:].rstrip("\n").partition("=")
+                    props[key] = value
+    except OSError:
+        pass
+    return props
+
+
+def fs_usage(mountpoint):
+    """Uso de un sistema de archivos con un solo statvfs (como psutil + inodos)"""
+    st = os.statvfs(mountpoint)
+    total = st.f_blocks * st.f_frsize
+    free  = st.f_bavail * st.f_frsize
+    used  = (st.f_blocks - st.f_bfree) * st.f_frsize
+    avail_total = used + free
+    return {
+        "used_gb":  used / 1e9,
+        "free_gb":  free / 1e9,
+        "total_gb": total / 1e9,
+        "percent":  round(used / avail_total * 100, 1) if avail_total else 0.0,
+        "inodes_total": st.f_files,
+        "inodes_used":  st.f_files - st.f_ffree,
+        "inodes_free":  st.f_favail,
+        "inodes_percent": (round((st.f_files - st.f_ffree) / st.f_files * 100, 1)
+                           if st.f_files else None),
+    }
+
+
+class PartitionCollector:
+    """Árbol de particiones y uso de todos los discos en una sola pasada.
+
+    Lee /proc/self/mountinfo una vez, recorre /sys/block/<disco>/<part>/ y
+    los holders (LUKS, LVM) y hace un statvfs por sistema de archivos
+    montado. El resultado {disco: [particiones]} se comparte: durante ttl
+    segundos, get() de cualquier disco reutiliza la misma pasada.
+    """
+
+    def __init__(self, sysfs_root="/sys", mountinfo="/proc/self/mountinfo",
+                 udev_root="/run/udev/data", ttl=2.0):
+        self.sysfs_root = sysfs_root
+        self.mountinfo  = mountinfo
+        self.udev_root  = udev_root
+        self.ttl = ttl
+        self._snapshot = None
+        self._taken = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self, refresh=False):
+        with self._lock:
+            now = time.monotonic()
+            if refresh or self._snapshot is None or now - self._taken > self.ttl:
+                self._snapshot = self.collect()
+                self._taken = now
+            return self._snapshot
+
+    def get(self, dev_path, refresh=False):
+        """Particiones de un disco (lista de dicts) o None"""
+        return self.snapshot(refresh).get(os.path.basename(dev_path)) or None
+
+    def refresh(self, changes):
+        """Relee sólo los discos tocados por MountWatcher.changes()
+
+        Devuelve {disco: particiones} de los discos afectados (vacío si no
+        hay instantánea todavía: la próxima get() hará la pasada completa).
+        """
+        devs  = {c[1] for c in changes}
+        names = {c[2] for c in changes if c[2]}
+        block = f"{self.sysfs_root}/block"
+        with self._lock:
+            if self._snapshot is None:
+                return {}
+            affected = [
+                disk for disk, parts in self._snapshot.items()
+                if disk in names or _sysfs_attr(f"{block}/{disk}/dev") in devs
+                or any(p["name"] in names or p.get("dev") in devs for p in parts)
+            ]
+            if not affected:
+                return {}
+            fresh = self.collect(affected)
+            self._snapshot = {**self._snapshot, **fresh}
+            return fresh
+
+    def collect(self, disks=None):
+        """{disco: [particiones]} de todos los discos (o sólo de disks)"""
+        by_dev, by_name = parse_mountinfo(self.mountinfo)
+        # punto de montaje más corto del fs -> fs_usage: un solo statvfs aunque
+        # el fs esté montado varias veces (bind) o cuelgue de varios discos (md)
+        usage = {}
+        block = f"{self.sysfs_root}/block"
+        if disks is None:
+            try:
+                disks = os.listdir(block)
+            except OSError:
+                return {}
+
+        def _usage(mounts):
+            if not mounts:
+                return None
+            key = mounts[0][0]
+            if key not in usage:
+                try:
+                    usage[key] = fs_usage(key)
+                except OSError:
+                    usage[key] = None
+            return usage[key]
+
+        def _entry(name, base):
+            devnum = _sysfs_attr(f"{base}/dev")
+            mounts = by_dev.get(devnum) or by_name.get(name) or []
+            # /proc/self/mountinfo repite un fs montado varias veces (bind)
+            points = list(dict.fromkeys(m[0] for m in mounts))
+            udev = _udev_props(devnum, self.udev_root) if devnum else {}
+            uevent = {}
+            for line in _sysfs_attr(f"{base}/uevent").splitlines():
+                k, _, v = line.partition("=")
+                uevent[k] = v
+            try:
+                sectors = int(_sysfs_attr(f"{base}/size", "0"))
+            except ValueError:
+                sectors = 0
+            label = (udev.get("ID_FS_LABEL") or uevent.get("PARTNAME")
+                     or udev.get("ID_PART_ENTRY_NAME")
+                     or _sysfs_attr(f"{base}/dm/name") or name)
+            part = {
+                "name":     name,
+                "dev":      devnum,
+                "size":     _human_size(sectors * 512),
+                "fstype":   udev.get("ID_FS_TYPE") or (mounts[0][1] if mounts else ""),
+                "label":    label,
+                "uuid":     udev.get("ID_FS_UUID", ""),
+                "mounts":   points,
+                "used_gb":  None,
+                "free_gb":  None,
+                "total_gb": sectors * 512 / 1e9 if sectors else None,
+                "percent":  None,
+            }
+            if points:
+                u = _usage(sorted(mounts, key=lambda m: len(m[0])))
+                if u is not None:
+                    part.update(u)
+            return part
+
+        def _holders(name, base, out, seen):
+            """LUKS / LVM / dm apilados encima de un dispositivo"""
+            try:
+                holders = sorted(os.listdir(f"{base}/holders"))
+            except OSError:
+                return
+            for h in holders:
+                if h in seen:
+                    continue
+                seen.add(h)
+                hbase = f"{block}/{h}"
+                if h.startswith(("dm-", "md")):
+                    out.append(_entry(h, hbase))
+                _holders(h, hbase, out, seen)
+
+        result = {}
+        for disk in disks:
+            base = f"{block}/{disk}"
+            if not os.path.exists(f"{base}/device"):
+                continue
+            parts, seen = [], set()
+            try:
+                children = os.listdir(base)
+            except OSError:
+                continue
+            numbered = []
+            for child in children:
+                num = _sysfs_attr(f"{base}/{child}/partition")
+                if num.isdigit():
+                    numbered.append((int(num), child))
+            for _num, child in sorted(numbered):
+                parts.append(_entry(child, f"{base}/{child}"))
+                _holders(child, f"{base}/{child}", parts, seen)
+            # sistema de archivos / LUKS / LVM sobre el disco entero
+            whole = _entry(disk, base)
+            if whole["mounts"] or (not numbered and whole["fstype"]):
+                parts.insert(0, whole)
+            _holders(disk, base, parts, seen)
+            result[disk] = parts
+        return result
+
+
+PARTITIONS = PartitionCollector()
+
+
+def get_disk_usage(dev_path, refresh=False):
+    """Particiones del disco con uso e inodos (None si no tiene)"""
+    return PARTITIONS.get(dev_path, refresh)
+
+
+# ─────────────────────────────────────────────
+#  FILESYSTEM FILL FORECAST
+# ─────────────────────────────────────────────
+# El uso de cada sistema de archivos montado se guarda con SmartHistory en
+# <historial>/fs/, una serie por sistema de archivos (UUID, o el punto de
+# montaje si udev no lo conoce). Las métricas van en MB.
+FSKEY_USED_MB  = 1
+FSKEY_AVAIL_MB = 2
+
+FS_HISTORY = SmartHistory(os.path.join(HISTORY_DIR, "fs") if HISTORY_DIR else "",
+                          FS_SAMPLE_INTERVAL)
+
+
+def fs_ident(part):
+    """Identificador de historial de una partición montada (None si no lo está)"""
+    if not part.get("mounts"):
+        return None
+    return "fs-" + (part.get("uuid") or part["mounts"][0])
+
+
+def record_fs_usage(snapshot=None, history=None, ts=None):
+    """Guarda una muestra de cada sistema de archivos montado; devuelve cuántas.
+
+    Cada sistema de archivos cuenta una vez aunque aparezca en varios discos
+    (LVM o RAID repartidos); de un miembro de btrfs se guarda el uso del
+    pool entero. SmartHistory descarta las muestras que llegan antes de
+    FS_SAMPLE_INTERVAL.
+    """
+    history = history or FS_HISTORY
+    if not history.directory:
+        return 0
+    if snapshot is None:
+        snapshot = {disk: annotate_pools(parts)
+                    for disk, parts in PARTITIONS.snapshot(refresh=True).items()}
+    seen, saved = set(), 0
+    for parts in snapshot.values():
+        for p in parts:
+            ident = fs_ident(p)
+            if ident is None or ident in seen or p.get("used_gb") is None:
+                continue
+            seen.add(ident)
+            # Miembro de un pool (annotate_pools): la serie es la del pool entero
+            usage = p["pool"] if p.get("pool", {}).get("used_gb") is not None else p
+            metrics = {FSKEY_USED_MB: int(usage["used_gb"] * 1000),
+                       FSKEY_AVAIL_MB: int(usage["free_gb"] * 1000)}
+            try:
+                saved += history.record(ident, metrics, ts)
+            except OSError:
+                return saved    # sin permisos / disco lleno: el historial es opcional
+    return saved
+
+
+class FsForecaster(SmartForecaster):
+    """Días hasta que se llene cada sistema de archivos.
+
+    Reutiliza la lectura incremental de SmartForecaster sobre FS_HISTORY:
+    sólo se decodifican los registros nuevos, cada serie se recorta a la
+    ventana y su regresión se recalcula únicamente cuando llegó una
+    muestra, así que pronosticar cientos de montajes en cada repintado es
+    casi gratis (un open + fstat por montaje) y la memoria no crece con el
+    tiempo.
+    """
+
+    KEYS = (FSKEY_AVAIL_MB,)
+
+    def __init__(self, history=None, window_days=FS_FORECAST_DAYS):
+        super().__init__(history or FS_HISTORY, window_days)
+
+    def forecast_many(self, idents, now=None):
+        """{ident: días hasta lleno o None} para todos los idents de una vez"""
+        now = now or time.time()
+        out = dict.fromkeys(idents)
+        if not self.history.directory:
+            return out
+        min_span = FS_FORECAST_MIN_HOURS * 3600
+        with self._lock:
+            for ident in out:
+                st = self._update(ident)
+                ts, _ = st["points"][FSKEY_AVAIL_MB]
+                if not ts or st["t"] - ts[0] < min_span:
+                    continue
+                if st.get("trends") is None:
+                    st["trends"] = [self._trend(st, FSKEY_AVAIL_MB)]
+                avail, slope = st["trends"][0]
+                if slope is None or slope >= 0:
+                    continue
+                days = _days_until(avail, slope, 0)
+                if days is not None and days < 3650:
+                    out[ident] = max(0.0, days - (now - st["t"]) / 86400)
+        return out
+
+    def forecast(self, ident, now=None):
+        return self.forecast_many([ident], now)[ident]
+
+
+FS_FORECASTER = FsForecaster()
+
+
+def annotate_fill_forecast(partitions, forecaster=None):
+    """Copia de las particiones con "full_days" (días hasta llenarse o None)"""
+    if not partitions:
+        return partitions
+    forecaster = forecaster or FS_FORECASTER
+    idents = [fs_ident(p) for p in partitions]
+    days = forecaster.forecast_many([i for i in idents if i])
+    return [dict(p, full_days=days.get(i) if i else None)
+            for p, i in zip(partitions, idents)]
+
+
+def _read_file(path, default=""):
+    try:
+        return Path(path).read_text().strip()
+    except Exception:
+        return default
+
+
+def get_cpu_info():
+    """Detección completa de CPU desde /proc/cpuinfo y dmidecode"""
+    info = {
+        "model": "Desconocido", "vendor": "", "family": "", "stepping": "",
+        "cores": 0, "threads": 0, "sockets": 0,
+        "freq_base": 0, "freq_max": 0, "freq_min": 0,
+        "cache_l1d": "", "cache_l1i": "", "cache_l2": "", "cache_l3": "",
+        "flags": [], "microcode": "", "architecture": "",
+        "tdp": "", "codename": "", "process_node": "",
+        "virtualization": "",
+    }
+
+    try:
+        cpuinfo = Path("/proc/cpuinfo").read_text()
+        blocks = [b for b in cpuinfo.split("\n\n") if b.strip()]
+        sockets = set()
+        for blk in blocks:
+            d = {}
+            for line in blk.split("\n"):
+                if ":" in line:
+                    k, _, v = line.partition(":")
+                    d[k.strip()] = v.strip()
+            sockets.add(d.get("physical id", "0"))
+
+        # First CPU block
+        d = {}
+        for line in blocks[0].split("\n"):
+            if ":" in line:
+                k, _, v = line.partition(":")
+                d[k.strip()] = v.strip()
+
+        info["model"]       = d.get("model name", "Desconocido")
+        info["vendor"]      = d.get("vendor_id", "")
+        info["family"]      = d.get("cpu family", "")
+        info["stepping"]    = d.get("stepping", "")
+        info["microcode"]   = d.get("microcode", "")
+        info["flags"]       = d.get("flags", "").split()[:20]  # primeras 20
+        info["cores"]       = psutil.cpu_count(logical=False) or 1
+        info["threads"]     = psutil.cpu_count(logical=True) or 1
+        info["sockets"]     = len(sockets) or 1
+
+        freq = psutil.cpu_freq()
+        if freq:
+            info["freq_base"] = round(freq.current)
+            info["freq_max"]  = round(freq.max)
+            info["freq_min"]  = round(freq.min)
+
+        # Cache sizes
+        for blk in blocks:
+            for line in blk.split("\n"):
+                if "cache size" in line.lower():
+                    info["cache_l3"] = line.split(":")[1].strip()
+                    break
+    except Exception:
+        pass
+
+    # Cache via /sys
+    base = "/sys/devices/system/cpu/cpu0/cache"
+    if os.path.isdir(base):
+        for idx_dir in sorted(glob.glob(f"{base}/index*")):
+            try:
+                level = _read_file(f"{idx_dir}/level")
+                ctype = _read_file(f"{idx_dir}/type")
+                size  = _read_file(f"{idx_dir}/size")
+                if level == "1" and ctype == "Data":        info["cache_l1d"] = size
+                elif level == "1" and ctype == "Instruction": info["cache_l1i"] = size
+                elif level == "2":                           info["cache_l2"]  = size
                 elif level == "3":                           info["cache_l3"]  = size
             except Exception:
                 pass
@@ -818,139 +2618,2088 @@ def get_gpu_info():
                 result[0]["api_vk"] = line.split("=")[-1].strip()
                 break
 
-    if not result:
-        result.append({
-            "name": "No se detectó GPU (instala lspci)",
-            "vendor": "", "driver": "", "vram_mb": 0, "vram_str": "",
-            "temp": None, "slot": "", "resolution": "",
-            "api_gl": "", "api_vk": "", "compute": "", "extra": {}
-        })
-    return result
+    if not result:
+        result.append({
+            "name": "No se detectó GPU (instala lspci)",
+            "vendor": "", "driver": "", "vram_mb": 0, "vram_str": "",
+            "temp": None, "slot": "", "resolution": "",
+            "api_gl": "", "api_vk": "", "compute": "", "extra": {}
+        })
+    return result
+
+
+def get_motherboard_info():
+    """Detectar motherboard via dmidecode y /sys"""
+    info = {
+        "manufacturer": "", "model": "", "version": "",
+        "serial": "**************",
+        "bios_vendor": "", "bios_version": "", "bios_date": "",
+        "bios_type": "",
+        "chipset": "",
+        "slots_pcie": [], "slots_used": 0,
+        "sata_ports": 0,
+    }
+
+    # /sys fallback (no necesita sudo)
+    info["manufacturer"] = _read_file("/sys/class/dmi/id/board_vendor")
+    info["model"]        = _read_file("/sys/class/dmi/id/board_name")
+    info["version"]      = _read_file("/sys/class/dmi/id/board_version")
+    info["bios_vendor"]  = _read_file("/sys/class/dmi/id/bios_vendor")
+    info["bios_version"] = _read_file("/sys/class/dmi/id/bios_version")
+    info["bios_date"]    = _read_file("/sys/class/dmi/id/bios_date")
+
+    # BIOS type (UEFI or Legacy)
+    uefi_check = run_cmd(["ls", "/sys/firmware/efi"])
+    info["bios_type"] = "UEFI" if uefi_check else "Legacy BIOS"
+
+    # dmidecode para más detalles (con sudo)
+    dmi_board = run_cmd(["sudo", "-n", "dmidecode", "-t", "2"])
+    if dmi_board:
+        for line in dmi_board.split("\n"):
+            l = line.strip()
+            if l.startswith("Manufacturer:") and not info["manufacturer"]:
+                info["manufacturer"] = l.split(":",1)[1].strip()
+            if l.startswith("Product Name:") and not info["model"]:
+                info["model"] = l.split(":",1)[1].strip()
+            if l.startswith("Version:") and not info["version"]:
+                info["version"] = l.split(":",1)[1].strip()
+
+    # Chipset via lspci
+    lspci_all = run_cmd(["lspci"])
+    chipsets = []
+    for line in lspci_all.split("\n"):
+        if "ISA bridge" in line or "Host bridge" in line:
+            parts = line.split(" ", 1)
+            if len(parts) > 1:
+                chipsets.append(parts[1].strip())
+    info["chipset"] = chipsets[0] if chipsets else ""
+
+    # PCIe slots
+    dmi_slots = run_cmd(["sudo", "-n", "dmidecode", "-t", "9"])
+    current_slot = {}
+    for line in (dmi_slots or "").split("\n"):
+        l = line.strip()
+        if l.startswith("System Slot Information"):
+            if current_slot: info["slots_pcie"].append(current_slot)
+            current_slot = {}
+        elif ":" in l:
+            k, _, v = l.partition(":")
+            current_slot[k.strip()] = v.strip()
+    if current_slot: info["slots_pcie"].append(current_slot)
+    info["slots_used"] = sum(1 for s in info["slots_pcie"]
+                             if s.get("Current Usage","").lower() == "in use")
+
+    # SATA ports
+    info["sata_ports"] = len(glob.glob("/sys/class/ata_port/ata*"))
+
+    return info
+
+
+def get_ram_info():
+    """Detectar módulos de RAM via dmidecode"""
+    modules = []
+    total_bytes = psutil.virtual_memory().total
+
+    dmi = run_cmd(["sudo", "-n", "dmidecode", "-t", "17"])
+    if dmi:
+        current = {}
+        for line in dmi.split("\n"):
+            l = line.strip()
+            if l.startswith("Memory Device"):
+                if current: modules.append(current)
+                current = {}
+            elif ":" in l:
+                k, _, v = l.partition(":")
+                current[k.strip()] = v.strip()
+        if current: modules.append(current)
+
+    # Filter only populated slots
+    populated = [m for m in modules if m.get("Size","") not in ("No Module Installed","","Unknown")]
+
+    if not populated:
+        # fallback from /proc/meminfo
+        vm = psutil.virtual_memory()
+        populated = [{
+            "Size": f"{vm.total // (1024**3)} GB",
+            "Type": "DDR",
+            "Speed": "Desconocido",
+            "Manufacturer": "Desconocido",
+            "Part Number": "Desconocido",
+            "Locator": "DIMM 0",
+            "Bank Locator": "",
+            "Form Factor": "",
+            "Data Width": "",
+        }]
+
+    # Also get total slots count
+    total_slots = len(modules)
+
+    return {
+        "modules": populated,
+        "total_slots": total_slots,
+        "populated_slots": len(populated),
+        "total_gb": total_bytes / 1e9,
+        "type": populated[0].get("Type","") if populated else "",
+        "speed_mhz": populated[0].get("Speed","") if populated else "",
+        "channel": _detect_ram_channel(populated),
+    }
+
+def _detect_ram_channel(modules):
+    if len(modules) >= 4: return "Cuádruple Canal"
+    if len(modules) == 2:
+        banks = set(m.get("Bank Locator","") for m in modules)
+        return "Doble Canal" if len(banks) >= 2 else "Doble Canal (probable)"
+    if len(modules) == 1: return "Canal Único"
+    return "Desconocido"
+
+
+# ─────────────────────────────────────────────
+#  STORAGE STACK  (mdraid, LVM RAID, thin pools)
+# ─────────────────────────────────────────────
+MD_SYNC_ACTIONS = {
+    "resync":  "Sincronizando",
+    "recover": "Reconstruyendo",
+    "check":   "Verificando",
+    "repair":  "Reparando",
+    "reshape": "Remodelando",
+    "frozen":  "Congelado",
+}
+
+# Salud de cada miembro en el estado del target "raid" de device-mapper
+DM_RAID_HEALTH = {"A": "activo", "a": "sincronizando", "D": "fallido"}
+
+
+def _part_disk(name, sysfs_root="/sys"):
+    """Disco completo que contiene un dispositivo de bloques (sda1 -> sda)"""
+    base = f"{sysfs_root}/class/block/{name}"
+    if os.path.exists(f"{base}/partition"):
+        return os.path.basename(os.path.dirname(os.path.realpath(base)))
+    return name
+
+
+def member_disks(name, sysfs_root="/sys"):
+    """Discos físicos bajo un dispositivo apilado (md, dm) siguiendo slaves/"""
+    try:
+        slaves = os.listdir(f"{sysfs_root}/class/block/{name}/slaves")
+    except OSError:
+        slaves = []
+    if not slaves:
+        return [_part_disk(name, sysfs_root)]
+    disks = []
+    for slave in sorted(slaves):
+        for disk in member_disks(slave, sysfs_root):
+            if disk not in disks:
+                disks.append(disk)
+    return disks
+
+
+def parse_mdstat(text):
+    """/proc/mdstat -> {"md0": "[UU_]"}: el mapa de miembros de cada array"""
+    flags, current = {}, None
+    for line in text.splitlines():
+        m = re.match(r"(md\w+)\s*:", line)
+        if m:
+            current = m.group(1)
+            continue
+        m = re.search(r"\[([U_]+)\]", line)
+        if current and m:
+            flags[current] = m.group(0)
+            current = None
+    return flags
+
+
+def read_md_array(name, sysfs_root="/sys", flags=""):
+    """Estado de un array md sólo con lecturas de sysfs (sin mdadm)"""
+    base = f"{sysfs_root}/block/{name}/md"
+    level = _sysfs_attr(f"{base}/level")
+    if not level:
+        return None
+
+    def _int(attr):
+        try:
+            return int(_sysfs_attr(f"{base}/{attr}", "0"))
+        except ValueError:
+            return 0
+
+    action = _sysfs_attr(f"{base}/sync_action", "idle")
+    done = total = 0
+    m = re.match(r"(\d+)\s*/\s*(\d+)", _sysfs_attr(f"{base}/sync_completed"))
+    if m:
+        done, total = int(m.group(1)), int(m.group(2))
+    speed_kbs = _int("sync_speed") if total else 0
+    members = []
+    for dev in sorted(glob.glob(f"{base}/dev-*")):
+        part = os.path.basename(dev)[4:]
+        members.append({
+            "name":  part,
+            "disk":  _part_disk(part, sysfs_root),
+            "state": _sysfs_attr(f"{dev}/state"),
+        })
+    degraded = _int("degraded")
+    state = _sysfs_attr(f"{base}/array_state")
+    faulty = any("faulty" in m["state"] for m in members)
+    if state in ("inactive", "broken") or (degraded and action != "recover"):
+        health = "Malo"
+    elif degraded or faulty or action in ("recover", "resync", "reshape"):
+        health = "Precaución"
+    else:
+        health = "Bueno"
+    return {
+        "name":       name,
+        "kind":       "md",
+        "level":      level,
+        "state":      state,
+        "flags":      flags,
+        "raid_disks": _int("raid_disks"),
+        "degraded":   degraded,
+        "action":     action,
+        "progress":   done / total * 100 if total else None,
+        "speed_mbs":  speed_kbs / 1024 if speed_kbs else None,
+        "eta_s":      (total - done) * 512 / (speed_kbs * 1024) if speed_kbs else None,
+        "members":    members,
+        "health":     health,
+    }
+
+
+def md_arrays(sysfs_root="/sys", mdstat="/proc/mdstat"):
+    """Todos los arrays md; pensado para llamarse cada segundo"""
+    names = sorted(os.path.basename(p) for p in glob.glob(f"{sysfs_root}/block/md*"))
+    if not names:
+        return []
+    flags = parse_mdstat(_read_file(mdstat))
+    arrays = (read_md_array(n, sysfs_root, flags.get(n, "")) for n in names)
+    return [a for a in arrays if a is not None]
+
+
+# ── device-mapper: estado de targets por DM_TABLE_STATUS ──
+DM_TABLE_STATUS = 0xC138FD0C          # _IOWR(0xfd, 12, struct dm_ioctl)
+_DM_IOCTL  = struct.Struct("<3IIIIiIIIQ128s129s7s")   # struct dm_ioctl (312 bytes)
+_DM_TARGET = struct.Struct("<QQiI16s")  # struct dm_target_spec
+DM_BUFFER_FULL = 1 << 8
+
+
+def dm_table_status_native(name, control="/dev/mapper/control"):
+    """[(tipo de target, estado)] de un dispositivo dm por ioctl (None sin permisos)"""
+    size = 16384
+    for _ in range(3):
+        buf = bytearray(size)
+        _DM_IOCTL.pack_into(buf, 0, 4, 0, 0, size, _DM_IOCTL.size, 0, 0, 0, 0, 0, 0,
+                            name.encode(), b"", b"")
+        try:
+            fd = os.open(control, os.O_RDWR | os.O_CLOEXEC)
+        except OSError:
+            return None
+        try:
+            fcntl.ioctl(fd, DM_TABLE_STATUS, buf)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        fields = _DM_IOCTL.unpack_from(buf)
+        data_start, count, flags = fields[4], fields[5], fields[7]
+        if flags & DM_BUFFER_FULL:
+            size *= 4
+            continue
+        out, off = [], data_start
+        for _ in range(count):
+            _start, _length, _status, nxt, ttype = _DM_TARGET.unpack_from(buf, off)
+            params = bytes(buf[off + _DM_TARGET.size:off + _DM_TARGET.size + 4096])
+            out.append((ttype.split(b"\0", 1)[0].decode(),
+                        params.split(b"\0", 1)[0].decode("utf-8", "replace")))
+            off = data_start + nxt
+        return out
+    return None
+
+
+def dm_table_status(name):
+    """Como dm_table_status_native, con dmsetup si el ioctl no está permitido"""
+    targets = dm_table_status_native(name)
+    if targets is None:
+        out = run_cmd(["dmsetup", "status", name])
+        if out:
+            targets = []
+            for line in out.splitlines():
+                fields = line.split(None, 3)
+                if len(fields) >= 3:
+                    targets.append((fields[2], fields[3] if len(fields) > 3 else ""))
+    return targets
+
+
+def _ratio(text):
+    used, _, total = text.partition("/")
+    try:
+        used, total = int(used), int(total)
+    except ValueError:
+        return None
+    return used / total * 100 if total else None
+
+
+def parse_dm_target(ttype, params):
+    """Estado de un target thin-pool o raid -> dict (None para otros targets)"""
+    f = params.split()
+    if ttype == "thin-pool":
+        if not f or f[0] in ("Fail", "Error") or len(f) < 4:
+            return {"kind": "thin-pool", "health": "Malo", "mode": f[0] if f else "?"}
+        data, meta = _ratio(f[2]), _ratio(f[1])
+        mode = f[4] if len(f) > 4 else "rw"
+        worst = max(data or 0, meta or 0)
+        return {
+            "kind":      "thin-pool",
+            "data_pct":  data,
+            "meta_pct":  meta,
+            "mode":      mode,
+            "health":    ("Malo" if mode != "rw" or worst > 95
+                          else "Precaución" if worst > 80 else "Bueno"),
+        }
+    if ttype == "raid" and len(f) >= 5:
+        chars, action = f[2], f[4]
+        return {
+            "kind":     "raid",
+            "level":    f[0],
+            "flags":    f"[{chars}]",
+            "action":   action,
+            "progress": _ratio(f[3]) if action != "idle" else None,
+            "members":  [DM_RAID_HEALTH.get(c, c) for c in chars],
+            "health":   ("Malo" if "D" in chars
+                         else "Precaución" if "a" in chars or action in ("recover", "resync")
+                         else "Bueno"),
+        }
+    return None
+
+
+def dm_pools(sysfs_root="/sys"):
+    """Thin pools y RAID de LVM/device-mapper (ioctl por dispositivo: vía lenta)"""
+    pools = []
+    for base in sorted(glob.glob(f"{sysfs_root}/block/dm-*")):
+        dm_name = _sysfs_attr(f"{base}/dm/name")
+        if not dm_name:
+            continue
+        for ttype, params in dm_table_status(dm_name) or []:
+            info = parse_dm_target(ttype, params)
+            if info is not None:
+                info.update(name=dm_name, dev=os.path.basename(base),
+                            disks=member_disks(os.path.basename(base), sysfs_root))
+                pools.append(info)
+                break
+    return pools
+
+
+def arrays_by_disk(arrays):
+    """{disco: [arrays]} a partir de md_arrays() + dm_pools()"""
+    out = {}
+    for a in arrays:
+        disks = a.get("disks") or [m["disk"] for m in a.get("members", [])]
+        for disk in dict.fromkeys(disks):
+            out.setdefault(disk, []).append(a)
+    return out
+
+
+def array_text(a):
+    """Resumen de una línea de un array md, un pool dm o un pool btrfs / ZFS"""
+    if a["kind"] in ("btrfs", "zfs"):
+        return pool_text(a)
+    if a["kind"] == "thin-pool":
+        if a.get("data_pct") is None:
+            return f"{a['name']} · thin-pool · {a.get('mode', '?')}"
+        return (f"{a['name']} · thin-pool · datos {a['data_pct']:.0f}% · "
+                f"metadatos {a['meta_pct']:.0f}%" + ("" if a["mode"] == "rw" else f" · {a['mode']}"))
+    parts = [a["name"], a["level"]]
+    if a.get("flags"):
+        parts.append(a["flags"])
+    if a["kind"] == "md" and a["state"] not in ("clean", "active", "active-idle", ""):
+        parts.append(a["state"])
+    if a["action"] not in ("idle", ""):
+        step = MD_SYNC_ACTIONS.get(a["action"], a["action"])
+        if a.get("progress") is not None:
+            step += f" {a['progress']:.1f}%"
+        parts.append(step)
+        if a.get("speed_mbs"):
+            parts.append(f"{a['speed_mbs']:.0f} MB/s")
+        if a.get("eta_s") is not None:
+            eta = a["eta_s"]
+            parts.append(f"ETA {eta / 3600:.1f} h" if eta >= 5400 else f"ETA {max(1, round(eta / 60))} min")
+    elif a["kind"] == "md" and a["degraded"]:
+        parts.append(f"degradado ({a['degraded']} de {a['raid_disks']})")
+    return " · ".join(parts)
+
+
+# ─────────────────────────────────────────────
+#  BTRFS / ZFS POOLS
+# ─────────────────────────────────────────────
+BTRFS_ERROR_STATS = ("write_errs", "read_errs", "flush_errs",
+                     "corruption_errs", "generation_errs")
+
+
+def _sysfs_int(path):
+    try:
+        return int(_sysfs_attr(path, "0"))
+    except ValueError:
+        return 0
+
+
+def _btrfs_alloc(base, kind):
+    """Uso de un tipo de bloque de btrfs (data, metadata, system)"""
+    d = f"{base}/allocation/{kind}"
+    try:
+        profiles = [n for n in os.listdir(d) if os.path.isdir(f"{d}/{n}")]
+    except OSError:
+        return None
+    return {
+        "total":      _sysfs_int(f"{d}/total_bytes"),
+        "used":       _sysfs_int(f"{d}/bytes_used"),
+        "disk_total": _sysfs_int(f"{d}/disk_total"),
+        "disk_used":  _sysfs_int(f"{d}/disk_used"),
+        "profile":    "/".join(sorted(profiles)) or "single",
+    }
+
+
+def parse_btrfs_scrub(text):
+    """Salida de 'btrfs scrub status' -> {"state", "progress", "errors", "eta"}"""
+    fields = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip().lower()] = value.strip()
+    if not fields:
+        return None
+    m = re.search(r"\(([\d.]+)%\)", fields.get("bytes scrubbed", ""))
+    summary = fields.get("error summary", "")
+    return {
+        "state":    fields.get("status", "desconocido"),
+        "progress": float(m.group(1)) if m else None,
+        "errors":   "" if summary.startswith("no errors") else summary,
+        "eta":      fields.get("time left") or None,
+    }
+
+
+def btrfs_pool(base, sysfs_root="/sys"):
+    """Un sistema de archivos btrfs desde /sys/fs/btrfs/<uuid>/ (sin subprocesos)"""
+    uuid = os.path.basename(base)
+    data, meta = _btrfs_alloc(base, "data"), _btrfs_alloc(base, "metadata")
+    if data is None:
+        return None
+    try:
+        devices = sorted(os.listdir(f"{base}/devices"))
+    except OSError:
+        devices = []
+    size = sum(_sysfs_int(f"{sysfs_root}/class/block/{d}/size") * 512 for d in devices)
+    allocated = sum(a["disk_total"] for a in (data, meta, _btrfs_alloc(base, "system")) if a)
+
+    errors, missing = 0, 0
+    for dev in glob.glob(f"{base}/devinfo/*"):
+        missing += _sysfs_int(f"{dev}/missing")
+        for line in _sysfs_attr(f"{dev}/error_stats").splitlines():
+            name, _, value = line.partition(" ")
+            if name in BTRFS_ERROR_STATS and value.strip().isdigit():
+                errors += int(value)
+
+    # Libre real: lo no usado de los bloques de datos + lo sin asignar,
+    # dividido por las copias del perfil (raid1 = 2, dup = 2...)
+    ratio = data["disk_total"] / data["total"] if data["total"] else 1.0
+    free = data["total"] - data["used"] + max(0, size - allocated) / max(ratio, 1.0)
+    used = data["used"] + (meta["used"] if meta else 0)
+    return {
+        "kind":     "btrfs",
+        "name":     _sysfs_attr(f"{base}/label") or uuid[:8],
+        "uuid":     uuid,
+        "devices":  devices,
+        "disks":    list(dict.fromkeys(d for dev in devices for d in member_disks(dev, sysfs_root))),
+        "profile":  data["profile"],
+        "meta_profile": meta["profile"] if meta else "",
+        "data_gb":  (data["used"] / 1e9, data["total"] / 1e9),
+        "meta_gb":  ((meta["used"] / 1e9, meta["total"] / 1e9) if meta else None),
+        "used_gb":  used / 1e9,
+        "free_gb":  free / 1e9,
+        "errors":   errors,
+        "missing":  missing,
+        "health":   "Malo" if missing else "Precaución" if errors else "Bueno",
+    }
+
+
+def parse_zpool_list(out):
+    """'zpool list -j --json-int' (OpenZFS 2.3+) o 'zpool list -Hp -o ...' -> {pool: dict}"""
+    pools = {}
+    try:
+        doc = json.loads(out)
+    except ValueError:
+        doc = None
+    if isinstance(doc, dict):
+        for name, pool in (doc.get("pools") or {}).items():
+            props = {k: (v.get("value") if isinstance(v, dict) else v)
+                     for k, v in (pool.get("properties") or {}).items()}
+            pools[name] = props
+    else:
+        for line in out.splitlines():
+            f = line.split("\t")
+            if len(f) == 7:
+                pools[f[0]] = dict(zip(("name", "size", "allocated", "free",
+                                        "fragmentation", "capacity", "health"), f))
+
+    def _num(v):
+        try:
+            return int(str(v).rstrip("%"))
+        except ValueError:
+            return None
+
+    return {name: {"size": _num(p.get("size")), "allocated": _num(p.get("allocated")),
+                   "free": _num(p.get("free")), "fragmentation": _num(p.get("fragmentation")),
+                   "capacity": _num(p.get("capacity")), "health": p.get("health")}
+            for name, p in pools.items()}
+
+
+def _zpool_count(text):
+    """Contador de errores de zpool status ("0", "12", "1.5K")"""
+    m = re.match(r"([\d.]+)([KMG]?)$", text)
+    if not m:
+        return 0
+    return int(float(m.group(1)) * {"": 1, "K": 1e3, "M": 1e6, "G": 1e9}[m.group(2)])
+
+
+def parse_zpool_status(text):
+    """'zpool status -LP <pool>': escaneo (scrub/resilver) y errores por vdev"""
+    scan, devices, lines = None, [], text.splitlines()
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("scan:"):
+            block = [stripped[5:].strip()]
+            for more in lines[i + 1:]:
+                if not more.startswith("\t"):
+                    break
+                block.append(more.strip())
+            block = " ".join(block)
+            done = re.search(r"([\d.]+)% done", block)
+            eta = re.search(r"(\S+) to go", block)
+            errors = re.search(r"with (\d+) errors", block)
+            scan = {
+                "state":    ("running" if "in progress" in block else
+                             "canceled" if "canceled" in block else
+                             "none" if "none requested" in block else "finished"),
+                "kind":     "resilver" if "resilver" in block else "scrub",
+                "progress": float(done.group(1)) if done else None,
+                "eta":      eta.group(1) if eta else None,
+                "errors":   errors.group(1) if errors and errors.group(1) != "0" else "",
+            }
+            continue
+        f = stripped.split()
+        if len(f) >= 5 and f[0].startswith("/dev/"):
+            devices.append({"path": f[0], "state": f[1],
+                            "errors": sum(_zpool_count(v) for v in f[2:5])})
+    return {"scan": scan, "devices": devices}
+
+
+class PoolCollector:
+    """Uso real, errores por dispositivo y scrub de btrfs y ZFS.
+
+    Lo barato se lee en cada llamada: /sys/fs/btrfs/<uuid>/ y el estado de
+    /proc/spl/kstat/zfs/<pool>/state. Lo caro —zpool list/status y btrfs
+    scrub status, que despiertan todos los discos de un pool grande— se
+    guarda por pool y sólo se repite cada slow_ttl segundos.
+    """
+
+    def __init__(self, sysfs_root="/sys", kstat_root="/proc/spl/kstat/zfs",
+                 slow_ttl=POOL_REFRESH):
+        self.sysfs_root = sysfs_root
+        self.kstat_root = kstat_root
+        self.slow_ttl = slow_ttl
+        self._slow = {}     # clave -> (caduca, valor)
+        self._lock = threading.Lock()
+
+    def _cached(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._slow.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+        value = loader()
+        with self._lock:
+            self._slow[key] = (now + self.slow_ttl, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._slow.clear()
+
+    def btrfs(self, mounts_by_name=None):
+        pools = []
+        for base in sorted(glob.glob(f"{self.sysfs_root}/fs/btrfs/*-*")):
+            pool = btrfs_pool(base, self.sysfs_root)
+            if pool is None:
+                continue
+            if mounts_by_name is None:
+                mounts_by_name = parse_mountinfo()[1]
+            point = next((m[0][0] for m in map(mounts_by_name.get, pool["devices"]) if m), None)
+            if point:
+                pool["scrub"] = self._cached(
+                    ("btrfs-scrub", pool["uuid"]),
+                    lambda point=point: parse_btrfs_scrub(run_cmd(["btrfs", "scrub", "status", point])))
+                if pool["scrub"] and pool["scrub"]["errors"] and pool["health"] == "Bueno":
+                    pool["health"] = "Precaución"
+            pools.append(pool)
+        return pools
+
+    def zfs(self):
+        try:
+            names = sorted(n for n in os.listdir(self.kstat_root)
+                           if os.path.isfile(f"{self.kstat_root}/{n}/state"))
+        except OSError:
+            return []
+        if not names:
+            return []
+
+        def _list():
+            out = run_cmd(["zpool", "list", "-j", "--json-int", "-o",
+                           "name,size,allocated,free,fragmentation,capacity,health"])
+            if not out.startswith("{"):
+                out = run_cmd(["zpool", "list", "-Hp", "-o",
+                               "name,size,allocated,free,fragmentation,capacity,health"])
+            return parse_zpool_list(out)
+
+        listing = self._cached(("zpool-list",), _list)
+        pools = []
+        for name in names:
+            state = _sysfs_attr(f"{self.kstat_root}/{name}/state")
+            status = self._cached(("zpool-status", name),
+                                  lambda name=name: parse_zpool_status(
+                                      run_cmd(["zpool", "status", "-LP", name])))
+            info = listing.get(name, {})
+            devices = [os.path.basename(os.path.realpath(d["path"])) for d in status["devices"]]
+            errors = sum(d["errors"] for d in status["devices"])
+            scan = status["scan"]
+            pools.append({
+                "kind":     "zfs",
+                "name":     name,
+                "state":    state,
+                "devices":  devices,
+                "disks":    list(dict.fromkeys(_part_disk(d, self.sysfs_root) for d in devices)),
+                "used_gb":  info["allocated"] / 1e9 if info.get("allocated") is not None else None,
+                "free_gb":  info["free"] / 1e9 if info.get("free") is not None else None,
+                "size_gb":  info["size"] / 1e9 if info.get("size") is not None else None,
+                "capacity": info.get("capacity"),
+                "fragmentation": info.get("fragmentation"),
+                "errors":   errors,
+                "scrub":    scan,
+                "health":   ("Malo" if state not in ("ONLINE", "DEGRADED") else
+                             "Precaución" if state == "DEGRADED" or errors
+                             or (scan and scan["errors"]) else "Bueno"),
+            })
+        return pools
+
+    def pools(self, mounts_by_name=None):
+        return self.btrfs(mounts_by_name) + self.zfs()
+
+
+POOLS = PoolCollector()
+
+
+def pool_text(pool):
+    """Resumen de una línea de un pool btrfs o ZFS"""
+    parts = [f"{pool['kind']} {pool['name']}"]
+    if pool["kind"] == "btrfs":
+        used, total = pool["data_gb"]
+        parts.append(f"{pool['profile']} · datos {used:.1f} / {total:.1f} GB")
+        if pool["meta_gb"]:
+            parts.append(f"metadatos {pool['meta_gb'][0]:.1f} / {pool['meta_gb'][1]:.1f} GB"
+                         f" ({pool['meta_profile']})")
+        if pool["missing"]:
+            parts.append(f"{pool['missing']} dispositivo(s) ausente(s)")
+    else:
+        parts.append(pool["state"])
+        if pool["capacity"] is not None:
+            parts.append(f"{pool['capacity']}% usado")
+        if pool["fragmentation"] is not None:
+            parts.append(f"fragmentación {pool['fragmentation']}%")
+    parts.append(f"{pool['errors']} errores de E/S" if pool["errors"] else "sin errores de E/S")
+    scrub = pool.get("scrub")
+    if scrub:
+        kind = scrub.get("kind", "scrub")
+        if scrub["progress"] is not None and scrub["state"] == "running":
+            eta = f", quedan {scrub['eta']}" if scrub["eta"] else ""
+            parts.append(f"{kind} {scrub['progress']:.1f}%{eta}")
+        elif scrub["errors"]:
+            parts.append(f"{kind}: {scrub['errors']} errores")
+        else:
+            parts.append(f"{kind}: {scrub['state']}")
+    return " · ".join(parts)
+
+
+def annotate_pools(partitions, pools=None):
+    """Copia de las particiones con "pool" para las que son parte de btrfs / ZFS.
+
+    El uso de un pool (datos + metadatos de btrfs, allocated de zpool)
+    sustituye al de statvfs en cada miembro, repartido según lo que ocupa
+    el miembro en el pool: un disco de un pool de dos en modo single lleva
+    la mitad, uno de un raid1 lo lleva entero. Así used_gb nunca pasa de
+    total_gb (el tamaño de la partición, el ancho en PartitionBarWidget) y
+    dos miembros del mismo disco no cuentan dos veces el mismo uso.
+    """
+    if not partitions:
+        return partitions
+    if pools is None:
+        if not any(p.get("fstype") in ("btrfs", "zfs_member", "zfs") for p in partitions):
+            return partitions
+        pools = POOLS.pools()
+    by_dev = {dev: pool for pool in pools for dev in pool["devices"]}
+    out = []
+    for p in partitions:
+        pool = by_dev.get(p["name"])
+        if pool is None:
+            out.append(p)
+            continue
+        p = dict(p, pool=pool)
+        if pool.get("used_gb") is not None and pool.get("free_gb") is not None:
+            total = pool["used_gb"] + pool["free_gb"]
+            share = min(1.0, p["total_gb"] / total) if total and p.get("total_gb") else 0.0
+            p.update(used_gb=pool["used_gb"] * share, free_gb=pool["free_gb"] * share,
+                     percent=round(pool["used_gb"] / total * 100, 1) if total else 0.0)
+        out.append(p)
+    return out
+
+
+# ─────────────────────────────────────────────
+#  SELF-TEST SCHEDULER
+# ─────────────────────────────────────────────
+SELFTEST_KINDS = {"short": "corto", "long": "extendido"}
+
+
+def parse_self_test(data):
+    """Estado del autotest desde smartctl -c -l selftest -j (ATA o NVMe).
+
+    {"running", "percent", "result", "passed"}; percent es lo completado
+    (0-100) mientras corre; result / passed son los del último test.
+    """
+    state = {"running": False, "percent": None, "result": None, "passed": None}
+    ata = data.get("ata_smart_data", {}).get("self_test", {})
+    if ata:
+        status = ata.get("status", {})
+        if status.get("value", 0) >> 4 == 0xF:
+            state["running"] = True
+            remaining = status.get("remaining_percent")
+            if remaining is not None:
+                state["percent"] = 100 - remaining
+        table = data.get("ata_smart_self_test_log", {}).get("standard", {}).get("table", [])
+        if table:
+            last = table[0].get("status", {})
+            state["result"] = last.get("string")
+            state["passed"] = last.get("passed")
+        elif not state["running"] and status.get("string"):
+            state["result"] = status["string"]
+            state["passed"] = status.get("passed")
+
+    nvme = data.get("nvme_self_test_log", {})
+    if nvme:
+        if nvme.get("current_self_test_operation", {}).get("value", 0):
+            state["running"] = True
+            state["percent"] = nvme.get("current_self_test_completion_percent")
+        table = nvme.get("table", [])
+        if table:
+            last = table[0].get("self_test_result", {})
+            state["result"] = last.get("string")
+            state["passed"] = last.get("value") == 0
+    return state
+
+
+def read_self_test(dev_path):
+    out = run_smartctl(["-c", "-l", "selftest", "-j", dev_path])
+    try:
+        return parse_self_test(json.loads(out))
+    except ValueError:
+        return None
+
+
+def start_self_test(dev_path, kind="short"):
+    """Lanza el autotest en el firmware del disco; True si lo aceptó"""
+    out = run_smartctl(["-t", kind, "-j", dev_path])
+    try:
+        data = json.loads(out)
+    except ValueError:
+        return False
+    return data.get("smartctl", {}).get("exit_status", 1) & 0x07 == 0
+
+
+def abort_self_test(dev_path):
+    run_smartctl(["-X", dev_path])
+
+
+class SelfTestScheduler:
+    """Arranca autotests escalonados y sigue su progreso sin bloquear.
+
+    Un solo hilo atiende una cola por tiempo: los arranques se separan
+    stagger segundos y cada disco se consulta con retroceso exponencial
+    (poll_min, 2·poll_min ... poll_max), acotado por el tiempo que falta
+    estimado a partir del porcentaje. on_update(dev_path, estado) se llama
+    desde ese hilo en cada cambio; estado["state"] es "queued", "running",
+    "done", "failed" o "error".
+    """
+
+    def __init__(self, on_update=None, stagger=SELFTEST_STAGGER,
+                 poll_min=SELFTEST_POLL_MIN, poll_max=SELFTEST_POLL_MAX):
+        self.on_update = on_update
+        self.stagger   = stagger
+        self.poll_min  = poll_min
+        self.poll_max  = poll_max
+        self.jobs  = {}         # dev_path -> estado
+        self._heap = []         # (vence, seq, dev_path, acción)
+        self._seq  = 0
+        self._next_start = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, dev_paths, kind="short"):
+        with self._cond:
+            now = time.monotonic()
+            for path in dev_paths:
+                job = self.jobs.get(path)
+                if job is not None and job["state"] in ("queued", "running"):
+                    continue
+                start = max(now, self._next_start)
+                self._next_start = start + self.stagger
+                job = self.jobs[path] = {"kind": kind, "state": "queued", "percent": None,
+                                         "result": None, "passed": None, "delay": self.poll_min,
+                                         "started": None, "finished": None}
+                self._push(start, path, "start")
+                self._emit(path, job)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, dev_path=None):
+        """Cancela un disco (o todos): quita los pendientes y aborta los que corren"""
+        with self._cond:
+            paths = [dev_path] if dev_path else list(self.jobs)
+            running = []
+            for path in paths:
+                job = self.jobs.get(path)
+                if job is None or job["state"] not in ("queued", "running"):
+                    continue
+                if job["state"] == "running":
+                    running.append(path)
+                job.update(state="error", result="cancelado", finished=time.time())
+                self._emit(path, job)
+            self._heap = [e for e in self._heap if e[2] not in paths]
+            heapify(self._heap)
+            self._cond.notify()
+        for path in running:
+            abort_self_test(path)
+
+    def active(self):
+        with self._cond:
+            return [p for p, j in self.jobs.items() if j["state"] in ("queued", "running")]
+
+    def _push(self, due, path, action):
+        self._seq += 1
+        heappush(self._heap, (due, self._seq, path, action))
+
+    def _emit(self, path, job):
+        if self.on_update:
+            self.on_update(path, {k: v for k, v in job.items() if k != "delay"})
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._thread = None
+                        return
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                _due, _seq, path, action = heappop(self._heap)
+                job = self.jobs.get(path)
+                if job is None:
+                    continue
+            # smartctl fuera del lock: schedule()/cancel() no esperan
+            if action == "start":
+                self._start(path, job)
+            else:
+                self._poll(path, job)
+
+    def _start(self, path, job):
+        ok = start_self_test(path, job["kind"])
+        with self._cond:
+            cancelled = job["state"] != "queued"    # cancelado mientras arrancaba
+            if not cancelled:
+                if not ok:
+                    job.update(state="error", result="el disco rechazó el autotest",
+                               finished=time.time())
+                else:
+                    job.update(state="running", percent=0, started=time.time())
+                    self._push(time.monotonic() + self.poll_min, path, "poll")
+                self._emit(path, job)
+        if cancelled and ok:
+            abort_self_test(path)   # el disco ya lo aceptó: no dejarlo corriendo
+
+    def _poll(self, path, job):
+        st = read_self_test(path)
+        with self._cond:
+            if job["state"] != "running":
+                return
+            if st is None:
+                job.update(state="error", result="sin respuesta de smartctl", finished=time.time())
+            elif st["running"]:
+                changed = st["percent"] != job["percent"]
+                job["percent"] = st["percent"]
+                job["delay"] = delay = min(job["delay"] * 2, self.poll_max)
+                elapsed = time.time() - job["started"]
+                if st["percent"]:
+                    # no pasarse mucho del final estimado
+                    remaining = elapsed * (100 - st["percent"]) / st["percent"]
+                    delay = min(delay, max(self.poll_min, remaining))
+                self._push(time.monotonic() + delay, path, "poll")
+                if not changed:
+                    return
+            else:
+                job.update(state="done" if st["passed"] is not False else "failed",
+                           percent=100, result=st["result"], passed=st["passed"],
+                           finished=time.time())
+            self._emit(path, job)
+        if job["state"] in ("done", "failed"):
+            SMART_CACHE.invalidate(path)    # el registro de autotests cambió
+            NVME_LOGS.self_test_changed(path)
+
+
+# ─────────────────────────────────────────────
+#  READ BENCHMARK  (sólo lectura, O_DIRECT)
+# ─────────────────────────────────────────────
+# Como CrystalDiskMark pero sin escribir nunca: el disco se abre O_RDONLY,
+# así es seguro en discos de producción. La profundidad de cola se simula
+# con hilos que hacen lecturas síncronas (preadv suelta el GIL).
+
+# (nombre, tamaño de bloque, lecturas simultáneas, aleatorio)
+BENCH_TESTS = (
+    ("SEQ1M Q8",  1 << 20, 8,  False),
+    ("SEQ1M Q1",  1 << 20, 1,  False),
+    ("RND4K Q32", 4096,    32, True),
+    ("RND4K Q1",  4096,    1,  True),
+)
+BENCH_SECONDS  = 3          # duración de cada prueba
+BENCH_SEQ_SPAN = 1 << 30    # las secuenciales recorren (en bucle) el primer GiB
+
+
+def _bench_open(path):
+    """(fd, direct): O_DIRECT si el dispositivo/sistema de archivos lo admite"""
+    buf = mmap.mmap(-1, 4096)     # mmap anónimo: alineado a página
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECT)
+        try:
+            os.preadv(fd, [buf], 0)
+            return fd, True
+        except OSError:
+            os.close(fd)
+            raise
+    except OSError as e:
+        if e.errno != errno.EINVAL:
+            raise
+    finally:
+        buf.close()
+    return os.open(path, os.O_RDONLY), False
+
+
+def _bench_run(fd, size, block, depth, randomized, seconds, cancel=None):
+    span    = max(1, min(size, BENCH_SEQ_SPAN) // block)
+    blocks  = max(1, size // block)
+    seq     = count()
+    deadline = time.monotonic() + seconds
+
+    def _worker(seed):
+        buf = mmap.mmap(-1, block)
+        rng = random.Random(seed)
+        ios = nbytes = 0
+        busy = 0.0
+        try:
+            while time.monotonic() < deadline:
+                if cancel is not None and cancel.is_set():
+                    break
+                if randomized:
+                    offset = rng.randrange(blocks) * block
+                else:
+                    offset = next(seq) % span * block
+                t = time.perf_counter()
+                n = os.preadv(fd, [buf], offset)
+                busy += time.perf_counter() - t
+                if n <= 0:
+                    break
+                ios += 1
+                nbytes += n
+        finally:
+            buf.close()
+        return ios, nbytes, busy
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=depth) as pool:
+        parts = list(pool.map(_worker, range(depth)))
+    elapsed = time.perf_counter() - t0
+    ios    = sum(p[0] for p in parts)
+    nbytes = sum(p[1] for p in parts)
+    busy   = sum(p[2] for p in parts)
+    return {
+        "mbs":    nbytes / 1e6 / elapsed if elapsed else 0.0,
+        "iops":   ios / elapsed if elapsed else 0.0,
+        "lat_ms": busy / ios * 1000 if ios else None,
+    }
+
+
+def bench_disk(path, seconds=BENCH_SECONDS, tests=BENCH_TESTS, cancel=None, on_test=None):
+    """Benchmark de lectura sobre un disco, partición, loop o archivo.
+
+    Devuelve {"t", "direct", "seconds", "tests": {nombre: {mbs, iops, lat_ms}}}.
+    on_test(nombre, resultado) se llama al terminar cada prueba; con
+    resultado None justo antes de empezarla. Sin O_DIRECT (tmpfs, algunos
+    FUSE) se vacía la caché de páginas antes de cada prueba y el
+    resultado lleva direct=False.
+    """
+    fd, direct = _bench_open(path)
+    try:
+        size = os.lseek(fd, 0, os.SEEK_END)
+        if size < max(t[1] for t in tests):
+            raise ValueError(f"{path}: demasiado pequeño para el benchmark")
+        result = {"t": int(time.time()), "direct": direct, "seconds": seconds, "tests": {}}
+        for name, block, depth, randomized in tests:
+            if cancel is not None and cancel.is_set():
+                break
+            if on_test:
+                on_test(name, None)
+            if not direct:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            r = _bench_run(fd, size, block, depth, randomized, seconds, cancel)
+            result["tests"][name] = r
+            if on_test:
+                on_test(name, r)
+        return result
+    finally:
+        os.close(fd)
+
+
+def record_bench(dev_path, result, history=None):
+    """Guarda el resultado junto al historial S.M.A.R.T. del disco"""
+    history = history or SMART_HISTORY
+    try:
+        return history.append_log(_history_ident(dev_path), ".bench", [result])
+    except OSError:
+        return False
+
+
+def bench_baseline(dev_path, history=None):
+    """{prueba: MB/s mediano} de los benchmarks anteriores del disco"""
+    history = history or SMART_HISTORY
+    runs = {}
+    for entry in history.read_log(_history_ident(dev_path), ".bench"):
+        for name, r in entry.get("tests", {}).items():
+            if r.get("mbs"):
+                runs.setdefault(name, []).append(r["mbs"])
+    return {name: sorted(v)[len(v) // 2] for name, v in runs.items()}
+
+
+# ─────────────────────────────────────────────
+#  DIRECTORY SIZES  (du -x en paralelo)
+# ─────────────────────────────────────────────
+class DirScanner:
+    """Espacio ocupado por cada directorio bajo root, en paralelo.
+
+    Varios hilos recorren el árbol con os.scandir (el lstat de cada entrada
+    suelta el GIL, así que las lecturas de metadatos se solapan). Como du
+    -x, no se cruza a otros sistemas de archivos, se cuentan bloques
+    asignados y un archivo con varios enlaces duros cuenta una vez. Se
+    guarda un nodo por directorio (nombre, padre, bytes propios y totales),
+    nunca uno por archivo: la memoria crece con los directorios.
+
+    children() se puede consultar mientras run() sigue en marcha; los
+    totales de cada directorio ya incluyen todo lo recorrido debajo.
+    """
+
+    FILES = "(archivos)"
+
+    def __init__(self, root, workers=DU_WORKERS):
+        self.root = root
+        self.workers = max(1, workers)
+        st = os.lstat(root)
+        self._dev = st.st_dev
+        self.names   = [root]
+        self.parents = array("l", [-1])
+        self.own     = array("q", [st.st_blocks * 512])
+        self.total   = array("q", [st.st_blocks * 512])
+        self.kids    = [[]]
+        self.files   = 0
+        self.errors  = 0
+        self.elapsed = 0.0
+        self.done    = False
+        self._linked = set()     # inodos con st_nlink > 1 ya contados
+        self._lock   = threading.Lock()
+        self._queue  = queue.Queue()
+
+    def run(self, cancel=None, on_progress=None, interval=0.25):
+        """Recorre el árbol; on_progress(self) cada interval s y al final"""
+        started = time.monotonic()
+        q = self._queue
+        q.put((0, self.root))
+        threads = [threading.Thread(target=self._worker, args=(cancel,), daemon=True)
+                   for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        while True:
+            with q.all_tasks_done:
+                if not q.unfinished_tasks:
+                    break
+                q.all_tasks_done.wait(interval)
+            self.elapsed = time.monotonic() - started
+            if on_progress:
+                on_progress(self)
+        for _ in threads:
+            q.put(None)
+        self.elapsed = time.monotonic() - started
+        self.done = True
+        if on_progress:
+            on_progress(self)
+        return self
+
+    def _worker(self, cancel):
+        q = self._queue
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            try:
+                if not (cancel and cancel.is_set()):
+                    self._scan(*item)
+            finally:
+                q.task_done()
+
+    def _scan(self, index, path):
+        size = files = errors = 0
+        subdirs, linked = [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        errors += 1
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if st.st_dev == self._dev:
+                            subdirs.append((entry.name, st.st_blocks * 512))
+                    elif st.st_nlink > 1:
+                        files += 1
+                        linked.append((st.st_ino, st.st_blocks * 512))
+                    else:
+                        files += 1
+                        size += st.st_blocks * 512
+        except OSError:
+            errors += 1
+
+        new = []
+        with self._lock:
+            for ino, nbytes in linked:
+                if ino not in self._linked:
+                    self._linked.add(ino)
+                    size += nbytes
+            self.files  += files
+            self.errors += errors
+            self.own[index] += size
+            self._add(index, size)
+            for name, nbytes in subdirs:
+                child = len(self.names)
+                self.names.append(name)
+                self.parents.append(index)
+                self.own.append(nbytes)
+                self.total.append(0)
+                self.kids.append([])
+                self.kids[index].append(child)
+                self._add(child, nbytes)
+                new.append((child, os.path.join(path, name)))
+        for item in new:
+            self._queue.put(item)
+
+    def _add(self, index, nbytes):
+        """Suma nbytes al directorio y a todos sus antecesores"""
+        while index >= 0:
+            self.total[index] += nbytes
+            index = self.parents[index]
+
+    @property
+    def dirs(self):
+        return len(self.names)
+
+    def path(self, index):
+        parts = []
+        while index > 0:
+            parts.append(self.names[index])
+            index = self.parents[index]
+        return os.path.join(self.root, *reversed(parts))
+
+    def children(self, index=0):
+        """[(nombre, bytes, índice)] de mayor a menor.
+
+        Los archivos sueltos del directorio aparecen juntos como FILES con
+        índice None.
+        """
+        with self._lock:
+            out = [(self.names[c], self.total[c], c) for c in self.kids[index]]
+            own = self.own[index]
+        if own:
+            out.append((self.FILES, own, None))
+        out.sort(key=lambda item: item[1], reverse=True)
+        return out
+
+
+# ─────────────────────────────────────────────
+#  HOTPLUG  (uevents del kernel por netlink)
+# ─────────────────────────────────────────────
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP    = 1
+
+
+class UeventMonitor:
+    """Socket netlink con los uevents del kernel, no bloqueante.
+
+    fileno() se conecta a un QSocketNotifier (o a select); cuando hay
+    datos, disk_events() devuelve los altas/bajas de discos completos.
+    Lanza OSError si netlink no está disponible (contenedores, sandbox).
+    """
+
+    def __init__(self):
+        self._sock = socket.socket(
+            socket.AF_NETLINK,
+            socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+            NETLINK_KOBJECT_UEVENT)
+        try:
+            self._sock.bind((0, UEVENT_KERNEL_GROUP))
+        except OSError:
+            self._sock.close()
+            raise
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    @staticmethod
+    def parse(msg):
+        """'add@/devices/...\0ACTION=add\0SUBSYSTEM=block\0...' -> dict"""
+        fields = msg.split(b"\0")
+        env = {}
+        for field in fields[1:]:
+            key, sep, value = field.partition(b"=")
+            if sep:
+                env[key.decode("ascii", "replace")] = value.decode("utf-8", "replace")
+        return env
+
+    def events(self):
+        """Todos los uevents pendientes (vacía el socket)"""
+        out = []
+        while True:
+            try:
+                msg = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return out
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    continue    # se perdieron eventos, el resto sigue en la cola
+                return out      # socket cerrado o inválido: no bloquear la interfaz
+            if msg.startswith(b"libudev"):
+                continue
+            out.append(self.parse(msg))
+
+    def disk_events(self):
+        """[(acción, nombre)] de discos completos: add, remove o change"""
+        return [(ev.get("ACTION"), ev.get("DEVNAME", "").rpartition("/")[2])
+                for ev in self.events()
+                if ev.get("SUBSYSTEM") == "block" and ev.get("DEVTYPE") == "disk"
+                and ev.get("ACTION") in ("add", "remove", "change")]
+
+    def close(self):
+        self._sock.close()
+
+
+class MountWatcher:
+    """Cambios en la tabla de montajes sin sondeo periódico.
+
+    El kernel marca /proc/self/mountinfo con POLLPRI|POLLERR en cada
+    mount/umount; fileno() se conecta a un QSocketNotifier de tipo
+    Exception (o a select.poll con POLLPRI). changes() relee la tabla —lo
+    que además rearma el aviso— y la compara con la anterior por ID de
+    montaje.
+    """
+
+    def __init__(self, path="/proc/self/mountinfo"):
+        self._fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        self._mounts = self._read()
+
+    def fileno(self):
+        return self._fd
+
+    def _read(self):
+        chunks, offset = [], 0
+        while True:
+            chunk = os.pread(self._fd, 65536, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+        mounts = {}
+        for line in b"".join(chunks).decode("utf-8", "replace").splitlines():
+            mounts[line.partition(" ")[0]] = line
+        return mounts
+
+    def changes(self):
+        """[(acción, maj:min, origen, punto)] desde la última llamada
+
+        acción es "mount", "umount" o "remount" (opciones cambiadas).
+        """
+        old, new = self._mounts, self._read()
+        self._mounts = new
+        out = []
+        for mount_id in new.keys() | old.keys():
+            before, after = old.get(mount_id), new.get(mount_id)
+            if before == after:
+                continue
+            action = "mount" if before is None else "umount" if after is None else "remount"
+            parsed = _mountinfo_entry(after or before)
+            if parsed is not None:
+                out.append((action,) + parsed[:3])
+        return out
+
+    def close(self):
+        os.close(self._fd)
+
+
+# ─────────────────────────────────────────────
+#  HEADLESS CLI  (sin PyQt5: cron, Ansible, servidores)
+# ─────────────────────────────────────────────
+CLI_USAGE = """Uso: linux_hwmonitor.py [comando] [opciones]
+
+Sin comando abre la interfaz gráfica. Comandos sin interfaz (no cargan PyQt5):
+  scan     Lee S.M.A.R.T. de todos los discos en paralelo y escribe una línea
+           JSON por disco en stdout a medida que termina cada uno.
+  selftest Lanza autotests S.M.A.R.T. (corto o extendido) escalonados y
+           escribe una línea JSON por cada cambio de progreso.
+  fs       Guarda una muestra del uso de cada sistema de archivos montado y
+           escribe una línea JSON por montaje con los días hasta llenarse.
+  du       Tamaño de los directorios de un sistema de archivos (como du -x,
+           en paralelo), de mayor a menor.
+  bench    Mide el parser S.M.A.R.T. sobre salidas grabadas (scan --record),
+           con --device el backend nativo frente a smartctl y con --read
+           la velocidad de lectura de un disco, loop o archivo (sólo lectura).
+"""
+
+
+def _scan_record(disk, data, elapsed):
+    """Línea JSON del comando scan para un disco"""
+    fc = SMART_FORECASTER.forecast(_history_ident(disk["path"]))
+    return {
+        "host":           os.uname().nodename,
+        "device":         disk["path"],
+        "name":           disk["name"],
+        "model":          data.get("model") or disk.get("model"),
+        "size":           disk.get("size"),
+        "rotational":     disk.get("rotational"),
+        "id":             _disk_identity(disk["path"]),
+        "interface":      data.get("interface"),
+        "firmware":       data.get("firmware"),
+        "health":         data.get("health"),
+        "life_percent":   data.get("life_percent"),
+        "temp":           data.get("temp"),
+        "power_on_hours": data.get("power_on_hours"),
+        "power_on_count": data.get("power_on_count"),
+        "total_writes_gb": data.get("total_writes"),
+        "standby":        bool(data.get("standby")),
+        "forecast":       fc,
+        "attributes":     data.get("attributes", []),
+        "nvme_log":       data.get("nvme_log", {}),
+        "error":          data.get("raw_output") if not data.get("attributes") else "",
+        "elapsed_ms":     round(elapsed * 1000, 1),
+    }
+
+
+def cli_scan(argv):
+    import argparse
+    ap = argparse.ArgumentParser(
+        prog="linux_hwmonitor.py scan",
+        description="Barrido S.M.A.R.T. sin interfaz; una línea JSON por disco. "
+                    "Código de salida 1 si algún disco está en estado Malo.")
+    ap.add_argument("devices", nargs="*", help="rutas /dev/... (por defecto, todos)")
+    ap.add_argument("-w", "--workers", type=int, default=SMART_SWEEP_WORKERS,
+                    help="smartctl simultáneos (por defecto %(default)s)")
+    ap.add_argument("--no-history", action="store_true",
+                    help="no guardar las lecturas en el historial")
+    ap.add_argument("--record", metavar="DIR",
+                    help="guardar la salida cruda de cada disco en DIR/<disco>.json")
+    ap.add_argument("--replay", metavar="DIR",
+                    help="leer DIR/<disco>.json en lugar de los discos (implica --no-history)")
+    args = ap.parse_args(argv)
+
+    global SMART_RECORD_DIR, SMART_REPLAY_DIR
+    if args.record:
+        SMART_RECORD_DIR = args.record
+    if args.replay:
+        SMART_REPLAY_DIR = args.replay
+    if args.no_history or SMART_REPLAY_DIR:
+        SMART_HISTORY.directory = ""
+    if SMART_REPLAY_DIR and not args.devices:
+        disks = [{"name": n, "path": "/dev/" + n, "model": "", "size": "?",
+                  "rotational": None} for n in _smart_fixtures(SMART_REPLAY_DIR)]
+    else:
+        disks = get_disks()
+    if args.devices:
+        known = {d["path"]: d for d in disks}
+        disks = [known.get(p) or {"name": os.path.basename(p), "path": p,
+                                  "model": "", "size": "?", "rotational": None}
+                 for p in args.devices]
+
+    out_lock = threading.Lock()
+    started  = time.monotonic()
+    bad = []
+
+    def _emit(disk, data):
+        line = json.dumps(_scan_record(disk, data, time.monotonic() - started),
+                          ensure_ascii=False, default=str)
+        with out_lock:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+            if data.get("health") == "Malo":
+                bad.append(disk["path"])
+
+    smart_sweep(disks, _emit, max_workers=args.workers)
+    return 1 if bad else 0
+
+
+def cli_selftest(argv):
+    import argparse
+    ap = argparse.ArgumentParser(
+        prog="linux_hwmonitor.py selftest",
+        description="Autotests S.M.A.R.T. escalonados; espera a que terminen. "
+                    "Código de salida 1 si alguno falla.")
+    ap.add_argument("kind", choices=sorted(SELFTEST_KINDS), help="short o long")
+    ap.add_argument("devices", nargs="*", help="rutas /dev/... (por defecto, todos)")
+    ap.add_argument("--stagger", type=int, default=SELFTEST_STAGGER,
+                    help="segundos entre arranques (por defecto %(default)s)")
+    ap.add_argument("--poll-min", type=int, default=SELFTEST_POLL_MIN,
+                    help="primer intervalo de sondeo en segundos (por defecto %(default)s)")
+    args = ap.parse_args(argv)
+
+    paths = args.devices or [d["path"] for d in get_disks()]
+    out_lock = threading.Lock()
+    failed = []
+
+    def _emit(path, state):
+        with out_lock:
+            sys.stdout.write(json.dumps({"device": path, **state}, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+            if state["state"] in ("failed", "error"):
+                failed.append(path)
+
+    sched = SelfTestScheduler(_emit, stagger=args.stagger,
+                              poll_min=max(1, args.poll_min))
+    sched.schedule(paths, args.kind)
+    try:
+        while sched.active():
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        sched.cancel()
+        return 130
+    return 1 if failed else 0
+
+
+def cli_fs(argv):
+    import argparse
+    ap = argparse.ArgumentParser(
+        prog="linux_hwmonitor.py fs",
+        description="Uso y pronóstico de llenado de los sistemas de archivos montados "
+                    "(para cron). Código de salida 1 si alguno se llena en menos de "
+                    "--warn días.")
+    ap.add_argument("--warn", type=float, default=FS_FULL_WARN_DAYS,
+                    help="días de aviso (por defecto %(default)s)")
+    ap.add_argument("--no-history", action="store_true",
+                    help="no guardar la muestra (sólo pronosticar con el historial)")
+    args = ap.parse_args(argv)
+
+    pools = POOLS.pools()
+    snapshot = {disk: annotate_pools(parts, pools)
+                for disk, parts in PARTITIONS.snapshot(refresh=True).items()}
+    if not args.no_history:
+        record_fs_usage(snapshot)
+    parts, seen = [], set()
+    for disk in sorted(snapshot, key=_disk_sort_key):
+        for p in snapshot[disk]:
+            ident = fs_ident(p)
+            if ident and ident not in seen and p.get("used_gb") is not None:
+                seen.add(ident)
+                parts.append((disk, ident, p))
+    days = FS_FORECASTER.forecast_many([ident for _, ident, _ in parts])
+    warn = False
+    for disk, ident, p in parts:
+        full = days[ident]
+        warn |= full is not None and full < args.warn
+        sys.stdout.write(json.dumps({
+            "host": os.uname().nodename, "disk": disk, "device": p["name"],
+            "mounts": p["mounts"], "fstype": p["fstype"], "uuid": p.get("uuid") or None,
+            "total_gb": round(p["total_gb"], 3), "used_gb": round(p["used_gb"], 3),
+            "free_gb": round(p["free_gb"], 3), "percent": p["percent"],
+            "inodes_percent": p.get("inodes_percent"),
+            "full_days": round(full, 1) if full is not None else None,
+            "pool": pool_text(p["pool"]) if p.get("pool") else None,
+        }, ensure_ascii=False) + "\n")
+    return 1 if warn else 0
+
+
+def cli_du(argv):
+    import argparse
+    ap = argparse.ArgumentParser(
+        prog="linux_hwmonitor.py du",
+        description="Espacio ocupado por directorio, sin salir del sistema de archivos "
+                    "y contando una vez los enlaces duros.")
+    ap.add_argument("path", help="directorio o punto de montaje")
+    ap.add_argument("-w", "--workers", type=int, default=DU_WORKERS,
+                    help="hilos de recorrido (por defecto %(default)s)")
+    ap.add_argument("-n", "--top", type=int, default=20,
+                    help="entradas mostradas (por defecto %(default)s)")
+    args = ap.parse_args(argv)
+
+    try:
+        scan = DirScanner(args.path, args.workers).run()
+    except OSError as e:
+        print(f"{args.path}: {e}", file=sys.stderr)
+        return 1
+    for name, nbytes, _index in scan.children()[:max(1, args.top)]:
+        print(f"{_human_size(nbytes):>8}  {name}")
+    print(f"{_human_size(scan.total[0]):>8}  {scan.root}")
+    print(f"{scan.files:,} archivos, {scan.dirs:,} directorios en {scan.elapsed:.2f} s"
+          + (f", {scan.errors} sin acceso" if scan.errors else ""), file=sys.stderr)
+    return 0
+
+
+def _smart_fixtures(directory):
+    """Nombres de disco con salida grabada en directory (<disco>.json)"""
+    try:
+        return sorted(f[:-5] for f in os.listdir(directory) if f.endswith(".json"))
+    except OSError:
+        return []
+
+
+def bench_smart_parser(out, rounds=2000):
+    """Lecturas/s de parse_smartctl_output y memoria por lectura.
+
+    Devuelve parses_per_s, blocks (bloques que retiene el resultado) y
+    peak_kb (pico de memoria durante una lectura, con tracemalloc).
+    """
+    import tracemalloc
+    parse_smartctl_output(out)      # calentar (re, json)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        parse_smartctl_output(out)
+    elapsed = time.perf_counter() - t0
+
+    before = sys.getallocatedblocks()
+    result = parse_smartctl_output(out)
+    blocks = sys.getallocatedblocks() - before
+    del result
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        parse_smartctl_output(out)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return {"parses_per_s": rounds / elapsed if elapsed else 0.0,
+            "blocks": blocks, "peak_kb": peak / 1024}
+
+
+ATA_DUMP_FILES = ("identify", "smart-values", "smart-thresholds")
+
+
+def _read_ata_dump(directory):
+    """Sectores ATA volcados en directory/<identify|smart-values|smart-thresholds>.bin"""
+    sectors = []
+    for name in ATA_DUMP_FILES:
+        try:
+            with open(os.path.join(directory, name + ".bin"), "rb") as f:
+                sectors.append(f.read())
+        except OSError:
+            sectors.append(None)
+    return sectors
+
+
+def bench_ata_decoder(identify, values, thresholds=None, rounds=2000):
+    """Lecturas/s del backend nativo ATA sin el ioctl (decodificar + _parse_smart_json)"""
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        _parse_smart_json(_smart_json_from_ata(identify, values, thresholds))
+    elapsed = time.perf_counter() - t0
+    return rounds / elapsed if elapsed else 0.0
+
+
+def bench_reference(rounds=2000):
+    """Lecturas/s de json.loads sobre una tabla de atributos fija.
+
+    Es la unidad de las líneas base de bench: guardar las lecturas/s
+    relativas a esta carga hace que una línea base grabada en otra máquina
+    (más rápida o más lenta) siga sirviendo para comparar.
+    """
+    doc = json.dumps({"ata_smart_attributes": {"table": [
+        {"id": i, "name": f"Attribute_{i}", "value": 100, "worst": 100, "thresh": 6,
+         "flags": {"value": 0x0F, "string": "POSR-- "}, "raw": {"value": i * 1000, "string": str(i * 1000)}}
+        for i in range(1, 31)]}})
+    best = None
+    for _ in range(3):                  # la mejor de tres: es el divisor de todo lo demás
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            json.loads(doc)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return rounds / best if best else 0.0
+
+
+def _load_bench_baseline(path):
+    """Línea base de bench guardada con --save-baseline ({} si no existe)"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _vs_baseline(value, base, reference=None):
+    """±% frente a la línea base; reference: bench_reference() si ésta es relativa"""
+    if reference:
+        value /= reference
+    return f"  {(value / base - 1) * 100:+.0f}%" if base else ""
+
+
+def cli_bench(argv):
+    import argparse
+    ap = argparse.ArgumentParser(
+        prog="linux_hwmonitor.py bench",
+        description="Rendimiento del parser S.M.A.R.T. sobre salidas de smartctl "
+                    "grabadas con 'scan --record DIR'.")
+    ap.add_argument("fixtures", nargs="?", default=SMART_REPLAY_DIR or None,
+                    help="directorio con <disco>.json (o LINUXHWMONITOR_SMART_REPLAY)")
+    ap.add_argument("-n", "--rounds", type=int, default=2000,
+                    help="lecturas por archivo (por defecto %(default)s)")
+    ap.add_argument("--device", action="append", default=[],
+                    help="además, comparar backend nativo y smartctl en este disco")
+    ap.add_argument("--read", action="append", default=[], metavar="RUTA",
+                    help="benchmark de lectura (O_DIRECT, sólo lectura) de un disco, loop o archivo")
+    ap.add_argument("--seconds", type=float, default=BENCH_SECONDS,
+                    help="duración de cada prueba de --read (por defecto %(default)s)")
+    ap.add_argument("--no-history", action="store_true",
+                    help="no guardar los resultados de --read en el historial")
+    ap.add_argument("--ata", metavar="DIR",
+                    help="decodificar los volcados ATA de DIR/<disco>/*.bin y compararlos "
+                         "con el parser de smartctl")
+    ap.add_argument("--baseline", metavar="ARCHIVO",
+                    help="comparar las lecturas/s con una línea base guardada")
+    ap.add_argument("--save-baseline", metavar="ARCHIVO",
+                    help="guardar las lecturas/s de esta ejecución como línea base "
+                         "(relativas a json.loads, comparables entre máquinas)")
+    args = ap.parse_args(argv)
+    if not args.fixtures and not args.device and not args.read and not args.ata:
+        ap.error("indica un directorio de salidas grabadas, --ata, --device o --read")
+
+    baseline = _load_bench_baseline(args.baseline) if args.baseline else {}
+    saved = {}
+    reference = bench_reference(max(1, args.rounds)) if args.fixtures or args.ata else 0.0
+    # Las líneas base antiguas guardaban lecturas/s absolutas
+    scale = reference if baseline.get("relative") else None
+    if reference:
+        print(f"referencia json.loads: {reference:.0f} lecturas/s")
+    if args.fixtures:
+        names = _smart_fixtures(args.fixtures)
+        if not names:
+            ap.error(f"no hay archivos .json en {args.fixtures}")
+        base = baseline.get("parser", {})
+        saved["parser"] = {}
+        print(f"{'archivo':<28} {'lecturas/s':>11} {'bloques':>8} {'pico KB':>8}")
+        total = 0.0
+        for name in names:
+            with open(_smart_fixture_path(args.fixtures, name)) as f:
+                out = f.read()
+            r = bench_smart_parser(out, max(1, args.rounds))
+            total += 1 / r["parses_per_s"] if r["parses_per_s"] else 0.0
+            saved["parser"][name] = r["parses_per_s"]
+            print(f"{name:<28} {r['parses_per_s']:>11.0f} {r['blocks']:>8d} {r['peak_kb']:>8.1f}"
+                  + _vs_baseline(r["parses_per_s"], base.get(name), scale))
+        if total:
+            print(f"{'total':<28} {len(names) / total:>11.0f}")
+
+    if args.ata:
+        try:
+            dumps = sorted(d for d in os.listdir(args.ata) if os.path.isdir(os.path.join(args.ata, d)))
+        except OSError:
+            dumps = []
+        if not dumps:
+            ap.error(f"no hay volcados ATA en {args.ata}")
+        base = baseline.get("ata", {})
+        parser = saved.get("parser", {})
+        saved["ata"] = {}
+        print(f"{'volcado ATA':<28} {'lecturas/s':>11} {'smartctl':>11}")
+        for name in dumps:
+            identify, values, thresholds = _read_ata_dump(os.path.join(args.ata, name))
+            if not values:
+                continue
+            rate = bench_ata_decoder(identify, values, thresholds, max(1, args.rounds))
+            saved["ata"][name] = rate
+            ref = f"{parser[name]:>11.0f}" if name in parser else f"{'--':>11}"
+            print(f"{name:<28} {rate:>11.0f} {ref}" + _vs_baseline(rate, base.get(name), scale))
+
+    for dev in args.device:
+        for backend, r in bench_smart_backends(dev).items():
+            state = "ok" if r["ok"] else "sin datos"
+            print(f"{dev:<16} {backend:<8} {r['ms']:>8.2f} ms  {state}")
+
+    for path in args.read:
+        baseline = bench_baseline(path)
+
+        def _show(name, r, path=path, baseline=baseline):
+            if r is None:
+                return
+            lat = f"{r['lat_ms']:.3f}" if r["lat_ms"] is not None else "--"
+            line = f"{path:<16} {name:<10} {r['mbs']:>9.1f} MB/s {r['iops']:>10.0f} IOPS {lat:>8} ms"
+            if baseline.get(name):
+                line += f"  {(r['mbs'] / baseline[name] - 1) * 100:+.0f}%"
+            print(line, flush=True)
+
+        try:
+            result = bench_disk(path, seconds=args.seconds, on_test=_show)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+        if not result["direct"]:
+            print(f"{path}: sin O_DIRECT, resultados afectados por la caché", file=sys.stderr)
+        if not args.no_history and path.startswith("/dev/"):
+            record_bench(path, result)
+
+    if args.save_baseline and saved:
+        relative = {group: {name: round(rate / reference, 4) for name, rate in rates.items()}
+                    for group, rates in saved.items()}
+        with open(args.save_baseline, "w") as f:
+            json.dump(dict(relative, relative=True), f, indent=1, sort_keys=True)
+            f.write("\n")
+    return 0
+
+
+CLI_COMMANDS = {
+    "scan":     cli_scan,
+    "selftest": cli_selftest,
+    "bench":    cli_bench,
+    "fs":       cli_fs,
+    "du":       cli_du,
+}
+
+
+def cli_main(argv):
+    if not argv or argv[0] in ("-h", "--help"):
+        sys.stdout.write(CLI_USAGE)
+        return 0
+    return CLI_COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] in (*CLI_COMMANDS, "-h", "--help"):
+    sys.exit(cli_main(sys.argv[1:]))
+
+
+# psutil y PyQt5 sólo hacen falta para la interfaz (get_cpu_info y
+# get_ram_info los usa el panel del sistema): la CLI funciona sin ellos
+import psutil  # noqa: E402
+from PyQt5.QtWidgets import (  # noqa: E402
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QTabWidget, QLabel, QPushButton, QTableView,
+    QHeaderView, QFrame, QScrollArea, QGridLayout, QSizePolicy,
+    QGroupBox, QStatusBar, QToolBar, QAction, QSplitter, QComboBox,
+    QProgressBar, QMessageBox, QDialog, QMenu
+)
+from PyQt5.QtCore import (  # noqa: E402
+    Qt, QTimer, QThread, pyqtSignal, QSize, QAbstractTableModel, QModelIndex,
+    QSocketNotifier
+)
+from PyQt5.QtGui import (  # noqa: E402
+    QFont, QColor, QPalette, QIcon, QPixmap, QPainter, QBrush,
+    QPen, QLinearGradient, QFontDatabase
+)
+
+# ─────────────────────────────────────────────
+#  STYLESHEET
+# ─────────────────────────────────────────────
+STYLE = """
+QMainWindow, QDialog {
+    background-color: #0d1117;
+}
+QWidget {
+    background-color: #0d1117;
+    color: #e6edf3;
+    font-family: 'Consolas', 'Liberation Mono', monospace;
+    font-size: 15px;
+}
+QTabWidget::pane {
+    border: 1px solid #30363d;
+    background-color: #161b22;
+}
+QTabBar::tab {
+    background-color: #21262d;
+    color: #8b949e;
+    padding: 8px 20px;
+    border: 1px solid #30363d;
+    border-bottom: none;
+    font-size: 15px;
+    font-weight: bold;
+}
+QTabBar::tab:selected {
+    background-color: #161b22;
+    color: #58a6ff;
+    border-bottom: 2px solid #58a6ff;
+}
+QTabBar::tab:hover:!selected {
+    background-color: #30363d;
+    color: #e6edf3;
+}
+QTableView {
+    background-color: #0d1117;
+    alternate-background-color: #161b22;
+    gridline-color: #21262d;
+    border: 1px solid #30363d;
+    color: #e6edf3;
+    selection-background-color: #1f3a5f;
+    selection-color: #58a6ff;
+}
+QTableView::item {
+    padding: 4px 8px;
+    border-bottom: 1px solid #21262d;
+}
+QHeaderView::section {
+    background-color: #21262d;
+    color: #8b949e;
+    padding: 6px 8px;
+    border: none;
+    border-bottom: 2px solid #30363d;
+    font-weight: bold;
+    font-size: 14px;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+QScrollBar:vertical {
+    background-color: #0d1117;
+    width: 12px;
+    border: none;
+}
+QScrollBar::handle:vertical {
+    background-color: #30363d;
+    border-radius: 6px;
+    min-height: 20px;
+}
+QScrollBar::handle:vertical:hover {
+    background-color: #58a6ff;
+}
+QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0; }
+QScrollBar:horizontal {
+    background-color: #0d1117;
+    height: 12px;
+    border: none;
+}
+QScrollBar::handle:horizontal {
+    background-color: #30363d;
+    border-radius: 6px;
+}
+QScrollBar::handle:horizontal:hover { background-color: #58a6ff; }
+QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width: 0; }
+QPushButton {
+    background-color: #21262d;
+    color: #e6edf3;
+    border: 1px solid #30363d;
+    border-radius: 4px;
+    padding: 6px 14px;
+    font-size: 15px;
+}
+QPushButton:hover {
+    background-color: #30363d;
+    border-color: #58a6ff;
+    color: #58a6ff;
+}
+QPushButton:pressed { background-color: #1f3a5f; }
+QGroupBox {
+    border: 1px solid #30363d;
+    border-radius: 6px;
+    margin-top: 14px;
+    padding-top: 8px;
+    color: #58a6ff;
+    font-weight: bold;
+    font-size: 15px;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    subcontrol-position: top left;
+    left: 10px;
+    padding: 0 6px;
+    color: #58a6ff;
+}
+QProgressBar {
+    border: 1px solid #30363d;
+    border-radius: 4px;
+    background-color: #0d1117;
+    text-align: center;
+    color: #e6edf3;
+    height: 16px;
+    font-size: 14px;
+}
+QProgressBar::chunk {
+    border-radius: 3px;
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 #1f6feb, stop:1 #58a6ff);
+}
+QLabel { background-color: transparent; }
+QComboBox {
+    background-color: #21262d;
+    border: 1px solid #30363d;
+    border-radius: 4px;
+    padding: 4px 10px;
+    color: #e6edf3;
+    min-width: 180px;
+}
+QComboBox:hover { border-color: #58a6ff; }
+QComboBox QAbstractItemView {
+    background-color: #21262d;
+    border: 1px solid #30363d;
+    selection-background-color: #1f3a5f;
+}
+QStatusBar {
+    background-color: #161b22;
+    color: #8b949e;
+    border-top: 1px solid #30363d;
+    font-size: 14px;
+}
+QSplitter::handle {
+    background-color: #30363d;
+    width: 2px;
+}
+QToolBar {
+    background-color: #161b22;
+    border-bottom: 1px solid #30363d;
+    spacing: 4px;
+    padding: 4px;
+}
+"""
+
+# ─────────────────────────────────────────────
+#  COLOR HELPERS
+# ─────────────────────────────────────────────
+def health_color(status):
+    colors = {
+        "Bueno":       "#3fb950",
+        "Precaución":  "#d29922",
+        "Malo":        "#f85149",
+        "Desconocido": "#8b949e",
+    }
+    return colors.get(status, "#8b949e")
 
+def usage_color(pct):
+    if pct < 60:  return "#3fb950"
+    if pct < 80:  return "#d29922"
+    return "#f85149"
 
-def get_motherboard_info():
-    """Detectar motherboard via dmidecode y /sys"""
-    info = {
-        "manufacturer": "", "model": "", "version": "",
-        "serial": "**************",
-        "bios_vendor": "", "bios_version": "", "bios_date": "",
-        "bios_type": "",
-        "chipset": "",
-        "slots_pcie": [], "slots_used": 0,
-        "sata_ports": 0,
-    }
+def temp_color(temp):
+    if temp is None: return "#8b949e"
+    if temp < 40:   return "#3fb950"
+    if temp < 55:   return "#d29922"
+    return "#f85149"
 
-    # /sys fallback (no necesita sudo)
-    info["manufacturer"] = _read_file("/sys/class/dmi/id/board_vendor")
-    info["model"]        = _read_file("/sys/class/dmi/id/board_name")
-    info["version"]      = _read_file("/sys/class/dmi/id/board_version")
-    info["bios_vendor"]  = _read_file("/sys/class/dmi/id/bios_vendor")
-    info["bios_version"] = _read_file("/sys/class/dmi/id/bios_version")
-    info["bios_date"]    = _read_file("/sys/class/dmi/id/bios_date")
 
-    # BIOS type (UEFI or Legacy)
-    uefi_check = run_cmd(["ls", "/sys/firmware/efi"])
-    info["bios_type"] = "UEFI" if uefi_check else "Legacy BIOS"
+# ─────────────────────────────────────────────
+#  PARTITION BAR WIDGET  (estilo macOS)
+# ─────────────────────────────────────────────
+# Paleta de colores para particiones
+_PART_COLORS = [
+    "#58a6ff",  # azul
+    "#3fb950",  # verde
+    "#d29922",  # amarillo
+    "#f78166",  # naranja
+    "#bc8cff",  # violeta
+    "#39d353",  # verde claro
+    "#ff7b72",  # rojo suave
+    "#79c0ff",  # azul claro
+]
 
-    # dmidecode para más detalles (con sudo)
-    dmi_board = run_cmd(["sudo", "-n", "dmidecode", "-t", "2"])
-    if dmi_board:
-        for line in dmi_board.split("\n"):
-            l = line.strip()
-            if l.startswith("Manufacturer:") and not info["manufacturer"]:
-                info["manufacturer"] = l.split(":",1)[1].strip()
-            if l.startswith("Product Name:") and not info["model"]:
-                info["model"] = l.split(":",1)[1].strip()
-            if l.startswith("Version:") and not info["version"]:
-                info["version"] = l.split(":",1)[1].strip()
+class PartitionBarWidget(QWidget):
+    """Visual disk partition bar, estilo macOS Disk Utility"""
 
-    # Chipset via lspci
-    lspci_all = run_cmd(["lspci"])
-    chipsets = []
-    for line in lspci_all.split("\n"):
-        if "ISA bridge" in line or "Host bridge" in line:
-            parts = line.split(" ", 1)
-            if len(parts) > 1:
-                chipsets.append(parts[1].strip())
-    info["chipset"] = chipsets[0] if chipsets else ""
+    def __init__(self, partitions=None, parent=None):
+        super().__init__(parent)
+        self.partitions = partitions or []
+        self.setMinimumHeight(20)
+        self.setMaximumHeight(24)
 
-    # PCIe slots
-    dmi_slots = run_cmd(["sudo", "-n", "dmidecode", "-t", "9"])
-    current_slot = {}
-    for line in (dmi_slots or "").split("\n"):
-        l = line.strip()
-        if l.startswith("System Slot Information"):
-            if current_slot: info["slots_pcie"].append(current_slot)
-            current_slot = {}
-        elif ":" in l:
-            k, _, v = l.partition(":")
-            current_slot[k.strip()] = v.strip()
-    if current_slot: info["slots_pcie"].append(current_slot)
-    info["slots_used"] = sum(1 for s in info["slots_pcie"]
-                             if s.get("Current Usage","").lower() == "in use")
+    def set_partitions(self, partitions):
+        self.partitions = partitions
+        self.update()
 
-    # SATA ports
-    info["sata_ports"] = len(glob.glob("/sys/class/ata_port/ata*"))
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        W = self.width()
+        H = self.height()
+        r = 5  # border radius
 
-    return info
+        # Background
+        p.setBrush(QBrush(QColor("#21262d")))
+        p.setPen(Qt.NoPen)
+        p.drawRoundedRect(0, 0, W, H, r, r)
 
+        if not self.partitions:
+            p.end()
+            return
 
-def get_ram_info():
-    """Detectar módulos de RAM via dmidecode"""
-    modules = []
-    total_bytes = psutil.virtual_memory().total
+        # Calculate total size
+        total = sum(pt.get("total_gb") or 0 for pt in self.partitions)
+        if total <= 0:
+            # Fallback: equal width
+            total = len(self.partitions)
+            for pt in self.partitions:
+                if not pt.get("total_gb"):
+                    pt["total_gb"] = 1.0
 
-    dmi = run_cmd(["sudo", "-n", "dmidecode", "-t", "17"])
-    if dmi:
-        current = {}
-        for line in dmi.split("\n"):
-            l = line.strip()
-            if l.startswith("Memory Device"):
-                if current: modules.append(current)
-                current = {}
-            elif ":" in l:
-                k, _, v = l.partition(":")
-                current[k.strip()] = v.strip()
-        if current: modules.append(current)
+        x = 0
+        for i, pt in enumerate(self.partitions):
+            gb = pt.get("total_gb") or 0
+            frac = gb / total if total else 0
+            seg_w = int(frac * W)
+            if i == len(self.partitions) - 1:
+                seg_w = W - x  # fill remainder
 
-    # Filter only populated slots
-    populated = [m for m in modules if m.get("Size","") not in ("No Module Installed","","Unknown")]
+            color = QColor(_PART_COLORS[i % len(_PART_COLORS)])
+            used_pct = pt.get("percent")
+            if used_pct is not None:
+                if used_pct > 90:
+                    color = QColor("#f85149")
+                elif used_pct > 75:
+                    color = QColor("#d29922")
 
-    if not populated:
-        # fallback from /proc/meminfo
-        vm = psutil.virtual_memory()
-        populated = [{
-            "Size": f"{vm.total // (1024**3)} GB",
-            "Type": "DDR",
-            "Speed": "Desconocido",
-            "Manufacturer": "Desconocido",
-            "Part Number": "Desconocido",
-            "Locator": "DIMM 0",
-            "Bank Locator": "",
-            "Form Factor": "",
-            "Data Width": "",
-        }]
+            # Draw segment
+            if x == 0 and seg_w >= W - 2:
+                # Full bar
+                p.setBrush(QBrush(color))
+                p.drawRoundedRect(x, 0, seg_w, H, r, r)
+            elif x == 0:
+                # Left end rounded
+                p.setBrush(QBrush(color))
+                p.drawRoundedRect(x, 0, seg_w + r, H, r, r)
+                p.drawRect(x + seg_w - r, 0, r, H)
+            elif x + seg_w >= W:
+                # Right end rounded
+                p.setBrush(QBrush(color))
+                p.drawRoundedRect(x - r, 0, seg_w + r, H, r, r)
+                p.drawRect(x - r, 0, r, H)
+            else:
+                # Middle: plain rect
+                p.setBrush(QBrush(color))
+                p.drawRect(x, 0, seg_w, H)
 
-    # Also get total slots count
-    total_slots = len(modules)
+            # Divider
+            if i < len(self.partitions) - 1:
+                p.setPen(QPen(QColor("#0d1117"), 1))
+                p.drawLine(x + seg_w, 0, x + seg_w, H)
+                p.setPen(Qt.NoPen)
 
-    return {
-        "modules": populated,
-        "total_slots": total_slots,
-        "populated_slots": len(populated),
-        "total_gb": total_bytes / 1e9,
-        "type": populated[0].get("Type","") if populated else "",
-        "speed_mhz": populated[0].get("Speed","") if populated else "",
-        "channel": _detect_ram_channel(populated),
-    }
+            x += seg_w
 
-def _detect_ram_channel(modules):
-    if len(modules) >= 4: return "Cuádruple Canal"
-    if len(modules) == 2:
-        banks = set(m.get("Bank Locator","") for m in modules)
-        return "Doble Canal" if len(banks) >= 2 else "Doble Canal (probable)"
-    if len(modules) == 1: return "Canal Único"
-    return "Desconocido"
+        p.end()
 
 
 # ─────────────────────────────────────────────
@@ -993,11 +4742,12 @@ def copy_to_clipboard(text):
 #  CUSTOM WIDGETS
 # ─────────────────────────────────────────────
 class HealthBadge(QWidget):
-    """Big colored health status badge — shows status + vida útil %"""
+    """Big colored health status badge — shows status + vida útil % + pronóstico"""
     def __init__(self, status="Desconocido", percent=None, parent=None):
         super().__init__(parent)
-        self.status  = status
-        self.percent = percent
+        self.status   = status
+        self.percent  = percent
+        self.forecast = ""
         self.setMinimumSize(120, 80)
         self.setMaximumSize(140, 92)
 
@@ -1006,6 +4756,12 @@ class HealthBadge(QWidget):
         self.percent = percent
         self.update()
 
+    def set_forecast(self, fc):
+        """Pronóstico de SmartForecaster: línea corta + detalle en el tooltip"""
+        self.forecast, details = forecast_text(fc)
+        self.setToolTip(details)
+        self.update()
+
     def paintEvent(self, event):
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing)
@@ -1021,7 +4777,15 @@ class HealthBadge(QWidget):
         font = QFont("Consolas", 16, QFont.Bold)
         p.setFont(font)
         rect = self.rect()
-        if self.percent is not None:
+        if self.forecast and self.percent is not None:
+            # Three rows: status / percent / forecast
+            h = rect.height()
+            p.drawText(rect.adjusted(0, 4, 0, -2 * h // 3 + 8), Qt.AlignCenter, self.status)
+            p.setFont(QFont("Consolas", 13, QFont.Bold))
+            p.drawText(rect.adjusted(0, h // 3, 0, -h // 3), Qt.AlignCenter, f"{self.percent}%")
+            p.setFont(QFont("Consolas", 9, QFont.Bold))
+            p.drawText(rect.adjusted(0, 2 * h // 3 - 6, 0, -6), Qt.AlignCenter, self.forecast)
+        elif self.percent is not None:
             # Status on upper half
             upper = rect.adjusted(0, 4, 0, -rect.height()//2)
             p.drawText(upper, Qt.AlignCenter, self.status)
@@ -1056,11 +4820,42 @@ class TempWidget(QWidget):
         p.setPen(QPen(color, 2))
         p.drawRoundedRect(2, 2, self.width()-4, self.height()-4, 8, 8)
 
-        p.setPen(color)
-        font = QFont("Consolas", 17, QFont.Bold)
-        p.setFont(font)
-        text = f"{self.temp}°C" if self.temp is not None else "--°C"
-        p.drawText(self.rect(), Qt.AlignCenter, text)
+        p.setPen(color)
+        font = QFont("Consolas", 17, QFont.Bold)
+        p.setFont(font)
+        text = f"{self.temp}°C" if self.temp is not None else "--°C"
+        p.drawText(self.rect(), Qt.AlignCenter, text)
+        p.end()
+
+
+class IoSparkline(QWidget):
+    """Mini gráfico de actividad: MB/s de lectura (verde) y escritura (azul)"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.samples = ()
+        self.setFixedSize(180, 34)
+
+    def set_samples(self, samples):
+        self.samples = samples
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setBrush(QBrush(QColor("#0d1117")))
+        p.setPen(QPen(QColor("#30363d"), 1))
+        p.drawRoundedRect(0, 0, self.width() - 1, self.height() - 1, 4, 4)
+        samples = list(self.samples)
+        if len(samples) >= 2:
+            w, h = self.width() - 4, self.height() - 6
+            peak = max(1.0, max(max(s["r_mbs"], s["w_mbs"]) for s in samples))
+            step = w / (IOSTAT_HISTORY - 1)
+            x0 = 2 + w - step * (len(samples) - 1)
+            for key, color in (("r_mbs", "#3fb950"), ("w_mbs", "#58a6ff")):
+                p.setPen(QPen(QColor(color), 1.5))
+                pts = [(x0 + i * step, 3 + h - s[key] / peak * h) for i, s in enumerate(samples)]
+                for (xa, ya), (xb, yb) in zip(pts, pts[1:]):
+                    p.drawLine(int(xa), int(ya), int(xb), int(yb))
         p.end()
 
 
@@ -1068,17 +4863,28 @@ class DiskButton(QPushButton):
     """Disk selector button — lives inside the S.M.A.R.T. panel"""
     def __init__(self, disk, health="Desconocido", temp=None, parent=None):
         super().__init__(parent)
-        self.disk   = disk
-        self.health = health
-        self.temp   = temp
+        self.disk    = disk
+        self.health  = health
+        self.temp    = temp
+        self.standby = False
+        self.selftest = None    # estado de SelfTestScheduler
+        self.arrays  = []       # arrays md / pools dm de los que es miembro
         self.setCheckable(True)
         self._build()
 
     def _build(self):
         color    = health_color(self.health)
         temp_str = f"{self.temp}°C" if self.temp else "--°C"
+        if self.standby:
+            temp_str = "💤 en reposo"
         icon     = "💾" if self.disk.get("rotational") else "⚡"
-        self.setText(f"{icon}  {self.disk['name']}\n{self.health}   {temp_str}")
+        self.setText(f"{icon}  {self.disk['name']}\n{self.health}   {temp_str}"
+                     f"{self._selftest_text()}{self._array_text()}")
+        tips = [f"🧩 {array_text(a)}" for a in self.arrays]
+        if self.selftest is not None and self.selftest.get("result"):
+            tips.append(f"Autotest {SELFTEST_KINDS.get(self.selftest['kind'], '')}: "
+                        f"{self.selftest['result']}")
+        self.setToolTip("\n".join(tips))
         self.setStyleSheet(f"""
             QPushButton {{
                 background-color: #0d1117;
@@ -1103,18 +4909,556 @@ class DiskButton(QPushButton):
             }}
         """)
 
+    def _selftest_text(self):
+        st = self.selftest
+        if st is None:
+            return ""
+        if st["state"] == "queued":
+            return "   🔬 en cola"
+        if st["state"] == "running":
+            return f"   🔬 {st['percent'] or 0}%"
+        if st["state"] == "done":
+            return "   🔬 ✓"
+        return "   🔬 ✗"
+
+    def _array_text(self):
+        busy = next((a for a in self.arrays if a.get("progress") is not None), None)
+        if busy is not None:
+            return f"   🧩 {busy['name']} {busy['progress']:.0f}%"
+        bad = next((a for a in self.arrays if a["health"] != "Bueno"), None)
+        if bad is not None:
+            return f"   🧩 {bad['name']} ⚠"
+        return f"   🧩 {self.arrays[0]['name']}" if self.arrays else ""
+
+
+# ─────────────────────────────────────────────
+#  S.M.A.R.T. ATTRIBUTE MODEL
+# ─────────────────────────────────────────────
+class SmartAttrModel(QAbstractTableModel):
+    """Tabla de atributos S.M.A.R.T. para un QTableView.
+
+    set_attributes() compara con lo que ya se muestra y sólo emite
+    dataChanged para las celdas que cambiaron; si cambian los IDs (otro
+    disco) se reconstruye el modelo. Fuentes y colores se crean una vez.
+    """
+    HEADERS = ["ID", "Nombre del Atributo", "Estado", "Valor", "Peor", "Umbral", "Valor Raw"]
+    COLORS  = ["#8b949e", "#e6edf3", None, "#e6edf3", "#8b949e", "#8b949e", "#3fb950"]
+    FLAG_COL = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows    = []     # tuplas de 7 textos
+        self._message = None   # texto de la fila única cuando no hay atributos
+        self._brushes = {}
+        self._flag_font = QFont("Consolas", 14, QFont.Bold)
+        self._muted = self._brush("#8b949e")
+
+    @property
+    def message(self):
+        return self._message
+
+    def _brush(self, color):
+        brush = self._brushes.get(color)
+        if brush is None:
+            brush = self._brushes[color] = QBrush(QColor(color))
+        return brush
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 1 if self._message is not None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        row, col = index.row(), index.column()
+        if self._message is not None:
+            if role == Qt.DisplayRole and col == 0:
+                return self._message
+            if role == Qt.ForegroundRole:
+                return self._muted
+            return None
+        if role == Qt.DisplayRole:
+            return self._rows[row][col]
+        if role == Qt.ForegroundRole:
+            color = self.COLORS[col] or health_color(self._rows[row][col])
+            return self._brush(color)
+        if role == Qt.FontRole and col == self.FLAG_COL:
+            return self._flag_font
+        return None
+
+    def set_attributes(self, attrs, message=None):
+        """Muestra attrs (lista de dicts de get_smart_data) o, si está vacía, message"""
+        rows = [(a["id"], str(a["name"]), a["flag"], str(a["value"]),
+                 str(a["worst"]), str(a["thresh"]), str(a["raw"])) for a in attrs]
+        message = None if rows else (message or "")
+
+        old = self._rows
+        if (message is not None or self._message is not None
+                or len(rows) != len(old)
+                or any(r[0] != o[0] for r, o in zip(rows, old))):
+            if message == self._message and not rows and not old:
+                return
+            self.beginResetModel()
+            self._rows, self._message = rows, message
+            self.endResetModel()
+            return
+
+        self._rows = rows
+        last = len(self.HEADERS) - 1
+        for r, (new, cur) in enumerate(zip(rows, old)):
+            if new == cur:
+                continue
+            first = next(c for c in range(last + 1) if new[c] != cur[c])
+            end   = next(c for c in range(last, -1, -1) if new[c] != cur[c])
+            self.dataChanged.emit(self.index(r, first), self.index(r, end),
+                                  [Qt.DisplayRole, Qt.ForegroundRole])
+
+
+class LogTableModel(QAbstractTableModel):
+    """Tabla de sólo lectura para los logs NVMe (filas de textos ya formateados)"""
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self._rows   = []
+        self._colors = []
+        self._brushes = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        if role == Qt.ForegroundRole:
+            color = self._colors[index.row()]
+            brush = self._brushes.get(color)
+            if brush is None:
+                brush = self._brushes[color] = QBrush(QColor(color))
+            return brush
+        return None
+
+    def set_rows(self, rows, colors):
+        if rows == self._rows and colors == self._colors:
+            return
+        self.beginResetModel()
+        self._rows, self._colors = rows, colors
+        self.endResetModel()
+
+
+def nvme_error_rows(entries):
+    """Filas de LogTableModel para NvmeLogStore.errors()"""
+    rows, colors = [], []
+    for e in entries:
+        sf = e.get("status_field", {})
+        read_at = e.get("read_at")
+        rows.append((
+            f"{e.get('error_count', 0):,}",
+            sf.get("string", ""),
+            f"0x{sf.get('status_code_type', 0):x}/0x{sf.get('status_code', 0):02x}"
+            + ("  DNR" if sf.get("do_not_retry") else ""),
+            str(e.get("lba", {}).get("value", "")),
+            "--" if e.get("nsid") in (0, 0xFFFFFFFF, None) else str(e["nsid"]),
+            f"{e.get('submission_queue_id', '')}/{e.get('command_id', '')}",
+            datetime.fromtimestamp(read_at).strftime("%Y-%m-%d %H:%M") if read_at else "",
+        ))
+        colors.append("#f85149" if sf.get("status_code_type") == 2 else "#d29922")
+    return rows, colors
+
+
+def nvme_self_test_rows(entries):
+    """Filas de LogTableModel para NvmeLogStore.self_tests()"""
+    rows, colors = [], []
+    for e in entries:
+        result = e.get("self_test_result", {})
+        rows.append((
+            e.get("self_test_code", {}).get("string", ""),
+            result.get("string", ""),
+            f"{e.get('power_on_hours', 0):,} h",
+            str(e.get("segment", "--")),
+            str(e.get("lba", "--")),
+        ))
+        colors.append(health_color("Bueno" if result.get("value") == 0 else
+                                   "Precaución" if result.get("value") in (1, 2, 3, 4, 8, 9)
+                                   else "Malo"))
+    return rows, colors
+
+
+# ─────────────────────────────────────────────
+#  BENCHMARK DIALOG
+# ─────────────────────────────────────────────
+def _emit_alive(signal, value):
+    """signal.emit() desde un hilo de un diálogo que puede haberse borrado ya"""
+    try:
+        signal.emit(value)
+    except RuntimeError:        # wrapped C/C++ object ... has been deleted
+        pass
+
+
+class BenchDialog(QDialog):
+    """Benchmark de lectura de un disco (bench_disk) con resultados en vivo"""
+
+    _test_done = pyqtSignal(object)
+    _finished  = pyqtSignal(object)
+
+    COLUMNS = ["Prueba", "MB/s", "IOPS", "Latencia", "vs. anterior"]
+
+    def __init__(self, disk, parent=None):
+        super().__init__(parent)
+        self.disk = disk
+        self._cancel = None
+        self._baseline = {}
+        self.setWindowTitle(f"Benchmark de lectura — {disk['path']}")
+        self.setMinimumWidth(620)
+        self._test_done.connect(self._on_test)
+        self._finished.connect(self._on_finished)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(18, 16, 18, 16)
+        layout.setSpacing(12)
+
+        info = QLabel(
+            f"{disk.get('model') or disk['name']}  —  {disk.get('size', '?')}\n"
+            f"Sólo lectura (O_DIRECT): no se escribe nada en el disco. "
+            f"{len(BENCH_TESTS)} pruebas de {BENCH_SECONDS} s con lectura intensa."
+        )
+        info.setStyleSheet("color: #8b949e; font-size: 13px;")
+        info.setWordWrap(True)
+        layout.addWidget(info)
+
+        grid = QGridLayout()
+        grid.setHorizontalSpacing(18)
+        grid.setVerticalSpacing(6)
+        for col, title in enumerate(self.COLUMNS):
+            h = QLabel(title)
+            h.setStyleSheet("color: #8b949e; font-size: 13px; font-weight: bold;")
+            grid.addWidget(h, 0, col, alignment=Qt.AlignLeft if col == 0 else Qt.AlignRight)
+        self._cells = {}
+        for row, (name, *_rest) in enumerate(BENCH_TESTS, start=1):
+            lname = QLabel(name)
+            lname.setStyleSheet("color: #58a6ff; font-size: 15px; font-weight: bold;")
+            grid.addWidget(lname, row, 0)
+            cells = []
+            for col in range(1, len(self.COLUMNS)):
+                lv = QLabel("--")
+                lv.setStyleSheet("color: #e6edf3; font-size: 15px;")
+                lv.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                grid.addWidget(lv, row, col)
+                cells.append(lv)
+            self._cells[name] = cells
+        layout.addLayout(grid)
+
+        self._status = QLabel("")
+        self._status.setStyleSheet("color: #8b949e; font-size: 13px;")
+        layout.addWidget(self._status)
+
+        btn_l = QHBoxLayout()
+        btn_l.addStretch()
+        self._start_btn = QPushButton("  ▶  Iniciar  ")
+        self._start_btn.clicked.connect(self._start)
+        btn_l.addWidget(self._start_btn)
+        close_btn = QPushButton("  Cerrar  ")
+        close_btn.clicked.connect(self.reject)
+        btn_l.addWidget(close_btn)
+        layout.addLayout(btn_l)
+
+    def _start(self):
+        path = self.disk["path"]
+        self._start_btn.setEnabled(False)
+        self._baseline = bench_baseline(path)
+        for cells in self._cells.values():
+            for lv in cells:
+                lv.setText("--")
+        cancel = threading.Event()
+        self._cancel = cancel
+
+        def _worker():
+            try:
+                result = bench_disk(
+                    path, cancel=cancel,
+                    on_test=lambda name, r: _emit_alive(self._test_done, (name, r)))
+            except (OSError, ValueError) as e:
+                _emit_alive(self._finished, {"error": str(e)})
+                return
+            if not cancel.is_set():
+                record_bench(path, result)
+            _emit_alive(self._finished, {"result": result, "cancelled": cancel.is_set()})
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def _on_test(self, item):
+        name, r = item
+        cells = self._cells.get(name)
+        if cells is None:
+            return
+        if r is None:
+            self._status.setText(f"⏳  {name}...")
+            cells[0].setText("⏳")
+            return
+        cells[0].setText(f"{r['mbs']:,.1f}")
+        cells[1].setText(f"{r['iops']:,.0f}")
+        cells[2].setText(f"{r['lat_ms']:.2f} ms" if r["lat_ms"] is not None else "--")
+        base = self._baseline.get(name)
+        if base:
+            pct = (r["mbs"] / base - 1) * 100
+            color = "#f85149" if pct < -20 else "#d29922" if pct < -10 else "#3fb950"
+            cells[3].setText(f"{pct:+.0f}%")
+            cells[3].setStyleSheet(f"color: {color}; font-size: 15px;")
+        else:
+            cells[3].setText("primera vez")
+            cells[3].setStyleSheet("color: #8b949e; font-size: 15px;")
+
+    def _on_finished(self, info):
+        self._cancel = None
+        self._start_btn.setEnabled(True)
+        if info.get("error"):
+            self._status.setText(f"⚠  {info['error']}  (¿permisos? prueba con sudo)")
+        elif info.get("cancelled"):
+            self._status.setText("Cancelado — no se guardó el resultado")
+        else:
+            cache = "" if info["result"]["direct"] else "  ·  sin O_DIRECT (con caché)"
+            self._status.setText(f"✓  Guardado en el historial del disco{cache}")
+
+    def reject(self):
+        if self._cancel is not None:
+            self._cancel.set()
+        super().reject()
+
+
+# ─────────────────────────────────────────────
+#  DIRECTORY SIZE DIALOG  (treemap de DirScanner)
+# ─────────────────────────────────────────────
+def _squarify(sizes, x, y, w, h):
+    """Rectángulos (x, y, w, h) de un treemap "squarified" (sizes de mayor a menor, > 0)"""
+    rects = []
+    total = sum(sizes)
+    if total <= 0 or w <= 0 or h <= 0:
+        return [(x, y, 0, 0)] * len(sizes)
+    scale = w * h / total
+    areas = [v * scale for v in sizes]
+
+    def worst(row, side):
+        s = sum(row)
+        return max(max(side * side * a / (s * s), s * s / (side * side * a)) for a in row)
+
+    i = 0
+    while i < len(areas):
+        side = min(w, h)
+        row = [areas[i]]
+        i += 1
+        while i < len(areas) and worst(row + [areas[i]], side) <= worst(row, side):
+            row.append(areas[i])
+            i += 1
+        s = sum(row)
+        if w >= h:      # columna a la izquierda
+            cw, cy = s / h, y
+            for a in row:
+                rects.append((x, cy, cw, a / cw))
+                cy += a / cw
+            x, w = x + cw, w - cw
+        else:           # fila arriba
+            rh, cx = s / w, x
+            for a in row:
+                rects.append((cx, y, a / rh, rh))
+                cx += a / rh
+            y, h = y + rh, h - rh
+    return rects
+
+
+class TreemapWidget(QWidget):
+    """Treemap de [(nombre, bytes, índice)]; clic en un directorio = entrar en él"""
+
+    clicked = pyqtSignal(int)
+
+    MAX_TILES = 60
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items = []
+        self._rects = []
+        self.setMinimumSize(560, 340)
+        self.setMouseTracking(True)
+
+    def set_items(self, items):
+        items = [it for it in items if it[1] > 0]
+        if len(items) > self.MAX_TILES:
+            rest = items[self.MAX_TILES - 1:]
+            items = items[:self.MAX_TILES - 1] + [
+                (f"({len(rest)} más)", sum(it[1] for it in rest), None)]
+        self._items = items
+        self._layout()
+        self.update()
+
+    def _layout(self):
+        self._rects = _squarify([it[1] for it in self._items], 0, 0, self.width(), self.height())
+
+    def resizeEvent(self, event):
+        self._layout()
+        super().resizeEvent(event)
+
+    def _at(self, pos):
+        for i, (x, y, w, h) in enumerate(self._rects):
+            if x <= pos.x() < x + w and y <= pos.y() < y + h:
+                return i
+        return None
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor("#0d1117"))
+        font = p.font()
+        font.setPointSize(9)
+        p.setFont(font)
+        for i, ((name, nbytes, index), (x, y, w, h)) in enumerate(zip(self._items, self._rects)):
+            color = QColor(_PART_COLORS[i % len(_PART_COLORS)] if index is not None else "#30363d")
+            p.setPen(QPen(QColor("#0d1117"), 1))
+            p.setBrush(QBrush(color.darker(160)))
+            p.drawRect(int(x), int(y), max(0, int(w) - 1), max(0, int(h) - 1))
+            if w > 60 and h > 30:
+                p.setPen(QColor("#e6edf3"))
+                text = p.fontMetrics().elidedText(name, Qt.ElideMiddle, int(w) - 10)
+                p.drawText(int(x) + 5, int(y) + 4, int(w) - 10, int(h) - 8,
+                           Qt.AlignLeft | Qt.AlignTop, f"{text}\n{_human_size(nbytes)}")
+        p.end()
+
+    def mouseMoveEvent(self, event):
+        i = self._at(event.pos())
+        if i is None:
+            self.setToolTip("")
+            return
+        name, nbytes, index = self._items[i]
+        self.setToolTip(f"{name}\n{_human_size(nbytes)}" + ("" if index is None else "\nclic para entrar"))
+
+    def mousePressEvent(self, event):
+        i = self._at(event.pos())
+        if i is not None and self._items[i][2] is not None:
+            self.clicked.emit(self._items[i][2])
+
+
+class DirScanDialog(QDialog):
+    """¿Qué ocupa espacio? — DirScanner sobre un punto de montaje, en vivo"""
+
+    _progress = pyqtSignal(object)
+
+    def __init__(self, root, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self._scan = None
+        self._current = 0
+        self._cancel = threading.Event()
+        self.setWindowTitle(f"¿Qué ocupa espacio? — {root}")
+        self.resize(860, 600)
+        self._progress.connect(self._on_progress)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(18, 16, 18, 16)
+        layout.setSpacing(10)
+
+        top = QHBoxLayout()
+        self._up_btn = QPushButton("  ⬆  Subir  ")
+        self._up_btn.setEnabled(False)
+        self._up_btn.clicked.connect(self._up)
+        top.addWidget(self._up_btn)
+        self._path_lbl = QLabel(root)
+        self._path_lbl.setStyleSheet("color: #58a6ff; font-size: 15px; font-weight: bold;")
+        top.addWidget(self._path_lbl, 1)
+        layout.addLayout(top)
+
+        self._treemap = TreemapWidget()
+        self._treemap.clicked.connect(self._enter)
+        layout.addWidget(self._treemap, 1)
+
+        self._status = QLabel("⏳  Recorriendo...")
+        self._status.setStyleSheet("color: #8b949e; font-size: 13px;")
+        layout.addWidget(self._status)
+
+        btn_l = QHBoxLayout()
+        btn_l.addStretch()
+        close_btn = QPushButton("  Cerrar  ")
+        close_btn.clicked.connect(self.reject)
+        btn_l.addWidget(close_btn)
+        layout.addLayout(btn_l)
+
+        def _worker():
+            try:
+                scan = DirScanner(root)
+            except OSError as e:
+                _emit_alive(self._progress, str(e))
+                return
+            scan.run(self._cancel, on_progress=lambda scan: _emit_alive(self._progress, scan))
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def _on_progress(self, scan):
+        if isinstance(scan, str):
+            self._status.setText(f"⚠  {scan}")
+            return
+        self._scan = scan
+        self._refresh()
+
+    def _refresh(self):
+        scan = self._scan
+        if scan is None:
+            return
+        self._treemap.set_items(scan.children(self._current))
+        self._path_lbl.setText(scan.path(self._current))
+        self._up_btn.setEnabled(self._current != 0)
+        state = "✓" if scan.done else "⏳"
+        denied = f"  ·  {scan.errors:,} sin acceso" if scan.errors else ""
+        self._status.setText(
+            f"{state}  {_human_size(scan.total[0])}  ·  {scan.files:,} archivos  ·  "
+            f"{scan.dirs:,} directorios  ·  {scan.elapsed:.1f} s{denied}")
+
+    def _enter(self, index):
+        self._current = index
+        self._refresh()
+
+    def _up(self):
+        if self._scan is not None and self._current:
+            self._current = self._scan.parents[self._current]
+            self._refresh()
+
+    def reject(self):
+        self._cancel.set()
+        super().reject()
+
 
 # ─────────────────────────────────────────────
 #  DISK INFO PANEL
 # ─────────────────────────────────────────────
 class DiskInfoPanel(QWidget):
+
+    # ── señal interna ──────────────────────────
+    _disk_loaded = pyqtSignal(object)
+
+    # ── autotests: (tipo, todos los discos) / cancelar ──
+    selftest_requested = pyqtSignal(str, bool)
+    selftest_cancelled = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._disk_buttons = []
+        self._on_select = None
         self._current_disk = None
+        self._load_seq = 0
         self._last_disk_data = None
         self._last_disk_info = None
         self._last_partitions = None
+        self._disk_loaded.connect(self._on_disk_loaded)
         self._build_ui()
 
     def _build_ui(self):
@@ -1161,6 +5505,39 @@ class DiskInfoPanel(QWidget):
         )
         model_l.addWidget(self.model_label, 1)
 
+        self._age_lbl = QLabel("")
+        self._age_lbl.setStyleSheet("color: #8b949e; font-size: 13px; background: transparent;")
+        model_l.addWidget(self._age_lbl)
+
+        self._refresh_btn = QPushButton("  ⟳  Actualizar  ")
+        self._refresh_btn.setToolTip("Volver a leer S.M.A.R.T. ignorando la caché")
+        self._refresh_btn.clicked.connect(self._refresh_current)
+        self._refresh_btn.setEnabled(False)
+        model_l.addWidget(self._refresh_btn)
+
+        self._bench_btn = QPushButton("  ⏱  Benchmark  ")
+        self._bench_btn.setToolTip("Velocidad de lectura secuencial y aleatoria (sólo lectura)")
+        self._bench_btn.clicked.connect(self._open_bench)
+        self._bench_btn.setEnabled(False)
+        model_l.addWidget(self._bench_btn)
+
+        self._selftest_btn = QPushButton("  🔬  Autotest  ")
+        self._selftest_btn.setToolTip("Autotest S.M.A.R.T. del firmware del disco")
+        menu = QMenu(self._selftest_btn)
+        for kind, label in SELFTEST_KINDS.items():
+            menu.addAction(f"Test {label} — este disco",
+                           lambda checked=False, k=kind: self.selftest_requested.emit(k, False))
+        menu.addSeparator()
+        for kind, label in SELFTEST_KINDS.items():
+            menu.addAction(f"Test {label} — todos (escalonado)",
+                           lambda checked=False, k=kind: self.selftest_requested.emit(k, True))
+        menu.addSeparator()
+        menu.addAction("Cancelar autotests",
+                       lambda checked=False: self.selftest_cancelled.emit())
+        self._selftest_btn.setMenu(menu)
+        self._selftest_btn.setEnabled(False)
+        model_l.addWidget(self._selftest_btn)
+
         self._copy_disk_btn = QPushButton("  📋  Copiar resumen  ")
         self._copy_disk_btn.clicked.connect(self._copy_disk_to_clipboard)
         self._copy_disk_btn.setEnabled(False)
@@ -1255,22 +5632,64 @@ class DiskInfoPanel(QWidget):
 
         layout.addWidget(info_strip)
 
+        # ── Row 3b: actividad en vivo (/proc/diskstats) ─
+        io_frame = QFrame()
+        io_frame.setStyleSheet(
+            "background-color: #161b22; border-bottom: 1px solid #30363d;"
+        )
+        io_frame.setFixedHeight(46)
+        io_l = QHBoxLayout(io_frame)
+        io_l.setContentsMargins(14, 4, 14, 4)
+        io_l.setSpacing(12)
+        io_title = QLabel("Actividad")
+        io_title.setStyleSheet("color: #8b949e; font-size: 13px; border: none;")
+        io_l.addWidget(io_title)
+        self._io_lbl = QLabel("--")
+        self._io_lbl.setStyleSheet("color: #e6edf3; font-size: 14px; border: none;")
+        io_l.addWidget(self._io_lbl, 1)
+        self.io_spark = IoSparkline()
+        io_l.addWidget(self.io_spark)
+        layout.addWidget(io_frame)
+
         # ── Row 4: S.M.A.R.T. attribute table ─────────
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Nombre del Atributo", "Estado", "Valor", "Peor", "Umbral", "Valor Raw"
-        ])
+        self.attr_model = SmartAttrModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.attr_model)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         for col in (2, 3, 4, 5, 6):
             self.table.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeToContents)
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
         self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(26)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
         self.table.setShowGrid(False)
-        layout.addWidget(self.table)
+
+        # Logs NVMe (errores 0x01 y autotests 0x06) en pestañas junto a la tabla
+        self.err_model = LogTableModel(
+            ["Nº error", "Estado", "SCT/SC", "LBA", "NS", "Cola/Cmd", "Leído"], self)
+        self.selftest_model = LogTableModel(
+            ["Tipo", "Resultado", "Horas", "Segmento", "LBA"], self)
+        self.log_tabs = QTabWidget()
+        self.log_tabs.addTab(self.table, "Atributos S.M.A.R.T.")
+        for model, title in ((self.err_model, "Errores NVMe"),
+                             (self.selftest_model, "Autotests NVMe")):
+            view = QTableView()
+            view.setModel(model)
+            view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+            view.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+            view.setAlternatingRowColors(True)
+            view.setSelectionBehavior(QTableView.SelectRows)
+            view.verticalHeader().setVisible(False)
+            view.verticalHeader().setDefaultSectionSize(26)
+            view.setEditTriggers(QTableView.NoEditTriggers)
+            view.setShowGrid(False)
+            self.log_tabs.addTab(view, title)
+        self.log_tabs.setTabEnabled(1, False)
+        self.log_tabs.setTabEnabled(2, False)
+        layout.addWidget(self.log_tabs)
 
         # ── Row 5: Partition view (macOS style) ───────
         part_frame = QFrame()
@@ -1308,46 +5727,210 @@ class DiskInfoPanel(QWidget):
             self._sel_layout.removeWidget(btn)
             btn.deleteLater()
         self._disk_buttons = []
+        self._on_select = on_select_cb
 
         self._no_disk_lbl.setVisible(not disks)
 
         for disk in disks:
-            btn = DiskButton(disk)
-            btn.clicked.connect(lambda checked, d=disk, b=btn: self._btn_clicked(d, b, on_select_cb))
-            # Insert before the stretch + scan button (last 2 items)
-            pos = self._sel_layout.count() - 2   # before stretch
-            self._sel_layout.insertWidget(pos, btn)
-            self._disk_buttons.append(btn)
+            self._add_button(disk)
 
         # Select first automatically
         if self._disk_buttons:
             self._disk_buttons[0].setChecked(True)
             self._btn_clicked(disks[0], self._disk_buttons[0], on_select_cb)
 
+    def _add_button(self, disk, index=None):
+        btn = DiskButton(disk)
+        btn.clicked.connect(lambda checked, d=disk, b=btn: self._btn_clicked(d, b, self._on_select))
+        if index is None or index >= len(self._disk_buttons):
+            # Insert before the stretch + scan button (last 2 items)
+            pos = self._sel_layout.count() - 2   # before stretch
+            self._disk_buttons.append(btn)
+        else:
+            pos = self._sel_layout.indexOf(self._disk_buttons[index])
+            self._disk_buttons.insert(index, btn)
+        self._sel_layout.insertWidget(pos, btn)
+        return btn
+
+    def add_disk(self, disk, index=None):
+        """Hotplug: añade el botón de un disco nuevo sin tocar los demás"""
+        self._no_disk_lbl.setVisible(False)
+        btn = self._add_button(disk, index)
+        if self._current_disk is None:
+            self._btn_clicked(disk, btn, self._on_select)
+        return btn
+
+    def remove_disk(self, path):
+        """Hotplug: quita el botón de un disco retirado"""
+        btn = self._button_for(path)
+        if btn is None:
+            return
+        self._disk_buttons.remove(btn)
+        self._sel_layout.removeWidget(btn)
+        btn.deleteLater()
+        self._no_disk_lbl.setVisible(not self._disk_buttons)
+        if self._current_disk is not None and self._current_disk["path"] == path:
+            self._current_disk = None
+            self._load_seq += 1       # descarta una lectura en curso del disco retirado
+            if self._disk_buttons:
+                first = self._disk_buttons[0]
+                self._btn_clicked(first.disk, first, self._on_select)
+            else:
+                self.model_label.setText(f"⚠  {path} fue retirado")
+
     def _btn_clicked(self, disk, active_btn, callback):
         for btn in self._disk_buttons:
             btn.setChecked(btn is active_btn)
         callback(disk, active_btn)
 
-    def refresh_button(self, btn, health, temp):
+    def refresh_button(self, btn, health, temp, standby=None):
         btn.health = health
         btn.temp   = temp
+        if standby is not None:
+            btn.standby = standby
         btn._build()
-        btn.setChecked(True)
 
-    def load_disk(self, disk):
+    def _button_for(self, path):
+        for btn in self._disk_buttons:
+            if btn.disk.get("path") == path:
+                return btn
+        return None
+
+    def load_disk(self, disk, refresh=False):
+        """Inicia la lectura S.M.A.R.T. en un hilo separado para no bloquear la UI.
+
+        El resultado llega por _disk_loaded; si mientras tanto se seleccionó
+        otro disco, sólo se actualiza el botón del disco leído. Con
+        refresh=True se ignora la caché S.M.A.R.T.
+        """
+        self._current_disk = disk
+        self._load_seq += 1
+        seq = self._load_seq
         self.model_label.setText(f"⏳  Leyendo S.M.A.R.T. de {disk['path']}...")
-        QApplication.processEvents()
 
-        data = get_smart_data(disk["path"])
-        partitions = get_disk_usage(disk["path"])   # list of partition dicts or None
+        def _worker():
+            partitions = forecast = nvme_logs = None
+            try:
+                data = read_smart(disk["path"], refresh=refresh)
+                partitions = annotate_fill_forecast(annotate_pools(get_disk_usage(disk["path"])))
+                ident = _history_ident(disk["path"])
+                forecast = SMART_FORECASTER.forecast(ident)
+                if data.get("nvme_log"):
+                    nvme_logs = (NVME_LOGS.errors(ident), NVME_LOGS.self_tests(ident))
+            except Exception as e:
+                data = _empty_smart_result()
+                data["raw_output"] = f"Error leyendo S.M.A.R.T.: {e}"
+            self._disk_loaded.emit({"seq": seq, "disk": disk, "data": data,
+                                    "partitions": partitions, "forecast": forecast,
+                                    "nvme_logs": nvme_logs})
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def update_forecasts(self, forecasts):
+        """Forecasts {ruta: pronóstico} del último barrido"""
+        if self._current_disk is not None and self._current_disk["path"] in forecasts:
+            self.health_badge.set_forecast(forecasts[self._current_disk["path"]])
+
+    def update_temps(self, temps):
+        """Aplica una muestra de DiskTempSampler a los botones y al panel"""
+        for btn in self._disk_buttons:
+            t = temps.get(btn.disk["name"])
+            if t is not None and t != btn.temp:
+                self.refresh_button(btn, btn.health, t)
+        if self._current_disk is not None:
+            t = temps.get(self._current_disk["name"])
+            if t is not None and t != self.temp_widget.temp:
+                self.temp_widget.set_temp(t)
+
+    def update_io(self, stats, series):
+        """Muestra la actividad del disco actual (una muestra de DiskStatsSampler)"""
+        if self._current_disk is None:
+            return
+        name = self._current_disk["name"]
+        st = stats.get(name)
+        if st is None:
+            self._io_lbl.setText("--")
+            self.io_spark.set_samples(())
+            return
+        self._io_lbl.setText(
+            f"<span style='color:#3fb950'>L</span> {st['r_iops']:,.0f} IOPS · {st['r_mbs']:.1f} MB/s"
+            f"   <span style='color:#58a6ff'>E</span> {st['w_iops']:,.0f} IOPS · {st['w_mbs']:.1f} MB/s"
+            f"   ·   latencia {st['await_ms']:.1f} ms"
+            f"   ·   uso <span style='color:{usage_color(st['util'])}'>{st['util']:.0f}%</span>"
+            f"   ·   en cola {st['in_flight']}"
+        )
+        self.io_spark.set_samples(series.get(name, ()))
+
+    def set_selftest(self, path, state):
+        """Muestra el progreso de un autotest en el botón del disco"""
+        btn = self._button_for(path)
+        if btn is not None:
+            btn.selftest = state
+            btn._build()
+
+    def set_arrays(self, by_disk):
+        """Arrays md / pools dm de cada disco (arrays_by_disk) en sus botones"""
+        for btn in self._disk_buttons:
+            arrays = by_disk.get(btn.disk["name"], [])
+            if [array_text(a) for a in arrays] != [array_text(a) for a in btn.arrays]:
+                btn.arrays = arrays
+                btn._build()
+
+    def current_disk(self):
+        return self._current_disk
+
+    def _open_du(self, mountpoint):
+        dlg = DirScanDialog(mountpoint, self)
+        dlg.exec_()
+        dlg.deleteLater()       # hijo del panel: sin esto el DirScanner sigue en memoria
+
+    def _open_bench(self):
+        if self._current_disk is not None:
+            dlg = BenchDialog(self._current_disk, self)
+            dlg.exec_()
+            dlg.deleteLater()
+
+    def _refresh_current(self):
+        if self._current_disk is not None:
+            self.load_disk(self._current_disk, refresh=True)
+
+    def update_data_age(self):
+        """Muestra la antigüedad de los datos S.M.A.R.T. en pantalla"""
+        data = self._last_disk_data
+        if not data or not data.get("read_at"):
+            self._age_lbl.setText("")
+            return
+        age = int(time.time() - data["read_at"])
+        if age < 5:
+            text = "datos: ahora"
+        elif age < 120:
+            text = f"datos: hace {age} s"
+        elif age < 7200:
+            text = f"datos: hace {age // 60} min"
+        else:
+            text = f"datos: hace {age // 3600} h"
+        self._age_lbl.setText(text)
+
+    def _on_disk_loaded(self, result):
+        """Llamado desde el hilo principal cuando el worker termina"""
+        disk = result["disk"]
+        data = result["data"]
+        partitions = result["partitions"]
+
+        btn = self._button_for(disk["path"])
+        if btn is not None:
+            self.refresh_button(btn, data["health"], data["temp"], data.get("standby", False))
+        if result["seq"] != self._load_seq:
+            return  # llegó tarde: el usuario ya eligió otro disco
 
         icon = "💾" if disk.get("rotational") else "⚡"
+        standby = "   ·   💤 en reposo (últimos datos)" if data.get("standby") else ""
         self.model_label.setText(
-            f"{icon}  {data['model'] or disk['model']}  —  {data['capacity'] or disk['size']}"
+            f"{icon}  {data['model'] or disk['model']}  —  {data['capacity'] or disk['size']}{standby}"
         )
 
         self.health_badge.set_status(data["health"], data.get("life_percent"))
+        self.health_badge.set_forecast(result.get("forecast"))
         self.temp_widget.set_temp(data["temp"])
 
         self.lbl["firmware"].setText(data.get("firmware") or "--")
@@ -1360,25 +5943,7 @@ class DiskInfoPanel(QWidget):
         self.lbl["features"].setText("S.M.A.R.T., NCQ, TRIM, DevSleep")
         self.lbl["mountpoint"].setText(disk["path"])
 
-        # Espacio libre / usado — sumar todas las particiones con datos
-        if partitions:
-            total_used = sum(p["used_gb"]  for p in partitions if p.get("used_gb") is not None)
-            total_free = sum(p["free_gb"]  for p in partitions if p.get("free_gb") is not None)
-            total_gb   = sum(p["total_gb"] for p in partitions if p.get("total_gb") is not None)
-            if total_gb > 0:
-                pct = (total_used / total_gb) * 100
-                self.lbl["space_used"].setText(f"{total_used:.1f} GB  ({pct:.0f}%)")
-                self.lbl["space_used"].setStyleSheet(
-                    f"color: {'#f85149' if pct>90 else '#d29922' if pct>75 else '#e6edf3'};"
-                    "font-size: 14px;"
-                )
-                self.lbl["space_free"].setText(f"{total_free:.1f} GB  ({100-pct:.0f}%)")
-            else:
-                self.lbl["space_used"].setText("Particiones sin montar")
-                self.lbl["space_free"].setText("--")
-        else:
-            self.lbl["space_used"].setText("--")
-            self.lbl["space_free"].setText("--")
+        self._update_space(partitions)
 
         poh = data.get("power_on_hours")
         poc = data.get("power_on_count")
@@ -1390,37 +5955,31 @@ class DiskInfoPanel(QWidget):
             "---- (SSD)" if not disk.get("rotational") else "7200 RPM"
         )
 
-        # Table
-        attrs = data["attributes"]
-        self.table.setRowCount(len(attrs))
-        for row, a in enumerate(attrs):
-            items = [
-                (a["id"],          "#8b949e"),
-                (str(a["name"]),   "#e6edf3"),
-                (a["flag"],        health_color(a["flag"])),
-                (str(a["value"]),  "#e6edf3"),
-                (str(a["worst"]),  "#8b949e"),
-                (str(a["thresh"]), "#8b949e"),
-                (str(a["raw"]),    "#3fb950"),
-            ]
-            for col, (text, color) in enumerate(items):
-                item = QTableWidgetItem(text)
-                item.setForeground(QColor(color))
-                if col == 2:
-                    item.setFont(QFont("Consolas", 14, QFont.Bold))
-                self.table.setItem(row, col, item)
-            self.table.setRowHeight(row, 26)
-
-        if not attrs:
-            self.table.setRowCount(1)
-            item = QTableWidgetItem(
-                data.get("raw_output") or
-                "No se encontraron atributos SMART.\n"
-                "Intenta ejecutar con sudo para acceso completo."
-            )
-            item.setForeground(QColor("#8b949e"))
-            self.table.setItem(0, 0, item)
-            self.table.setSpan(0, 0, 1, 7)
+        # Table — el modelo sólo repinta las celdas que cambiaron
+        self.attr_model.set_attributes(
+            data["attributes"],
+            data.get("raw_output") or
+            "No se encontraron atributos SMART.\n"
+            "Intenta ejecutar con sudo para acceso completo."
+        )
+        if self.attr_model.message is not None:
+            if self.table.columnSpan(0, 0) == 1:
+                self.table.setSpan(0, 0, 1, len(SmartAttrModel.HEADERS))
+            self.table.setRowHeight(0, 52)
+        elif self.table.columnSpan(0, 0) > 1:
+            self.table.clearSpans()
+
+        # Logs NVMe
+        errors, tests = result.get("nvme_logs") or ([], [])
+        self.err_model.set_rows(*nvme_error_rows(errors))
+        self.selftest_model.set_rows(*nvme_self_test_rows(tests))
+        is_nvme = result.get("nvme_logs") is not None
+        self.log_tabs.setTabEnabled(1, is_nvme)
+        self.log_tabs.setTabEnabled(2, is_nvme)
+        self.log_tabs.setTabText(1, f"Errores NVMe ({len(errors)})" if is_nvme else "Errores NVMe")
+        self.log_tabs.setTabText(2, f"Autotests NVMe ({len(tests)})" if is_nvme else "Autotests NVMe")
+        if not is_nvme and self.log_tabs.currentIndex() != 0:
+            self.log_tabs.setCurrentIndex(0)
 
         # Partition bar + legend
         self._update_partition_view(partitions or [])
@@ -1430,8 +5989,10 @@ class DiskInfoPanel(QWidget):
         self._last_disk_data = data
         self._last_partitions = partitions
         self._copy_disk_btn.setEnabled(True)
-
-        return data["health"], data["temp"]
+        self._refresh_btn.setEnabled(True)
+        self._bench_btn.setEnabled(True)
+        self._selftest_btn.setEnabled(True)
+        self.update_data_age()
 
     def _copy_disk_to_clipboard(self):
         if not self._last_disk_data:
@@ -1480,6 +6041,37 @@ class DiskInfoPanel(QWidget):
         self._copy_disk_btn.setText("  ✓  Copiado  ")
         QTimer.singleShot(2000, lambda: self._copy_disk_btn.setText("  📋  Copiar resumen  "))
 
+    def update_partitions(self, path, partitions):
+        """Cambio en la tabla de montajes: repinta sólo si es el disco visible"""
+        if not self._last_disk_info or self._last_disk_info["path"] != path:
+            return
+        if partitions == self._last_partitions:
+            return
+        self._last_partitions = partitions
+        self._update_space(partitions)
+        self._update_partition_view(partitions or [])
+
+    def _update_space(self, partitions):
+        """Espacio libre / usado — sumar todas las particiones con datos"""
+        if partitions:
+            total_used = sum(p["used_gb"]  for p in partitions if p.get("used_gb") is not None)
+            total_free = sum(p["free_gb"]  for p in partitions if p.get("free_gb") is not None)
+            total_gb   = sum(p["total_gb"] for p in partitions if p.get("total_gb") is not None)
+            if total_gb > 0:
+                pct = (total_used / total_gb) * 100
+                self.lbl["space_used"].setText(f"{total_used:.1f} GB  ({pct:.0f}%)")
+                self.lbl["space_used"].setStyleSheet(
+                    f"color: {'#f85149' if pct>90 else '#d29922' if pct>75 else '#e6edf3'};"
+                    "font-size: 14px;"
+                )
+                self.lbl["space_free"].setText(f"{total_free:.1f} GB  ({100-pct:.0f}%)")
+            else:
+                self.lbl["space_used"].setText("Particiones sin montar")
+                self.lbl["space_free"].setText("--")
+        else:
+            self.lbl["space_used"].setText("--")
+            self.lbl["space_free"].setText("--")
+
     def _update_partition_view(self, partitions):
         """Refresh the macOS-style partition bar and legend labels"""
         self.part_bar.set_partitions(partitions)
@@ -1503,10 +6095,6 @@ class DiskInfoPanel(QWidget):
             if used_pct and used_pct > 90:   color = "#f85149"
             elif used_pct and used_pct > 75: color = "#d29922"
 
-            # Colored dot
-            dot = QLabel("●")
-            dot.setStyleSheet(f"color: {color}; font-size: 16px; background: transparent;")
-
             # Text: label / mount · size · used%
             name   = pt.get("label") or pt.get("name","")
             mounts = pt.get("mounts", [])
@@ -1514,9 +6102,34 @@ class DiskInfoPanel(QWidget):
             gb_str = f"{pt['total_gb']:.1f} GB" if pt.get("total_gb") else pt.get("size","?")
             pct_str = f"  {used_pct:.0f}% usado" if used_pct is not None else ""
             fstype = f"  [{pt['fstype']}]" if pt.get("fstype") else ""
+            full_days = pt.get("full_days")
+            full_str = ""
+            if full_days is not None:
+                full_str = f"  ·  lleno en ~{full_days:.0f} días" if full_days >= 1 else "  ·  lleno hoy"
+                if full_days < FS_FULL_WARN_DAYS / 3: color = "#f85149"
+                elif full_days < FS_FULL_WARN_DAYS and color != "#f85149": color = "#d29922"
+            pool = pt.get("pool")
+            pool_str = f"  ·  🧩 {pool['kind']} {pool['name']}" if pool else ""
+            if pool and pool["health"] != "Bueno":
+                color = health_color(pool["health"])
+            ino_pct = pt.get("inodes_percent")
+            ino_str = f"  ·  inodos {ino_pct:.0f}%" if ino_pct and ino_pct > 75 else ""
+            if ino_pct and ino_pct > 90: color = "#f85149"
+
+            # Colored dot (con el color final: pronóstico, pool e inodos)
+            dot = QLabel("●")
+            dot.setStyleSheet(f"color: {color}; font-size: 16px; background: transparent;")
 
-            info_lbl = QLabel(f"{name}  ·  {mp_str}  ·  {gb_str}{pct_str}{fstype}")
-            info_lbl.setStyleSheet("color: #e6edf3; font-size: 13px; background: transparent;")
+            text_color = color if full_days is not None and full_days < FS_FULL_WARN_DAYS else "#e6edf3"
+
+            info_lbl = QLabel(f"{name}  ·  {mp_str}  ·  {gb_str}{pct_str}{fstype}"
+                              f"{pool_str}{ino_str}{full_str}")
+            info_lbl.setStyleSheet(f"color: {text_color}; font-size: 13px; background: transparent;")
+            tips = [pool_text(pool)] if pool else []
+            if pt.get("inodes_total"):
+                tips.append(f"Inodos: {pt['inodes_used']:,} / "
+                            f"{pt['inodes_total']:,} ({ino_pct:.1f}%)")
+            info_lbl.setToolTip("\n".join(tips))
 
             box = QWidget()
             box.setStyleSheet("background: transparent;")
@@ -1525,6 +6138,12 @@ class DiskInfoPanel(QWidget):
             bx.setSpacing(4)
             bx.addWidget(dot)
             bx.addWidget(info_lbl)
+            if mounts:
+                du_btn = QPushButton("🔍")
+                du_btn.setToolTip(f"¿Qué ocupa espacio en {mounts[0]}?")
+                du_btn.setStyleSheet("padding: 0px 6px; font-size: 13px;")
+                du_btn.clicked.connect(lambda checked=False, mp=mounts[0]: self._open_du(mp))
+                bx.addWidget(du_btn)
 
             self._part_legend_layout.addWidget(box)
 
@@ -1669,7 +6288,6 @@ class SystemInfoPanel(QWidget):
         self._spinner.setStyleSheet("color: #8b949e; font-size: 14px; padding: 24px;")
         self._cl.addWidget(self._spinner)
 
-        import threading
         def _worker():
             try:
                 data = {
@@ -1907,10 +6525,228 @@ class SystemInfoPanel(QWidget):
         QTimer.singleShot(2000, lambda: self._copy_btn.setText("  📋  Copiar info  "))
 
 
+# ─────────────────────────────────────────────
+#  OVERVIEW GRID  (una baldosa por disco)
+# ─────────────────────────────────────────────
+class DiskTile(QWidget):
+    """Resumen compacto de un disco, pintado a mano.
+
+    Los setters comparan con lo que ya se muestra y sólo llaman a
+    update() si algo visible cambió, así con cientos de discos cada
+    segundo sólo se repintan las baldosas con actividad.
+    """
+    clicked = pyqtSignal(object)
+
+    W, H = 232, 112
+    _fonts = None
+
+    def __init__(self, disk, parent=None):
+        super().__init__(parent)
+        self.disk = disk
+        self._smart = ("Desconocido", None, None, False)   # salud, vida, horas, reposo
+        self._temp  = None
+        self._io    = None      # (MB/s lectura, MB/s escritura, % uso)
+        self.setFixedSize(self.W, self.H)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setToolTip(f"{disk['path']}  —  {disk.get('model', '')}  ({disk.get('size', '?')})")
+
+    @classmethod
+    def fonts(cls):
+        if cls._fonts is None:
+            cls._fonts = (QFont("Consolas", 12, QFont.Bold), QFont("Consolas", 10),
+                          QFont("Consolas", 15, QFont.Bold))
+        return cls._fonts
+
+    def set_smart(self, data):
+        state = (data.get("health", "Desconocido"), data.get("life_percent"),
+                 data.get("power_on_hours"), bool(data.get("standby")))
+        changed = state != self._smart
+        if data.get("temp") is not None and self._temp is None:
+            self._temp = data["temp"]          # la primera, hasta que llegue set_temp
+            changed = True
+        if changed:
+            self._smart = state
+            self.update()
+
+    def set_temp(self, temp):
+        if temp != self._temp:
+            self._temp = temp
+            self.update()
+
+    def set_io(self, st):
+        io = (round(st["r_mbs"], 1), round(st["w_mbs"], 1), int(st["util"])) if st else None
+        if io != self._io:
+            self._io = io
+            self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.clicked.emit(self.disk)
+
+    def paintEvent(self, event):
+        health, life, hours, standby = self._smart
+        bold, small, big = self.fonts()
+        color = QColor(health_color(health))
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setBrush(QBrush(QColor("#161b22")))
+        p.setPen(QPen(color, 2))
+        p.drawRoundedRect(1, 1, self.W - 2, self.H - 2, 8, 8)
+
+        icon = "💾" if self.disk.get("rotational") else "⚡"
+        p.setFont(bold)
+        p.setPen(QColor("#e6edf3"))
+        p.drawText(10, 6, self.W - 20, 20, Qt.AlignLeft | Qt.AlignVCenter,
+                   f"{icon} {self.disk['name']}")
+        p.setFont(small)
+        p.setPen(QColor("#8b949e"))
+        model = p.fontMetrics().elidedText(self.disk.get("model", ""), Qt.ElideRight, 120)
+        p.drawText(10, 6, self.W - 20, 20, Qt.AlignRight | Qt.AlignVCenter, model)
+
+        p.setFont(big)
+        p.setPen(color)
+        status = health if life is None else f"{health} {life}%"
+        p.drawText(10, 28, self.W - 20, 26, Qt.AlignLeft | Qt.AlignVCenter, status)
+        temp = "💤" if standby else (f"{self._temp}°C" if self._temp is not None else "--°C")
+        p.setPen(QColor(temp_color(None if standby else self._temp)))
+        p.drawText(10, 28, self.W - 20, 26, Qt.AlignRight | Qt.AlignVCenter, temp)
+
+        p.setFont(small)
+        p.setPen(QColor("#8b949e"))
+        p.drawText(10, 56, self.W - 20, 18, Qt.AlignLeft | Qt.AlignVCenter,
+                   f"{hours:,} h" if hours else "-- h")
+        p.drawText(10, 56, self.W - 20, 18, Qt.AlignRight | Qt.AlignVCenter,
+                   self.disk.get("size", ""))
+
+        if self._io is not None:
+            r, w, util = self._io
+            p.setPen(QColor("#e6edf3"))
+            p.drawText(10, 74, self.W - 20, 18, Qt.AlignLeft | Qt.AlignVCenter,
+                       f"L {r:.1f}  E {w:.1f} MB/s")
+            p.drawText(10, 74, self.W - 20, 18, Qt.AlignRight | Qt.AlignVCenter, f"{util}%")
+            bar_w = self.W - 20
+            p.setPen(Qt.NoPen)
+            p.setBrush(QBrush(QColor("#21262d")))
+            p.drawRoundedRect(10, self.H - 14, bar_w, 5, 2, 2)
+            p.setBrush(QBrush(QColor(usage_color(util))))
+            p.drawRoundedRect(10, self.H - 14, max(2, bar_w * util // 100), 5, 2, 2)
+        p.end()
+
+
+class OverviewPanel(QWidget):
+    """Cuadrícula con una DiskTile por disco; el nº de columnas sigue al ancho"""
+    disk_clicked = pyqtSignal(object)
+
+    SPACING = 10
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tiles = {}        # ruta -> DiskTile (en orden de disco)
+        self._columns = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._scroll = QScrollArea()
+        self._scroll.setWidgetResizable(True)
+        self._scroll.setFrameShape(QFrame.NoFrame)
+        inner = QWidget()
+        inner_l = QVBoxLayout(inner)
+        inner_l.setContentsMargins(0, 0, 0, 0)
+        inner_l.setSpacing(0)
+        self._arrays = {}       # nombre -> QLabel de un array md / pool dm
+        self._arrays_l = QVBoxLayout()
+        self._arrays_l.setContentsMargins(14, 14, 14, 0)
+        self._arrays_l.setSpacing(4)
+        inner_l.addLayout(self._arrays_l)
+        self._grid = QGridLayout()
+        inner_l.addLayout(self._grid)
+        inner_l.addStretch()
+        self._grid.setContentsMargins(14, 14, 14, 14)
+        self._grid.setSpacing(self.SPACING)
+        self._grid.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self._scroll.setWidget(inner)
+        layout.addWidget(self._scroll)
+
+    def set_disks(self, disks):
+        """Crea / quita baldosas; las de discos que siguen se conservan"""
+        old = self._tiles
+        self._tiles = {}
+        for disk in disks:
+            tile = old.pop(disk["path"], None)
+            if tile is None:
+                tile = DiskTile(disk)
+                tile.clicked.connect(self.disk_clicked.emit)
+            self._tiles[disk["path"]] = tile
+        for tile in old.values():
+            self._grid.removeWidget(tile)
+            tile.deleteLater()
+        self._columns = 0
+        self._relayout()
+
+    def _relayout(self):
+        width = self._scroll.viewport().width() - 28
+        columns = max(1, (width + self.SPACING) // (DiskTile.W + self.SPACING))
+        if columns == self._columns:
+            return
+        self._columns = columns
+        for tile in self._tiles.values():
+            self._grid.removeWidget(tile)
+        for i, tile in enumerate(self._tiles.values()):
+            row, col = divmod(i, columns)
+            self._grid.addWidget(tile, row, col)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._relayout()
+
+    def update_smart(self, path, data):
+        tile = self._tiles.get(path)
+        if tile is not None:
+            tile.set_smart(data)
+
+    def update_temps(self, temps):
+        for tile in self._tiles.values():
+            t = temps.get(tile.disk["name"])
+            if t is not None:
+                tile.set_temp(t)
+
+    def update_io(self, stats):
+        for tile in self._tiles.values():
+            tile.set_io(stats.get(tile.disk["name"]))
+
+    def set_arrays(self, arrays):
+        """Una línea por array md / pool dm sobre la cuadrícula de discos"""
+        seen = set()
+        for a in arrays:
+            seen.add(a["name"])
+            lbl = self._arrays.get(a["name"])
+            if lbl is None:
+                lbl = self._arrays[a["name"]] = QLabel()
+                self._arrays_l.addWidget(lbl)
+            disks = a.get("disks") or [m["disk"] for m in a.get("members", [])]
+            text = f"🧩  {array_text(a)}   ({', '.join(dict.fromkeys(disks))})"
+            if lbl.text() != text:
+                lbl.setText(text)
+                lbl.setStyleSheet(f"color: {health_color(a['health'])}; font-size: 14px;")
+        for name in [n for n in self._arrays if n not in seen]:
+            lbl = self._arrays.pop(name)
+            self._arrays_l.removeWidget(lbl)
+            lbl.deleteLater()
+
+
 # ─────────────────────────────────────────────
 #  MAIN WINDOW
 # ─────────────────────────────────────────────
 class MainWindow(QMainWindow):
+
+    # ── señales internas (barrido S.M.A.R.T.) ──
+    _sweep_result = pyqtSignal(object)
+    _sweep_done   = pyqtSignal(object)
+    _hotplug_read = pyqtSignal(object)
+    _selftest_update = pyqtSignal(object)
+    _dm_read      = pyqtSignal(object)
+    _mounts_read  = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("LinuxHWMonitor  v1.1")
@@ -1919,10 +6755,27 @@ class MainWindow(QMainWindow):
         self._disks          = []
         self._current_disk   = None
         self._current_btn    = None
+        self._sweep_seq      = 0
+        self._sweep_cancel   = None
+        self._sweep_count    = 0
+        self._sweep_quiet    = False
+        self._sweep_result.connect(self._on_sweep_result)
+        self._sweep_done.connect(self._on_sweep_done)
+        self._temp_sampler   = DiskTempSampler()
+        self._io_sampler     = DiskStatsSampler()
+        self._hotplug_read.connect(self._on_hotplug_read)
+        self._selftests = SelfTestScheduler(
+            lambda path, state: self._selftest_update.emit((path, state)))
+        self._selftest_update.connect(self._on_selftest_update)
+        self._dm_pools = []
+        self._dm_read.connect(self._on_dm_read)
+        self._mounts_read.connect(self._on_mounts_read)
 
         self._build_ui()
         self._scan_disks()
         self._start_timer()
+        self._start_hotplug()
+        self._start_mount_watch()
 
     def _build_ui(self):
         central = QWidget()
@@ -1932,18 +6785,23 @@ class MainWindow(QMainWindow):
         main_l.setContentsMargins(0, 0, 0, 0)
 
         # ── Tabs ──────────────────────────────────────
-        # Order: 0 = Sistema & Hardware,  1 = Disco S.M.A.R.T.
+        # Order: 0 = Sistema & Hardware,  1 = Disco S.M.A.R.T.,  2 = Vista general
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)
 
         self.system_panel = SystemInfoPanel()
         self.disk_panel   = DiskInfoPanel()
+        self.overview     = OverviewPanel()
+        self.overview.disk_clicked.connect(self._show_disk)
 
         # Connect the scan button inside DiskInfoPanel
         self.disk_panel._scan_btn.clicked.connect(self._scan_disks)
+        self.disk_panel.selftest_requested.connect(self._start_selftests)
+        self.disk_panel.selftest_cancelled.connect(lambda: self._selftests.cancel())
 
         self.tabs.addTab(self.system_panel, "  🖥  Sistema && Hardware  ")
         self.tabs.addTab(self.disk_panel,   "  💾  Disco (S.M.A.R.T.)  ")
+        self.tabs.addTab(self.overview,     "  ▦  Vista general  ")
         main_l.addWidget(self.tabs)
 
         # ── Status bar ────────────────────────────────
@@ -1974,34 +6832,282 @@ class MainWindow(QMainWindow):
         self.disk_panel._scan_btn.setText("⏳  Buscando...")
         QApplication.processEvents()
 
+        # Escanear = el usuario pide datos frescos (y detecta cambios de discos)
+        SMART_CACHE.invalidate()
+        forget_nvme_identify()
         self._disks = get_disks()
         self._current_disk = None
         self._current_btn  = None
+        self._temp_sampler.set_disks(self._disks)
+        self._io_sampler.set_disks(self._disks)
 
         # Delegate button creation to the panel
         self.disk_panel.populate_disks(self._disks, self._on_disk_selected)
+        self.overview.set_disks(self._disks)
+        for path, job in list(self._selftests.jobs.items()):
+            self.disk_panel.set_selftest(path, dict(job))
 
         n = len(self._disks)
         msg = f"✓  {n} disco(s) detectado(s)" if n else "⚠  No se encontraron discos"
         self.status_msg.setText(msg)
         self.disk_panel._scan_btn.setEnabled(True)
         self.disk_panel._scan_btn.setText("⟳  Escanear discos")
+        self._start_sweep()
+
+    def _start_sweep(self, quiet=False):
+        """Barrido S.M.A.R.T. de todos los discos en segundo plano.
+
+        quiet=True (refresco periódico): no muestra el progreso en la barra
+        de estado y no interrumpe un barrido que ya está en marcha.
+        """
+        if self._sweep_cancel is not None:
+            if quiet:
+                return
+            self._sweep_cancel.set()   # abandona el barrido anterior
+        if not self._disks:
+            return
+        self._sweep_quiet = quiet
+        self._sweep_seq += 1
+        seq    = self._sweep_seq
+        cancel = threading.Event()
+        disks  = list(self._disks)
+        self._sweep_cancel = cancel
+        self._sweep_count  = 0
+
+        def _worker():
+            t0 = time.monotonic()
+            smart_sweep(
+                disks,
+                lambda disk, data: self._sweep_result.emit(
+                    {"seq": seq, "disk": disk, "data": data}),
+                cancel=cancel,
+            )
+            elapsed = time.monotonic() - t0
+            forecasts = {}
+            if not cancel.is_set():
+                for d in disks:
+                    forecasts[d["path"]] = SMART_FORECASTER.forecast(_history_ident(d["path"]))
+            self._sweep_done.emit({"seq": seq, "total": len(disks),
+                                   "elapsed": elapsed, "forecasts": forecasts})
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def _on_sweep_result(self, result):
+        if result["seq"] != self._sweep_seq:
+            return
+        self._sweep_count += 1
+        data = result["data"]
+        btn = self.disk_panel._button_for(result["disk"]["path"])
+        if btn is not None:
+            self.disk_panel.refresh_button(btn, data["health"], data["temp"],
+                                           data.get("standby", False))
+        self.overview.update_smart(result["disk"]["path"], data)
+        if self._sweep_quiet:
+            return
+        self.status_msg.setText(
+            f"⏳  S.M.A.R.T.: {self._sweep_count}/{len(self._disks)} disco(s) leído(s)...")
+
+    def _on_sweep_done(self, result):
+        if result["seq"] != self._sweep_seq:
+            return
+        self._sweep_cancel = None
+        self.disk_panel.update_forecasts(result["forecasts"])
+        if self._sweep_quiet:
+            return
+        asleep = sum(1 for b in self.disk_panel._disk_buttons if b.standby)
+        extra = (f"  ·  💤 {asleep} en reposo, {SPINUPS_AVOIDED} arranque(s) evitado(s)"
+                 if asleep or SPINUPS_AVOIDED else "")
+        self.status_msg.setText(
+            f"✓  {result['total']} disco(s) detectado(s)  ·  "
+            f"S.M.A.R.T. leído en {result['elapsed']:.1f} s{extra}"
+        )
+
+    def _start_hotplug(self):
+        """Escucha los uevents del kernel: discos nuevos o retirados al instante"""
+        try:
+            self._uevents = UeventMonitor()
+        except OSError:
+            self._uevents = None     # sin netlink: sólo "Escanear discos"
+            return
+        self._uevent_notifier = QSocketNotifier(
+            self._uevents.fileno(), QSocketNotifier.Read, self)
+        self._uevent_notifier.activated.connect(self._on_uevent)
+
+    def _on_uevent(self, _fd):
+        for action, name in self._uevents.disk_events():
+            path = f"/dev/{name}"
+            SMART_CACHE.invalidate(path)
+            if action in ("add", "remove"):
+                forget_nvme_identify(path)
+            disk = _sysfs_disk(name) if action != "remove" else None
+            if disk is None:
+                self._remove_disk(path)
+            elif self.disk_panel._button_for(path) is None:
+                self._add_disk(disk)
+
+    def _start_mount_watch(self):
+        """Montajes y desmontajes al instante, sin releer periódicamente"""
+        try:
+            self._mounts = MountWatcher()
+        except OSError:
+            self._mounts = None
+            return
+        self._mount_notifier = QSocketNotifier(
+            self._mounts.fileno(), QSocketNotifier.Exception, self)
+        self._mount_notifier.activated.connect(self._on_mounts_changed)
+
+    def _on_mounts_changed(self, _fd):
+        changes = self._mounts.changes()
+        if not changes:
+            return
+        fresh = PARTITIONS.refresh(changes)
+        if fresh:
+            # annotate_pools puede lanzar zpool / btrfs si su caché caducó
+            threading.Thread(target=lambda: self._mounts_read.emit({
+                disk: annotate_fill_forecast(annotate_pools(parts))
+                for disk, parts in fresh.items()}), daemon=True).start()
+        for action, _dev, source, point in changes:
+            if source and action in ("mount", "umount"):
+                verb = "montado en" if action == "mount" else "desmontado de"
+                self.status_msg.setText(f"💽  /dev/{source} {verb} {point}")
+
+    def _on_mounts_read(self, fresh):
+        for disk, partitions in fresh.items():
+            self.disk_panel.update_partitions(f"/dev/{disk}", partitions or None)
+
+    def _add_disk(self, disk):
+        key = _disk_sort_key(disk["name"])
+        index = sum(1 for d in self._disks if _disk_sort_key(d["name"]) < key)
+        self._disks.insert(index, disk)
+        self._temp_sampler.add(disk["name"], disk.get("rotational"))
+        self._io_sampler.set_disks(self._disks)
+        self.disk_panel.add_disk(disk, index)
+        self.overview.set_disks(self._disks)
+        self.status_msg.setText(f"➕  {disk['path']} conectado  ·  {len(self._disks)} disco(s)")
+
+        def _worker():
+            try:
+                data = read_smart(disk["path"])
+            except Exception as e:
+                data = _empty_smart_result()
+                data["raw_output"] = f"Error leyendo S.M.A.R.T.: {e}"
+            self._hotplug_read.emit({"disk": disk, "data": data})
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def _remove_disk(self, path):
+        gone = [d for d in self._disks if d["path"] == path]
+        if not gone:
+            return
+        self._disks = [d for d in self._disks if d["path"] != path]
+        self._temp_sampler.remove(gone[0]["name"])
+        self._io_sampler.set_disks(self._disks)
+        self.disk_panel.remove_disk(path)
+        self.overview.set_disks(self._disks)
+        self.status_msg.setText(f"➖  {path} retirado  ·  {len(self._disks)} disco(s)")
+
+    def _on_hotplug_read(self, result):
+        data = result["data"]
+        self.overview.update_smart(result["disk"]["path"], data)
+        btn = self.disk_panel._button_for(result["disk"]["path"])
+        if btn is not None:
+            self.disk_panel.refresh_button(btn, data["health"], data["temp"],
+                                           data.get("standby", False))
+
+    def _start_selftests(self, kind, all_disks):
+        if all_disks:
+            paths = [d["path"] for d in self._disks]
+        else:
+            disk = self.disk_panel.current_disk()
+            paths = [disk["path"]] if disk else []
+        if paths:
+            self._selftests.schedule(paths, kind)
+
+    def _on_selftest_update(self, item):
+        path, state = item
+        self.disk_panel.set_selftest(path, state)
+        label = SELFTEST_KINDS.get(state["kind"], state["kind"])
+        if state["state"] in ("done", "failed", "error"):
+            self.status_msg.setText(f"🔬  Autotest {label} de {path}: {state['result']}")
+        elif state["state"] == "running" and not state["percent"]:
+            self.status_msg.setText(f"🔬  Autotest {label} iniciado en {path}")
+
+    def _show_disk(self, disk):
+        """Clic en una baldosa: abre ese disco en el panel S.M.A.R.T."""
+        btn = self.disk_panel._button_for(disk["path"])
+        if btn is not None:
+            self.tabs.setCurrentWidget(self.disk_panel)
+            btn.click()
 
     def _on_disk_selected(self, disk, btn):
         """Llamado cuando el usuario selecciona un disco."""
         self._current_disk = disk
         self._current_btn  = btn
-        health, temp = self.disk_panel.load_disk(disk)
-        self.disk_panel.refresh_button(btn, health, temp)
+        self.disk_panel.load_disk(disk)
 
     def _start_timer(self):
         self._timer = QTimer(self)
         self._timer.timeout.connect(self._update_time)
         self._timer.start(1_000)   # update clock every second
 
+        # Temperaturas por hwmon y actividad de /proc/diskstats: baratas,
+        # se refrescan cada segundo
+        self._live_timer = QTimer(self)
+        self._live_timer.timeout.connect(self._update_temps)
+        self._live_timer.timeout.connect(self._update_io)
+        self._live_timer.timeout.connect(self._update_storage)
+        self._live_timer.start(1_000)
+
+        # Barrido periódico: la caché S.M.A.R.T. hace que sólo se lean los
+        # discos cuyo resultado caducó
+        self._sweep_timer = QTimer(self)
+        self._sweep_timer.timeout.connect(lambda: self._start_sweep(quiet=True))
+        self._sweep_timer.timeout.connect(self._refresh_pools)
+        self._sweep_timer.start(OVERVIEW_REFRESH * 1000)
+        self._refresh_pools()
+
+        # Uso de los sistemas de archivos para el pronóstico de llenado:
+        # una muestra ahora y otra cada FS_SAMPLE_INTERVAL, en segundo plano
+        self._fs_timer = QTimer(self)
+        self._fs_timer.timeout.connect(self._sample_fs)
+        self._fs_timer.start(FS_SAMPLE_INTERVAL * 1000)
+        self._sample_fs()
+
+    def _sample_fs(self):
+        threading.Thread(target=record_fs_usage, daemon=True).start()
+
+    def _update_temps(self):
+        asleep = {b.disk["name"] for b in self.disk_panel._disk_buttons if b.standby}
+        temps = self._temp_sampler.sample(skip=asleep)
+        if temps:
+            self.disk_panel.update_temps(temps)
+            self.overview.update_temps(temps)
+
+    def _update_io(self):
+        stats = self._io_sampler.sample()
+        if stats:
+            self.disk_panel.update_io(stats, self._io_sampler.series)
+            self.overview.update_io(stats)
+
+    def _update_storage(self):
+        """Arrays md desde sysfs cada segundo (progreso, velocidad y ETA en vivo)"""
+        arrays = md_arrays() + self._dm_pools
+        self.disk_panel.set_arrays(arrays_by_disk(arrays))
+        self.overview.set_arrays(arrays)
+
+    def _refresh_pools(self):
+        """Pools dm (un ioctl por dispositivo) y btrfs / ZFS, con el barrido periódico"""
+        threading.Thread(target=lambda: self._dm_read.emit(dm_pools() + POOLS.pools()),
+                         daemon=True).start()
+
+    def _on_dm_read(self, pools):
+        self._dm_pools = pools
+        self._update_storage()
+
     def _update_time(self):
         now = datetime.now().strftime("%Y-%m-%d  %H:%M:%S")
         self.status_time.setText(f"🕐  {now}")
+        self.disk_panel.update_data_age()
 
 
 # ─────────────────────────────────────────────
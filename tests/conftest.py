@@ -0,0 +1,62 @@
+"""Configuración común: los tests importan src/linux_hwmonitor.py directamente.
+
+Los tests sólo usan la parte sin interfaz del módulo, pero éste importa
+PyQt5 y psutil al final para las clases de la ventana. Si no están
+instalados (CI, contenedores) se ponen en sys.modules módulos vacíos que
+bastan para definir esas clases; nunca se llega a crear un widget.
+"""
+import importlib.util
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+
+class _QtMeta(type):
+    def __getattr__(cls, name):        # QFont.Bold, Qt.AlignCenter...
+        return _Qt
+
+
+class _Qt(metaclass=_QtMeta):
+    """Cualquier clase, constante o señal de Qt: acepta todo y no hace nada"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _Qt()
+
+    def __call__(self, *args, **kwargs):
+        return _Qt()
+
+    def __or__(self, other):
+        return self
+
+    __ror__ = __or__
+
+
+def _qt_module(name):
+    module = types.ModuleType(name)
+    module.pyqtSignal = lambda *args, **kwargs: _Qt()
+    module.pyqtSlot = lambda *args, **kwargs: (lambda f: f)
+    module.__getattr__ = lambda attr: _Qt
+    return module
+
+
+def _missing_psutil(name):
+    raise AttributeError(f"psutil no está instalado (psutil.{name})")
+
+
+if importlib.util.find_spec("PyQt5") is None:
+    sys.modules["PyQt5"] = types.ModuleType("PyQt5")
+    for _name in ("QtWidgets", "QtCore", "QtGui"):
+        sys.modules[f"PyQt5.{_name}"] = _qt_module(f"PyQt5.{_name}")
+        setattr(sys.modules["PyQt5"], _name, sys.modules[f"PyQt5.{_name}"])
+
+if importlib.util.find_spec("psutil") is None:
+    sys.modules["psutil"] = types.ModuleType("psutil")
+    sys.modules["psutil"].__getattr__ = _missing_psutil
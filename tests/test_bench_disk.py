@@ -0,0 +1,82 @@
+"""bench_disk sobre un archivo y, con root, sobre un dispositivo loop.
+
+Pruebas cortas (50 ms) con bloques pequeños: comprueban el recorrido y
+que nunca se escribe, no el rendimiento.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+import linux_hwmonitor as hw
+
+TESTS = (
+    ("SEQ64K Q2", 64 * 1024, 2, False),
+    ("RND4K Q4",  4096,      4, True),
+)
+SECONDS = 0.05
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "disk.img"
+    path.write_bytes(os.urandom(4 * 1024 * 1024))
+    path.chmod(0o444)                       # sólo lectura: el benchmark no escribe
+    return path
+
+
+def _digest(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_bench_file(image):
+    before = (_digest(image), os.stat(image).st_mtime_ns)
+    events = []
+    result = hw.bench_disk(str(image), seconds=SECONDS, tests=TESTS,
+                           on_test=lambda name, r: events.append((name, r is None)))
+    assert events == [("SEQ64K Q2", True), ("SEQ64K Q2", False),
+                      ("RND4K Q4", True), ("RND4K Q4", False)]
+    assert set(result["tests"]) == {"SEQ64K Q2", "RND4K Q4"}
+    assert isinstance(result["direct"], bool)
+    for r in result["tests"].values():
+        assert r["mbs"] > 0 and r["iops"] > 0 and r["lat_ms"] > 0
+    assert (_digest(image), os.stat(image).st_mtime_ns) == before
+
+
+def test_bench_too_small(tmp_path):
+    small = tmp_path / "small.img"
+    small.write_bytes(b"\0" * 4096)
+    with pytest.raises(ValueError):
+        hw.bench_disk(str(small), seconds=SECONDS, tests=TESTS)
+
+
+def test_bench_cancelled(image):
+    cancel = threading.Event()
+    cancel.set()
+    assert hw.bench_disk(str(image), seconds=SECONDS, tests=TESTS, cancel=cancel)["tests"] == {}
+
+
+def test_baseline_is_median_of_recorded_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(hw, "_history_ident", lambda path: "ZFN0A1B2")
+    history = hw.SmartHistory(str(tmp_path))
+    for mbs in (100.0, 180.0, 120.0):
+        assert hw.record_bench("/dev/sda", {"t": 0, "tests": {"SEQ1M Q8": {"mbs": mbs}}}, history)
+    assert hw.bench_baseline("/dev/sda", history) == {"SEQ1M Q8": 120.0}
+
+
+@pytest.mark.skipif(os.geteuid() != 0 or not shutil.which("losetup"), reason="hace falta root y losetup")
+def test_bench_loop_device(image):
+    try:
+        dev = subprocess.run(["losetup", "--find", "--show", "--read-only", str(image)],
+                             capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("no se pudo crear un dispositivo loop")
+    try:
+        result = hw.bench_disk(dev, seconds=SECONDS, tests=TESTS)
+        assert result["direct"] is True             # un loop admite O_DIRECT
+        assert all(r["mbs"] > 0 for r in result["tests"].values())
+    finally:
+        subprocess.run(["losetup", "-d", dev], check=False)
@@ -0,0 +1,48 @@
+"""DiskTempSampler: los discos rotativos no se leen cada segundo ni dormidos."""
+import pytest
+
+import linux_hwmonitor as hw
+
+
+@pytest.fixture
+def sensors(tmp_path, monkeypatch):
+    for name, millideg in (("sda", 36000), ("nvme0n1", 41000)):
+        (tmp_path / name).write_text(f"{millideg}\n")
+    monkeypatch.setattr(hw, "_hwmon_temp_input", lambda name: str(tmp_path / name))
+    return tmp_path
+
+
+def test_rotational_disks_are_polled_slowly(sensors):
+    modes = []
+    sampler = hw.DiskTempSampler(
+        [{"name": "sda", "rotational": True}, {"name": "nvme0n1", "rotational": False}],
+        hdd_interval=300, power_mode=lambda path: modes.append(path) or "active")
+    assert sampler.sample(now=1000) == {"sda": 36, "nvme0n1": 41}
+    assert sampler.sample(now=1001) == {"nvme0n1": 41}
+    assert sampler.sample(now=1299) == {"nvme0n1": 41}
+    assert sampler.sample(now=1300) == {"sda": 36, "nvme0n1": 41}
+    assert modes == ["/dev/sda", "/dev/sda"]         # nunca el NVMe
+    sampler.close()
+
+
+def test_sleeping_disk_is_not_read(sensors):
+    mode = ["standby"]
+    sampler = hw.DiskTempSampler([{"name": "sda", "rotational": True}],
+                                 hdd_interval=60, power_mode=lambda path: mode[0])
+    assert sampler.sample(now=0) == {}
+    mode[0] = "idle"
+    assert sampler.sample(now=30) == {}             # espera al siguiente turno
+    assert sampler.sample(now=60) == {"sda": 36}
+    sampler.close()
+
+
+def test_skip_and_hotplug(sensors):
+    sampler = hw.DiskTempSampler(power_mode=lambda path: None)
+    sampler.add("sda", rotational=True)
+    sampler.add("nvme0n1", rotational=False)
+    assert sampler.sample(skip={"sda"}, now=0) == {"nvme0n1": 41}
+    assert sampler.sample(now=0) == {"sda": 36, "nvme0n1": 41}
+    sampler.remove("sda")
+    assert not sampler.has("sda")
+    assert sampler._rotational == {}
+    sampler.close()
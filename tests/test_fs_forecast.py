@@ -0,0 +1,33 @@
+"""FsForecaster: días hasta llenarse desde el historial de uso en FS_HISTORY."""
+import pytest
+
+import linux_hwmonitor as hw
+
+HOUR = 3600
+
+
+def _record(history, ident, hours, avail_mb):
+    for h in hours:
+        history.record(ident, {hw.FSKEY_USED_MB: 0, hw.FSKEY_AVAIL_MB: avail_mb(h)}, ts=h * HOUR)
+
+
+def test_fill_forecast_and_bounded_series(tmp_path):
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    fc = hw.FsForecaster(history, window_days=2)
+    # 100 GB libres que bajan 1 GB por hora durante 72 h, una muestra por hora
+    for h in range(72):
+        _record(history, "fs-root", [h], lambda h: 100_000 - 1000 * h)
+        fc.forecast_many(["fs-root"], now=h * HOUR)
+    days = fc.forecast_many(["fs-root", "fs-nada"], now=71 * HOUR)
+    assert days["fs-nada"] is None
+    assert days["fs-root"] == pytest.approx(29_000 / 1000 / 24, rel=0.05)
+    ts, _ = fc._drives["fs-root"]["points"][hw.FSKEY_AVAIL_MB]
+    assert len(ts) == 2 * 24 + 2        # 48 h de ventana, sus extremos y el punto anterior
+
+
+def test_needs_min_span_and_falling_space(tmp_path):
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    fc = hw.FsForecaster(history)
+    _record(history, "fs-new", range(hw.FS_FORECAST_MIN_HOURS - 1), lambda h: 50_000 - 100 * h)
+    _record(history, "fs-growing", range(48), lambda h: 50_000 + 100 * h)
+    assert fc.forecast_many(["fs-new", "fs-growing"], now=48 * HOUR) == {"fs-new": None, "fs-growing": None}
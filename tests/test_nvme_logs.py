@@ -0,0 +1,157 @@
+"""Decodificadores de los logs NVMe (salud 0x02, errores 0x01, autotest 0x06)
+con bloques armados según la especificación NVMe 1.4."""
+import struct
+
+import pytest
+
+import linux_hwmonitor as hw
+
+
+def _u128(value):
+    return value.to_bytes(16, "little")
+
+
+def health_blob():
+    blob = bytearray(512)
+    blob[0] = 0x04                                  # fiabilidad degradada
+    struct.pack_into("<H", blob, 1, 314)            # 41 °C en kelvin
+    blob[3], blob[4], blob[5] = 97, 10, 3
+    for off, value in ((32, 28764523), (48, 41238771), (64, 412087734), (80, 801238812),
+                       (96, 2176), (112, 1204), (128, 9871), (144, 87), (160, 5),
+                       (176, 2451)):
+        blob[off:off + 16] = _u128(value)
+    blob[128:144] = _u128(2**64 + 9871)             # contador de 128 bits
+    struct.pack_into("<II", blob, 192, 12, 1)
+    struct.pack_into("<8H", blob, 200, 314, 319, 0, 0, 0, 0, 0, 0)
+    return bytes(blob)
+
+
+def test_health_log():
+    log = hw.decode_nvme_health_log(health_blob())
+    assert log["critical_warning"] == 0x04
+    assert log["temperature"] == 41
+    assert (log["available_spare"], log["available_spare_threshold"], log["percentage_used"]) == (97, 10, 3)
+    assert log["data_units_written"] == 41238771
+    assert log["power_cycles"] == 1204
+    assert log["power_on_hours"] == 2**64 + 9871
+    assert log["media_errors"] == 5
+    assert log["num_err_log_entries"] == 2451
+    assert (log["warning_temp_time"], log["critical_comp_time"]) == (12, 1)
+    assert log["temperature_sensors"] == [41, 46]
+
+
+def test_health_log_without_temperature():
+    log = hw.decode_nvme_health_log(bytes(512))
+    assert log["temperature"] is None
+    assert "temperature_sensors" not in log
+
+
+def test_error_log():
+    blob = bytearray(64 * 3)
+    # Unrecovered Read Error (SCT 2, SC 0x81), do-not-retry, bit de fase a 1
+    status = ((0x4000 | 2 << 8 | 0x81) << 1) | 1
+    struct.pack_into("<QHHHHQI", blob, 0, 2451, 3, 0x1A, status, 0x0102, 123456789, 1)
+    # Código desconocido: texto genérico
+    struct.pack_into("<QHHHHQI", blob, 64, 2450, 0, 7, (1 << 8 | 0x2F) << 1, 0, 0, 0)
+    # La tercera entrada está vacía (error_count 0)
+    table = hw.decode_nvme_error_log(bytes(blob))["table"]
+    assert len(table) == 2
+    first = table[0]
+    assert (first["error_count"], first["submission_queue_id"], first["command_id"]) == (2451, 3, 0x1A)
+    assert first["status_field"]["do_not_retry"] is True
+    assert first["status_field"]["string"] == "Unrecovered Read Error"
+    assert first["lba"] == {"value": 123456789}
+    assert first["nsid"] == 1
+    assert table[1]["status_field"]["string"] == "SCT 1 SC 0x2f"
+    assert table[1]["status_field"]["do_not_retry"] is False
+
+
+def test_self_test_log():
+    blob = bytearray(564)
+    blob[0], blob[1] = 0x2, 37                      # extendida en curso, 37 %
+    for i in range(20):
+        blob[4 + 28 * i] = 0xFF                     # entradas sin usar
+    # 1ª: corta, fallo de segmentos en el 3, con nsid y lba válidos
+    struct.pack_into("<BBBxQIQBB", blob, 4, 0x17, 3, 0x3, 9870, 1, 4096, 0, 0)
+    # 2ª: extendida completada sin error
+    struct.pack_into("<BBBxQ", blob, 32, 0x20, 0, 0, 9000)
+    log = hw.decode_nvme_self_test_log(bytes(blob))
+    assert log["current_self_test_operation"]["value"] == 2
+    assert log["current_self_test_completion_percent"] == 37
+    first, second = log["table"]
+    assert first["self_test_code"]["string"] == "Short"
+    assert first["self_test_result"]["string"] == "Completed: failed segments"
+    assert (first["segment"], first["nsid"], first["lba"]) == (3, 1, 4096)
+    assert first["power_on_hours"] == 9870
+    assert second["self_test_code"]["string"] == "Extended"
+    assert second["self_test_result"]["value"] == 0
+    assert "segment" not in second and "lba" not in second
+
+
+def test_identify_cache_is_forgotten(monkeypatch):
+    monkeypatch.setattr(hw, "_NVME_IDENTIFY", {})
+    calls = []
+
+    def admin(fd, opcode, length, **kw):
+        calls.append(opcode)
+        blob = bytearray(4096)
+        blob[24:64] = f"MODEL {len(calls)}".ljust(40).encode()
+        return bytes(blob)
+
+    monkeypatch.setattr(hw, "_nvme_admin", admin)
+    assert hw._nvme_identify(-1, "/dev/nvme0n1")["model_name"] == "MODEL 1"
+    assert hw._nvme_identify(-1, "/dev/nvme0n1")["model_name"] == "MODEL 1"
+    hw.forget_nvme_identify("/dev/nvme0n1")
+    assert hw._nvme_identify(-1, "/dev/nvme0n1")["model_name"] == "MODEL 2"
+    hw._nvme_identify(-1, "/dev/nvme1n1")
+    hw.forget_nvme_identify()
+    assert hw._NVME_IDENTIFY == {}
+    assert len(calls) == 3
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(hw, "_history_ident", lambda path: "S4EWNX0N123456A")
+    monkeypatch.setattr(hw, "SMART_BACKEND", "auto")
+    monkeypatch.setattr(hw, "_NVME_NATIVE_LOGS_FAILED", set())
+    return hw.NvmeLogStore(hw.SmartHistory(str(tmp_path)))
+
+
+def test_self_test_log_reread_only_when_it_may_change(store, monkeypatch):
+    reads = []
+    running = [0]
+
+    def native(path):
+        reads.append(path)
+        return {"current_self_test_operation": {"value": running[0]}, "table": []}
+
+    monkeypatch.setattr(hw, "read_nvme_self_test_log_native", native)
+    health = {"num_err_log_entries": 0, "power_on_hours": 9871}
+    store.ingest("/dev/nvme0n1", health)
+    store.ingest("/dev/nvme0n1", health)
+    assert len(reads) == 1                              # mismas horas: no se relee
+    store.ingest("/dev/nvme0n1", dict(health, power_on_hours=9872))
+    assert len(reads) == 2
+    store.self_test_changed("/dev/nvme0n1")
+    running[0] = 1
+    store.ingest("/dev/nvme0n1", dict(health, power_on_hours=9872))
+    store.ingest("/dev/nvme0n1", dict(health, power_on_hours=9872))
+    assert len(reads) == 4                              # test en curso: cada vez
+    running[0] = 0
+    store.ingest("/dev/nvme0n1", dict(health, power_on_hours=9872))
+    store.ingest("/dev/nvme0n1", dict(health, power_on_hours=9872))
+    assert len(reads) == 5
+
+
+def test_native_failure_is_remembered(store, monkeypatch):
+    native, forked = [], []
+    monkeypatch.setattr(hw, "read_nvme_self_test_log_native",
+                        lambda path: native.append(path))
+    monkeypatch.setattr(hw, "_read_nvme_log_smartctl",
+                        lambda path, option, key: forked.append(option) or {"table": []})
+    for _ in range(3):
+        assert hw.read_nvme_self_test_log("/dev/nvme0n1") == {"table": []}
+    assert len(native) == 1 and len(forked) == 3        # el ioctl no se reintenta
+    hw.forget_nvme_identify("/dev/nvme0n1")             # hotplug: se vuelve a probar
+    hw.read_nvme_self_test_log("/dev/nvme0n1")
+    assert len(native) == 2
@@ -0,0 +1,45 @@
+"""annotate_pools: el uso de un pool btrfs / ZFS repartido entre sus miembros."""
+import linux_hwmonitor as hw
+
+
+def _part(name, total_gb, used_gb, uuid="f00d"):
+    return {"name": name, "fstype": "btrfs", "uuid": uuid, "mounts": ["/srv"],
+            "total_gb": total_gb, "used_gb": used_gb, "free_gb": total_gb - used_gb,
+            "percent": round(used_gb / total_gb * 100, 1)}
+
+
+def _pool(devices, used_gb, free_gb):
+    return {"kind": "btrfs", "name": "data", "devices": devices, "used_gb": used_gb, "free_gb": free_gb}
+
+
+def test_single_profile_is_split_by_member_size():
+    # Dos miembros en el mismo disco (sda1 + sda2) y uno en otro (sdb1)
+    pool = _pool(["sda1", "sda2", "sdb1"], used_gb=1500.0, free_gb=500.0)
+    sda = hw.annotate_pools([_part("sda1", 500.0, 400.0), _part("sda2", 500.0, 400.0),
+                             {"name": "sda3", "total_gb": 100.0, "used_gb": 10.0, "free_gb": 90.0}], [pool])
+    sdb = hw.annotate_pools([_part("sdb1", 1000.0, 400.0)], [pool])
+    members = sda[:2] + sdb
+    assert [p["used_gb"] for p in members] == [375.0, 375.0, 750.0]
+    assert sum(p["used_gb"] for p in members) == 1500.0          # no se cuenta dos veces
+    assert sum(p["free_gb"] for p in members) == 500.0
+    assert all(p["used_gb"] + p["free_gb"] <= p["total_gb"] for p in members)
+    assert all(p["percent"] == 75.0 and p["pool"] is pool for p in members)
+    assert sda[2]["used_gb"] == 10.0 and "pool" not in sda[2]
+
+
+def test_mirror_member_carries_whole_pool():
+    pool = _pool(["sda1", "sdb1"], used_gb=600.0, free_gb=400.0)     # raid1: 1 TB útil
+    for name in ("sda1", "sdb1"):
+        [p] = hw.annotate_pools([_part(name, 1000.0, 10.0)], [pool])
+        assert (p["used_gb"], p["free_gb"], p["percent"]) == (600.0, 400.0, 60.0)
+
+
+def test_history_records_the_whole_pool(tmp_path):
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    pool = _pool(["sda1", "sdb1"], used_gb=1500.0, free_gb=500.0)
+    snapshot = {"sda": hw.annotate_pools([_part("sda1", 1000.0, 10.0)], [pool]),
+                "sdb": hw.annotate_pools([_part("sdb1", 1000.0, 10.0)], [pool])}
+    assert hw.record_fs_usage(snapshot, history, ts=1000) == 1
+    series = history.load("fs-f00d", [hw.FSKEY_USED_MB, hw.FSKEY_AVAIL_MB])
+    assert list(series[hw.FSKEY_USED_MB][1]) == [1_500_000]
+    assert list(series[hw.FSKEY_AVAIL_MB][1]) == [500_000]
@@ -0,0 +1,112 @@
+"""SelfTestScheduler con un smartctl falso: arranque, sondeo con retroceso,
+fin y cancelación (también a mitad del arranque)."""
+import json
+import threading
+import time
+
+import pytest
+
+import linux_hwmonitor as hw
+
+
+class FakeSmartctl:
+    """Sustituto de run_smartctl para -t, -c -l selftest y -X"""
+
+    def __init__(self, remaining=(90, 60, 30), accept=True):
+        self.remaining = list(remaining)
+        self.accept = accept
+        self.calls = []
+        self.polls = []
+        self.start_gate = threading.Event()
+        self.start_gate.set()
+        self.starting = threading.Event()
+
+    def __call__(self, args, timeout=8):
+        self.calls.append(args[0])
+        if args[0] == "-t":
+            self.starting.set()
+            self.start_gate.wait(2)
+            return json.dumps({"smartctl": {"exit_status": 0 if self.accept else 4}})
+        if args[0] == "-X":
+            return ""
+        self.polls.append(time.monotonic())
+        if self.remaining:
+            status = {"value": 0xF0 | 3, "remaining_percent": self.remaining.pop(0)}
+            return json.dumps({"ata_smart_data": {"self_test": {"status": status}}})
+        return json.dumps({
+            "ata_smart_data": {"self_test": {"status": {"value": 0, "passed": True}}},
+            "ata_smart_self_test_log": {"standard": {"table": [
+                {"status": {"string": "Completed without error", "passed": True}}]}},
+        })
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    smartctl = FakeSmartctl()
+    monkeypatch.setattr(hw, "run_smartctl", smartctl)
+    return smartctl
+
+
+def _scheduler(**kw):
+    updates = []
+    finished = threading.Event()
+
+    def on_update(path, state):
+        updates.append(state["state"])
+        if state["state"] in ("done", "failed", "error"):
+            finished.set()
+
+    sched = hw.SelfTestScheduler(on_update, stagger=0, **kw)
+    return sched, updates, finished
+
+
+def test_schedule_polls_with_backoff_until_done(fake):
+    sched, updates, finished = _scheduler(poll_min=0.02, poll_max=0.08)
+    sched.schedule(["/dev/sda"])
+    assert finished.wait(5)
+    job = sched.jobs["/dev/sda"]
+    assert updates[0] == "queued" and updates[-1] == "done"
+    assert "running" in updates
+    assert job["result"] == "Completed without error" and job["percent"] == 100
+    assert fake.calls == ["-t", "-c", "-c", "-c", "-c"]
+    gaps = [b - a for a, b in zip(fake.polls, fake.polls[1:])]
+    assert gaps[0] >= 0.02 and gaps[-1] >= gaps[0]          # el sondeo se espacia
+    assert sched.active() == []
+
+
+def test_rejected_start_is_an_error(fake):
+    fake.accept = False
+    sched, updates, finished = _scheduler(poll_min=0.02)
+    sched.schedule(["/dev/sda"])
+    assert finished.wait(5)
+    assert updates == ["queued", "error"]
+    assert "-c" not in fake.calls
+
+
+def test_cancel_running_test_aborts_it(fake):
+    fake.remaining = [90] * 100
+    sched, updates, finished = _scheduler(poll_min=0.02, poll_max=0.02)
+    sched.schedule(["/dev/sda"])
+    deadline = time.monotonic() + 5
+    while sched.jobs["/dev/sda"]["state"] != "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sched.cancel("/dev/sda")
+    assert finished.is_set()
+    assert sched.jobs["/dev/sda"]["result"] == "cancelado"
+    assert fake.calls.count("-X") == 1
+
+
+def test_cancel_while_start_in_flight_aborts_started_test(fake):
+    fake.start_gate.clear()
+    sched, updates, finished = _scheduler(poll_min=0.02)
+    sched.schedule(["/dev/sda"])
+    assert fake.starting.wait(2)
+    sched.cancel("/dev/sda")              # smartctl -t todavía no volvió
+    assert "-X" not in fake.calls
+    fake.start_gate.set()                 # el disco acepta el test...
+    deadline = time.monotonic() + 5
+    while "-X" not in fake.calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fake.calls == ["-t", "-X"]     # ...y se aborta enseguida, sin sondeos
+    assert updates == ["queued", "error"]
+    assert sched.jobs["/dev/sda"]["state"] == "error"
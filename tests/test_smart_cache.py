@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+import linux_hwmonitor as hw
+
+
+def test_read_coalesces_and_releases_load_locks(monkeypatch):
+    monkeypatch.setattr(hw, "_disk_identity", lambda path: "SERIAL-" + path)
+    cache = hw.SmartCache(ttl=60, max_entries=4)
+    calls = []
+    gate = threading.Event()
+
+    def loader(path):
+        calls.append(path)
+        gate.wait(2)
+        return {"health": "Bueno"}
+
+    threads = [threading.Thread(target=cache.read, args=("/dev/sda", loader)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+    assert calls == ["/dev/sda"]
+    assert cache._loading == {}
+
+
+def test_load_locks_do_not_accumulate_across_devices(monkeypatch):
+    monkeypatch.setattr(hw, "_disk_identity", lambda path: path)
+    cache = hw.SmartCache(ttl=60, max_entries=2)
+    for i in range(50):
+        cache.read(f"/dev/sd{i}", lambda path: {"health": "Bueno"})
+    assert cache._loading == {}
+    assert len(cache._entries) == 2
+
+
+def test_failed_loader_releases_lock(monkeypatch):
+    monkeypatch.setattr(hw, "_disk_identity", lambda path: path)
+    cache = hw.SmartCache()
+
+    def boom(path):
+        raise RuntimeError("smartctl")
+
+    with pytest.raises(RuntimeError):
+        cache.read("/dev/sda", boom)
+    assert cache._loading == {}
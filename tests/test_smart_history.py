@@ -0,0 +1,127 @@
+"""SmartHistory: valores de 64 bits sin cadenas de deltas de 32 bits."""
+import os
+
+import pytest
+
+import linux_hwmonitor as hw
+
+RAW = hw.HKEY_ATTR_RAW + 1      # Raw_Read_Error_Rate: raws de 48 bits de Seagate
+
+
+def _size(history, ident):
+    return os.path.getsize(history.path(ident))
+
+
+def test_large_and_sign_flipping_values_round_trip(tmp_path):
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    samples = [2**47 + 12345, 5, -(2**47), 2**47, 2**63 - 1, -(2**62), 7, 2**31, -(2**31)]
+    t0 = 1_700_000_000
+    for i, v in enumerate(samples):
+        assert history.record("disk", {RAW: v, hw.HKEY_TEMP: 30 + i}, ts=t0 + 60 * i)
+
+    # Ninguna métrica pasa de 12 bytes por muestra (antes: millones de registros)
+    assert _size(history, "disk") <= len(hw.HISTORY_MAGIC) + len(samples) * (12 + 12 + 6)
+
+    series = history.load("disk", [RAW, hw.HKEY_TEMP])
+    ts, vs = series[RAW]
+    assert list(vs) == samples
+    assert list(ts) == [t0 + 60 * i for i in range(len(samples))]
+    assert list(series[hw.HKEY_TEMP][1]) == [30 + i for i in range(len(samples))]
+
+    # Reabrir desde disco reconstruye el estado y sigue con deltas pequeños
+    again = hw.SmartHistory(str(tmp_path), interval=1)
+    assert again.last_time("disk") == t0 + 60 * (len(samples) - 1)
+    before = _size(again, "disk")
+    again.record("disk", {RAW: -(2**31) + 1}, ts=t0 + 10_000)
+    assert _size(again, "disk") - before == 12     # marco + delta de 1
+    assert list(again.load("disk", [RAW])[RAW][1])[-1] == -(2**31) + 1
+
+
+def test_frame_time_beyond_32_bits(tmp_path):
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    history.record("disk", {hw.HKEY_TEMP: 40}, ts=2**32 + 5)    # año 2106
+    history.record("disk", {hw.HKEY_TEMP: 41}, ts=2**32 + 65)
+    assert list(history.load("disk", [hw.HKEY_TEMP])[hw.HKEY_TEMP][0]) == [2**32 + 5, 2**32 + 65]
+
+
+def test_forecaster_reads_escapes_incrementally(tmp_path):
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    fc = hw.SmartForecaster(history)
+    key = hw.HKEY_ATTR_RAW + 5
+    history.record("disk", {key: 2**40}, ts=1000)
+    st = fc._update("disk")
+    assert st["values"][key] == 2**40
+
+    # Escape a medio escribir: la mitad alta aún no llegó
+    path = history.path("disk")
+    with open(path, "ab") as f:
+        f.write(hw._HIST_REC.pack(0, 60) + hw._HIST_REC.pack(key | hw.HKEY_ABS, 0))
+    st = fc._update("disk")
+    assert st["values"][key] == 2**40
+    with open(path, "ab") as f:
+        f.write(hw._HIST_REC.pack(key | hw.HKEY_ABS, -1))
+    st = fc._update("disk")
+    assert st["values"][key] == -(2**32)
+    assert list(st["points"][key][0]) == [1000, 1060]
+
+
+def test_append_after_torn_escape(tmp_path):
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    history.record("disk", {RAW: 2**40, hw.HKEY_TEMP: 30}, ts=1000)
+    path = history.path("disk")
+    good = os.path.getsize(path)
+    # Caída a mitad de una muestra: marco + mitad baja del escape + 2 bytes
+    with open(path, "ab") as f:
+        f.write(hw._HIST_REC.pack(0, 60) + hw._HIST_REC.pack(RAW | hw.HKEY_ABS, 7) + b"\x01\x02")
+
+    again = hw.SmartHistory(str(tmp_path), interval=1)      # otro proceso
+    again.record("disk", {RAW: 2**41, hw.HKEY_TEMP: 31}, ts=1120)
+    again.record("disk", {RAW: -(2**41)}, ts=1180)
+    # La mitad suelta y el registro cortado se recortaron antes de añadir
+    with open(path, "rb") as f:
+        tail = f.read()[good:]
+    assert tail[:6] == hw._HIST_REC.pack(0, 60)
+    assert hw._HIST_REC.pack(RAW | hw.HKEY_ABS, 7) not in tail
+    assert (len(tail) - 6) % 6 == 0
+    ts, vs = hw.SmartHistory(str(tmp_path)).load("disk", [RAW])[RAW]
+    assert list(vs) == [2**40, 2**41, -(2**41)]
+    assert list(ts) == [1000, 1120, 1180]
+
+
+def test_orphan_half_in_the_middle_is_skipped(tmp_path):
+    # Archivo de una versión anterior con una mitad suelta entre muestras
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    key = hw.HKEY_ATTR_RAW + 5                   # una de las claves del pronóstico
+    rec = hw._HIST_REC.pack
+    big = 2**40 + 3
+    lo, hi = big & 0xFFFFFFFF, big >> 32
+    body = (rec(0, 1000) + rec(key, 10)
+            + rec(0, 60) + rec(key | hw.HKEY_ABS, 99)                  # mitad suelta
+            + rec(0, 60) + rec(key | hw.HKEY_ABS, lo - 2**32 if lo >= 2**31 else lo)
+            + rec(key | hw.HKEY_ABS, hi)
+            + rec(0, 60) + rec(key, 1))
+    with open(history.path("disk"), "wb") as f:
+        f.write(hw.HISTORY_MAGIC + body)
+    ts, vs = history.load("disk", [key])[key]
+    assert list(vs) == [10, big, big + 1]
+    assert list(ts) == [1000, 1120, 1180]
+    assert history._replay(history.path("disk")) == (1180, {key: big + 1})
+    st = hw.SmartForecaster(history)._update("disk")
+    assert st["values"][key] == big + 1
+    assert list(st["points"][key][1]) == [10, big, big + 1]
+
+
+def test_forecaster_keeps_only_the_window(tmp_path):
+    history = hw.SmartHistory(str(tmp_path), interval=1)
+    fc = hw.SmartForecaster(history, window_days=10)
+    day = 86400
+    for d in range(40):                          # vida: -1 % por día durante 40 días
+        history.record("disk", {hw.HKEY_LIFE: 100 - d}, ts=d * day)
+        fc._update("disk")
+    ts, vs = fc._update("disk")["points"][hw.HKEY_LIFE]
+    # Los 10 días de la ventana más el punto vigente al empezar
+    assert list(ts) == [d * day for d in range(28, 40)]
+    assert list(vs) == [100 - d for d in range(28, 40)]
+    fc_all = hw.SmartForecaster(history, window_days=10)      # de una sola lectura
+    assert list(fc_all._update("disk")["points"][hw.HKEY_LIFE][0]) == list(ts)
+    assert fc.forecast("disk", now=39 * day)["life_days"] == pytest.approx(61, rel=0.1)
@@ -0,0 +1,113 @@
+"""Salidas de smartctl -a -j (tests/fixtures/smartctl) contra el parser.
+
+Cubre HDD y SSD SATA, NVMe, puentes USB (con y sin SAT) y los casos de
+error: permiso denegado, disco en reposo, disco fallando y JSON truncado.
+Son salidas sintéticas con el formato de smartctl 7.4 (ver
+tests/fixtures/README.md).
+"""
+import json
+import os
+
+import pytest
+
+from conftest import FIXTURES
+
+import linux_hwmonitor as hw
+
+CORPUS = os.path.join(FIXTURES, "smartctl")
+BASELINE = os.path.join(FIXTURES, "bench-baseline.json")
+
+# archivo -> (salud, temp, vida %, horas, nº atributos, {id: (flag, raw)})
+EXPECTED = {
+    "sata-hdd-st4000dm004": ("Bueno", 36, 100, 24846, 25, {
+        "190": ("Bueno", 0x1E1D0024),
+        "194": ("Bueno", 0x120024),
+        "188": ("Bueno", 4295032833),
+        "240": ("Bueno", (0xA1B2 << 32) | 22362),
+    }),
+    "sata-ssd-860evo": ("Bueno", 33, 94, 21734, 14, {
+        "177": ("Bueno", 112),
+        "241": ("Bueno", 63512459310),
+    }),
+    "sata-hdd-failing-wd20earx": ("Malo", 38, 100, 45671, 12, {
+        "005": ("Malo", 3912),
+        "197": ("Bueno", 27),
+    }),
+    "nvme-970evoplus": ("Bueno", 41, 97, 9871, 0, {}),
+    "usb-jms578-wd20ezaz": ("Bueno", 30, 100, 7018, 10, {
+        "193": ("Bueno", 43580),
+    }),
+    "usb-unknown-bridge": ("Desconocido", None, None, None, 0, {}),
+    "error-permission-denied": ("Desconocido", None, None, None, 0, {}),
+}
+
+
+def _read(name):
+    with open(os.path.join(CORPUS, name + ".json")) as f:
+        return f.read()
+
+
+def test_corpus_covers_every_case():
+    names = set(hw._smart_fixtures(CORPUS))
+    assert set(EXPECTED) | {"error-standby", "error-truncated"} == names
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_parse_synthetic_output(name):
+    health, temp, life, hours, count, attrs = EXPECTED[name]
+    r = hw.parse_smartctl_output(_read(name))
+    assert r["health"] == health
+    assert r["temp"] == temp
+    assert r["life_percent"] == life
+    assert r["power_on_hours"] == hours
+    ata = [a for a in r["attributes"] if a["id"].isdigit()]
+    assert len(ata) == count
+    by_id = {a["id"]: a for a in ata}
+    for aid, (flag, raw) in attrs.items():
+        assert (by_id[aid]["flag"], by_id[aid]["raw"]) == (flag, raw)
+
+
+def test_nvme_log_and_pseudo_attributes():
+    r = hw.parse_smartctl_output(_read("nvme-970evoplus"))
+    assert r["nvme_log"]["num_err_log_entries"] == 2451
+    assert r["power_on_count"] == 1204
+    assert r["total_writes"] == pytest.approx(41238771 * 512 * 1000 / 1e9)
+    assert r["attributes"]
+
+
+def test_standby_is_not_an_error():
+    r = hw.parse_smartctl_output(_read("error-standby"))
+    assert r.get("standby") is True
+    assert r["health"] == "Desconocido"
+
+
+def test_truncated_output_is_shown_raw():
+    out = _read("error-truncated")
+    r = hw.parse_smartctl_output(out)
+    assert r["health"] == "Desconocido"
+    assert r["attributes"] == []
+    assert r["raw_output"] == out
+
+
+def test_replay_through_get_smart_data(monkeypatch):
+    monkeypatch.setattr(hw, "SMART_REPLAY_DIR", CORPUS)
+    assert hw.get_smart_data("/dev/sata-ssd-860evo")["life_percent"] == 94
+    missing = hw.get_smart_data("/dev/no-existe")
+    assert missing["health"] == "Desconocido"
+    assert "sudo" in missing["raw_output"]
+
+
+def test_bench_baseline_covers_corpus():
+    # bench tests/fixtures/smartctl --baseline tests/fixtures/bench-baseline.json
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+    assert set(baseline["parser"]) == set(hw._smart_fixtures(CORPUS))
+    assert all(v > 0 for v in baseline["parser"].values())
+
+
+def test_relative_baseline_ignores_machine_speed():
+    # La misma relación con json.loads en una máquina el doble de rápida: 0%
+    assert hw._vs_baseline(8000.0, 0.4, reference=20000.0) == "  +0%"
+    assert hw._vs_baseline(3000.0, 0.4, reference=10000.0) == "  -25%"
+    assert hw._vs_baseline(3000.0, 2000.0) == "  +50%"           # línea base absoluta antigua
+    assert hw.bench_reference(rounds=10) > 0
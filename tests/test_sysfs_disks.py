@@ -0,0 +1,81 @@
+"""get_disks / _sysfs_disk sobre un árbol /sys falso."""
+import json
+
+import pytest
+
+import linux_hwmonitor as hw
+
+
+def _disk(root, name, size, device=True, **attrs):
+    base = root / "block" / name
+    (base / "queue").mkdir(parents=True)
+    (base / "holders").mkdir()
+    (base / "size").write_text(f"{size}\n")
+    if device:
+        (base / "device").mkdir()
+    for rel, value in attrs.items():
+        path = base / rel.replace("__", "/")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if value is None:
+            path.mkdir()
+        else:
+            path.write_text(f"{value}\n")
+    return base
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    _disk(tmp_path, "sda", 7814037168, device__model="ST4000DM004-2CV1",
+          queue__rotational=1, removable=0, holders__md0=None)
+    _disk(tmp_path, "sdb", 976773168, device__model="Samsung SSD 860", queue__rotational=0)
+    _disk(tmp_path, "sdaa", 3907029168, queue__rotational=1)
+    _disk(tmp_path, "sdc", 0, device__model="Card Reader", removable=1)     # lector vacío
+    _disk(tmp_path, "sr0", 2097151, device__type=5)                          # óptico
+    _disk(tmp_path, "loop0", 204800, device=False)
+    _disk(tmp_path, "md0", 7813774336, device=False)
+    _disk(tmp_path, "nvme0n1", 1953525168, queue__rotational=0)
+    _disk(tmp_path, "nvme10n1", 1953525168, queue__rotational=0)
+    _disk(tmp_path, "nvme0c0n1", 1953525168, hidden=1)                       # ruta multipath
+    _disk(tmp_path, "sdd", "basura")
+    return tmp_path
+
+
+def test_only_physical_disks_in_kernel_order(sysfs):
+    names = [d["name"] for d in hw.get_disks(str(sysfs))]
+    assert names == ["nvme0n1", "nvme10n1", "sda", "sdb", "sdaa"]
+
+
+def test_disk_fields(sysfs):
+    sda = hw._sysfs_disk("sda", str(sysfs))
+    assert sda == {
+        "name": "sda", "model": "ST4000DM004-2CV1", "size": "3.6T",
+        "rotational": True, "removable": False, "holders": ["md0"], "path": "/dev/sda",
+    }
+    sdb = hw._sysfs_disk("sdb", str(sysfs))
+    assert (sdb["rotational"], sdb["size"], sdb["holders"]) == (False, "465.8G", [])
+    assert hw._sysfs_disk("sdaa", str(sysfs))["model"] == "Desconocido"
+    for name in ("sdc", "sr0", "loop0", "md0", "nvme0c0n1", "sdd", "no-existe"):
+        assert hw._sysfs_disk(name, str(sysfs)) is None, name
+
+
+def test_lsblk_fallback_when_sysfs_is_empty(tmp_path, monkeypatch):
+    (tmp_path / "block").mkdir()
+    out = {"blockdevices": [
+        {"name": "vda", "model": None, "size": "20G", "rota": "1", "type": "disk"},
+        {"name": "vda1", "model": None, "size": "20G", "rota": "1", "type": "part"},
+    ]}
+    monkeypatch.setattr(hw, "run_cmd", lambda cmd, *a, **kw: json.dumps(out))
+    assert hw.get_disks(str(tmp_path)) == [
+        {"name": "vda", "model": "Desconocido", "size": "20G", "rotational": True, "path": "/dev/vda"}]
+
+
+def test_human_size_matches_lsblk():
+    assert hw._human_size(512) == "512B"
+    assert hw._human_size(256 * 1024**3) == "256G"
+    assert hw._human_size(500107862016) == "465.8G"
+
+
+def test_sort_key_is_natural():
+    names = ["sdaa", "nvme1n1", "sdb", "nvme0n10", "nvme10n1", "sdz", "nvme0n2", "sda", "nvme0n1"]
+    assert sorted(names, key=hw._disk_sort_key) == [
+        "nvme0n1", "nvme0n2", "nvme0n10", "nvme1n1", "nvme10n1", "sda", "sdb", "sdz", "sdaa"]
@@ -0,0 +1,106 @@
+"""UeventMonitor: mensajes netlink del kernel -> altas y bajas de discos.
+
+Los mensajes llegan por un socketpair de datagramas en lugar del socket
+netlink, con el mismo formato que manda el kernel.
+"""
+import socket
+
+import pytest
+
+import linux_hwmonitor as hw
+
+
+def uevent(action, devpath, **env):
+    fields = {"ACTION": action, "DEVPATH": devpath, "SEQNUM": "4711", **env}
+    return (f"{action}@{devpath}\0" + "\0".join(f"{k}={v}" for k, v in fields.items())).encode() + b"\0"
+
+
+@pytest.fixture
+def monitor():
+    theirs, ours = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    ours.setblocking(False)
+    mon = hw.UeventMonitor.__new__(hw.UeventMonitor)
+    mon._sock = ours
+    yield mon, theirs
+    mon.close()
+    theirs.close()
+
+
+def test_parse():
+    env = hw.UeventMonitor.parse(uevent(
+        "add", "/devices/pci0000:00/0000:00:17.0/ata3/host2/target2:0:0/2:0:0:0/block/sdb",
+        SUBSYSTEM="block", DEVNAME="sdb", DEVTYPE="disk", MAJOR="8", MINOR="16",
+        DISKSEQ="12", ID_MODEL="Ünïcode"))
+    assert env["ACTION"] == "add"
+    assert env["DEVNAME"] == "sdb"
+    assert env["MAJOR"] == "8" and env["MINOR"] == "16"
+    assert env["ID_MODEL"] == "Ünïcode"
+    assert not any("@" in key for key in env)         # la cabecera no es un campo
+
+
+def test_parse_ignores_malformed_fields():
+    env = hw.UeventMonitor.parse(b"change@/devices/x\0ACTION=change\0NOEQUALS\0\0EMPTY=\0")
+    assert env == {"ACTION": "change", "EMPTY": ""}
+
+
+def test_disk_events_filters_and_drains(monitor):
+    mon, kernel = monitor
+    messages = [
+        uevent("add", "/devices/.../block/sdc", SUBSYSTEM="block", DEVNAME="sdc", DEVTYPE="disk"),
+        uevent("add", "/devices/.../block/sdc/sdc1", SUBSYSTEM="block", DEVNAME="sdc1",
+               DEVTYPE="partition"),
+        uevent("add", "/devices/.../host6", SUBSYSTEM="scsi", DEVTYPE="scsi_host"),
+        uevent("bind", "/devices/.../block/sdc", SUBSYSTEM="block", DEVNAME="sdc", DEVTYPE="disk"),
+        b"libudev\0\xfe\xed\xca\xfe" + b"\0" * 32,          # reenvío de udevd: se ignora
+        uevent("change", "/devices/.../nvme0n1", SUBSYSTEM="block", DEVNAME="/dev/nvme0n1",
+               DEVTYPE="disk"),
+        uevent("remove", "/devices/.../block/sdc", SUBSYSTEM="block", DEVNAME="sdc", DEVTYPE="disk"),
+    ]
+    for msg in messages:
+        kernel.send(msg)
+    assert mon.disk_events() == [("add", "sdc"), ("change", "nvme0n1"), ("remove", "sdc")]
+    assert mon.disk_events() == []                    # el socket quedó vacío
+
+
+def test_real_netlink_socket_or_unavailable():
+    try:
+        mon = hw.UeventMonitor()
+    except OSError:
+        pytest.skip("netlink no disponible (contenedor / sandbox)")
+    try:
+        assert mon.fileno() >= 0
+        assert isinstance(mon.disk_events(), list)
+    finally:
+        mon.close()
+
+
+def test_events_stop_on_socket_errors(monitor):
+    mon, kernel = monitor
+    kernel.send(uevent("add", "/devices/.../block/sdc", SUBSYSTEM="block", DEVNAME="sdc",
+                       DEVTYPE="disk"))
+    mon.close()                                       # EBADF: antes era un bucle infinito
+    assert mon.events() == []
+
+
+def test_events_skip_enobufs(monitor):
+    import errno
+
+    class Flaky:
+        def __init__(self):
+            self.calls = 0
+
+        def recv(self, size):
+            self.calls += 1
+            if self.calls == 1:
+                raise OSError(errno.ENOBUFS, "No buffer space available")
+            if self.calls == 2:
+                return uevent("remove", "/devices/x", SUBSYSTEM="block", DEVNAME="sdc", DEVTYPE="disk")
+            raise BlockingIOError
+
+        def close(self):
+            pass
+
+    mon, _ = monitor
+    mon._sock.close()
+    mon._sock = Flaky()
+    assert mon.disk_events() == [("remove", "sdc")]